@@ -0,0 +1,69 @@
+"""
+Measure read + decode time per JSON decoder backend on a scaled-up copy of
+examples/petstore.json.
+
+Usage:
+    python -m benchmarks.decode --scale 5000
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import tempfile
+import time
+from typing import Any
+
+from json_schema_to_python.json_schema.decode import (
+    DECODER_NAMES,
+    decode_file,
+    get_decoder,
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--scale", type=int, default=5000)
+parser.add_argument("--repeat", type=int, default=5)
+
+
+def _scale_petstore(scale: int) -> dict[str, Any]:
+    """
+    Copy every petstore model `scale` times, renaming the copies
+    """
+
+    with open(os.path.join("examples", "petstore.json")) as f:
+        petstore = json.load(f)
+
+    properties: dict[str, Any] = {}
+    for i in range(scale):
+        for name, schema in petstore["properties"].items():
+            properties[f"{name}{i}"] = {**schema, "id": f"#{name}{i}"}
+
+    return {**petstore, "properties": properties}
+
+
+def main() -> None:
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+        json.dump(_scale_petstore(args.scale), f, indent=2)
+        f.flush()
+
+        print(f"input: {os.path.getsize(f.name) / 1e6:.1f} MB")
+
+        for name in DECODER_NAMES:
+            if name != "json" and importlib.util.find_spec(name) is None:
+                print(f"{name}: not installed")
+                continue
+
+            decoder = get_decoder(name)
+            timings: list[float] = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                decode_file(f.name, decoder)
+                timings.append(time.perf_counter() - start)
+
+            print(f"{name}: {min(timings) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Measure how long a generated module takes to import in a fresh interpreter:
+with every import (as modules used to be generated), with only the used ones,
+and with the ones only used in annotations under `if TYPE_CHECKING:`.
+
+The first import compiles the module, and later ones load the cached bytecode,
+which is what services importing the module usually do.
+
+Usage:
+    python -m benchmarks.imports --models 100 1000 --properties 20
+"""
+
+import argparse
+import ast
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from json_schema_to_python.ast import create_module_node
+from json_schema_to_python.ast.import_node import create_import_nodes
+from json_schema_to_python.emit import emit_module
+from json_schema_to_python.json_schema.types import Schema, create_schema_from_dict
+from .synthetic import create_root_schema_dict
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--models", type=int, nargs="+", default=[100, 1000])
+parser.add_argument("--properties", type=int, default=20)
+parser.add_argument("--repeat", type=int, default=5)
+
+_VARIANTS = ["all", "used", "type-checking"]
+
+_IMPORT_CODE = """
+import time
+start = time.perf_counter()
+import {module_name}
+print(time.perf_counter() - start)
+"""
+
+
+def _create_module(schemas: list[Schema], variant: str) -> ast.Module:
+    if variant == "all":
+        module = create_module_node(schemas)
+        module.body = [
+            *create_import_nodes(),
+            *(node for node in module.body if not isinstance(node, ast.ImportFrom)),
+        ]
+
+        return module
+
+    return create_module_node(
+        schemas,
+        should_gate_typing_imports=variant == "type-checking",
+    )
+
+
+def _time_import(directory: str, module_name: str, should_compile: bool) -> float:
+    if should_compile:
+        shutil.rmtree(os.path.join(directory, "__pycache__"), ignore_errors=True)
+
+    # Bytecode has to be written for later imports to load it
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_CODE.format(module_name=module_name)],
+        cwd=directory,
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+
+    return float(output)
+
+
+def main() -> None:
+    args = parser.parse_args()
+
+    print("models  variant        first ms  cached ms")
+    with tempfile.TemporaryDirectory() as directory:
+        for model_count in args.models:
+            root = create_root_schema_dict(
+                model_count=model_count,
+                property_count=args.properties,
+            )
+            schemas = [create_schema_from_dict(v) for v in root["properties"].values()]
+
+            for variant in _VARIANTS:
+                module_name = f"models_{model_count}_{variant.replace('-', '_')}"
+                with open(os.path.join(directory, f"{module_name}.py"), "w") as f:
+                    f.write(emit_module(_create_module(schemas, variant)))
+
+                first_seconds = min(
+                    _time_import(directory, module_name, True)
+                    for _ in range(args.repeat)
+                )
+                # The last first import left the bytecode cached
+                cached_seconds = min(
+                    _time_import(directory, module_name, False)
+                    for _ in range(args.repeat)
+                )
+                print(
+                    f"{model_count:>6}  {variant:<13}  {first_seconds * 1e3:>8.2f}  "
+                    f"{cached_seconds * 1e3:>9.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
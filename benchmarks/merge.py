@@ -0,0 +1,137 @@
+"""
+Measure how `merge_schemas` scales with the number of overlapping properties
+and the width of their `anyOf` unions, and with the number of `allOf` members.
+Time per property or member should stay flat as each grows.
+
+Wide `allOf` lists are also merged with a balanced pairwise reduction, for
+comparison with the left fold that `merge_schemas` does.
+
+Usage:
+    python -m benchmarks.merge --properties 100 1000 10000 --widths 2 8 32 \
+        --members 16 128 1024
+"""
+
+import argparse
+from typing import Any
+
+from json_schema_to_python.json_schema import ir
+from json_schema_to_python.json_schema.merge import merge_schemas
+from json_schema_to_python.json_schema.types import ObjectSchema
+from .parse import _best_of
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--properties", type=int, nargs="+", default=[100, 1000, 10000])
+parser.add_argument("--widths", type=int, nargs="+", default=[2, 8, 32])
+parser.add_argument("--members", type=int, nargs="+", default=[16, 128, 1024])
+parser.add_argument("--repeat", type=int, default=3)
+
+
+def _create_union(width: int, offset: int) -> dict[str, Any]:
+    """
+    A union of string enums. Unions starting at different offsets overlap in
+    all but `offset` members.
+    """
+
+    return {
+        "anyOf": [
+            {"type": "string", "enum": [f"value_{i}"]}
+            for i in range(offset, offset + width)
+        ],
+    }
+
+
+def _create_object_schema(
+    property_count: int,
+    width: int,
+    offset: int,
+) -> ir.ObjectSchema:
+    schema = ir.from_schema(
+        ObjectSchema.parse_obj(
+            {
+                "type": "object",
+                "properties": {
+                    f"property_{i}": _create_union(width, offset + i % 2)
+                    for i in range(property_count)
+                },
+                "required": [f"property_{i}" for i in range(property_count)],
+            }
+        )
+    )
+    assert isinstance(schema, ir.ObjectSchema)
+
+    return schema
+
+
+def _create_all_of_members(count: int) -> list[ir.ObjectSchema]:
+    """
+    Object schemas with 20 properties each. Every property name is shared by
+    about 100 members, with overlapping types.
+    """
+
+    members: list[ir.ObjectSchema] = []
+    for i in range(count):
+        names = [f"property_{(i * 20 + k) % 200}" for k in range(20)]
+        schema = ir.from_schema(
+            ObjectSchema.parse_obj(
+                {
+                    "type": "object",
+                    "properties": {
+                        name: {
+                            "type": (
+                                ["integer", "string", "null"]
+                                if (i + k) % 2
+                                else ["string", "null"]
+                            )
+                        }
+                        for k, name in enumerate(names)
+                    },
+                    "required": names[:2],
+                }
+            )
+        )
+        assert isinstance(schema, ir.ObjectSchema)
+        members.append(schema)
+
+    return members
+
+
+def _merge_balanced(schemas: list[ir.ObjectSchema]) -> ir.ObjectSchema:
+    while len(schemas) > 1:
+        schemas = [merge_schemas(schemas[i : i + 2]) for i in range(0, len(schemas), 2)]
+
+    return schemas[0]
+
+
+def main() -> None:
+    args = parser.parse_args()
+
+    print("properties  width  seconds   µs/property")
+    for property_count in args.properties:
+        for width in args.widths:
+            schemas = [
+                _create_object_schema(property_count, width, 0),
+                _create_object_schema(property_count, width, 1),
+            ]
+
+            seconds = _best_of(args.repeat, lambda: merge_schemas(schemas))
+            print(
+                f"{property_count:>10}  {width:>5}  {seconds:>7.4f}  "
+                f"{seconds / property_count * 1e6:>12.1f}"
+            )
+
+    print()
+    print("members  fold seconds  balanced seconds  fold µs/member")
+    for member_count in args.members:
+        members = _create_all_of_members(member_count)
+        assert merge_schemas(members) == _merge_balanced(members)
+
+        fold_seconds = _best_of(args.repeat, lambda: merge_schemas(members))
+        balanced_seconds = _best_of(args.repeat, lambda: _merge_balanced(members))
+        print(
+            f"{member_count:>7}  {fold_seconds:>12.4f}  {balanced_seconds:>16.4f}  "
+            f"{fold_seconds / member_count * 1e6:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measure schema parse throughput.
+
+Usage:
+    python -m benchmarks.parse --models 2000 --properties 20
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from json_schema_to_python.json_schema.types import (
+    RootSchema,
+    create_schema_from_dict,
+)
+from .synthetic import create_root_schema_dict
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--models", type=int, default=2000)
+parser.add_argument("--properties", type=int, default=20)
+parser.add_argument("--repeat", type=int, default=3)
+
+
+def _best_of(repeat: int, func: Callable[[], object]) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def main() -> None:
+    args = parser.parse_args()
+    root = create_root_schema_dict(
+        model_count=args.models,
+        property_count=args.properties,
+    )
+    schema_count = len(root["properties"]) * (1 + args.properties)
+
+    root_seconds = _best_of(args.repeat, lambda: RootSchema.parse_obj(root))
+    dict_seconds = _best_of(
+        args.repeat,
+        lambda: [create_schema_from_dict(v) for v in root["properties"].values()],
+    )
+
+    print(f"schemas: {schema_count}")
+    print(
+        f"RootSchema.parse_obj: {root_seconds:.3f}s "
+        f"({schema_count / root_seconds:,.0f} schemas/s)"
+    )
+    print(
+        f"create_schema_from_dict: {dict_seconds:.3f}s "
+        f"({schema_count / dict_seconds:,.0f} schemas/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Measure each stage of generating a module from a synthetic schema document
+(see `synthetic.py`) separately:
+
+- load: decode and validate the document (`load_model_schemas_and_resolver`)
+- merge: merge the inline members of every `allOf` model (`MergeCache`)
+- build: convert the schemas and build the module's AST
+  (`create_module_node`). `allOf` merges come from the merge stage's cache,
+  so they aren't counted twice.
+- unparse: write each top-level statement's source (`ast.unparse`)
+- format: format the statements with black (`format_sources`, uncached)
+
+Each stage's time is the best of several runs, and its memory is the peak
+traced by `tracemalloc` in a separate run, above what was allocated before
+it. Results are written as JSON with `--output`, and compared with an earlier
+run's results with `--compare`, e.g. to check a change on another commit.
+
+Models with `allOf` are parsed as `AllOfSchema` when loaded, and generate
+nothing, so they're parsed as object schemas for the later stages, as
+`class_node` expects.
+
+Usage:
+    python -m benchmarks.stages --models 1000 --properties 20 --all-of 4 \
+        --output before.json
+    python -m benchmarks.stages --models 1000 --properties 20 --all-of 4 \
+        --compare before.json
+"""
+
+import argparse
+import ast
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+from typing import Any, Callable
+
+from json_schema_to_python.ast import create_module_node
+from json_schema_to_python.formatting import format_sources
+from json_schema_to_python.json_schema import MergeCache, ir
+from json_schema_to_python.json_schema.load import load_model_schemas_and_resolver
+from json_schema_to_python.json_schema.resolve import RefResolver
+from json_schema_to_python.json_schema.types import (
+    AllOfSchema,
+    ObjectSchema,
+    Schema,
+)
+from .parse import _best_of
+from .synthetic import create_root_schema_dict
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--models", type=int, default=1000)
+parser.add_argument("--properties", type=int, default=20)
+parser.add_argument(
+    "--all-of",
+    help="Number of allOf members of every other model",
+    type=int,
+    default=4,
+)
+parser.add_argument("--union-width", type=int, default=4)
+parser.add_argument(
+    "--enum-size",
+    help="Number of values of each enum. Defaults to a random number.",
+    type=int,
+)
+parser.add_argument(
+    "--depth",
+    help="Nesting depth of an inline object property of each model",
+    type=int,
+    default=2,
+)
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--repeat", type=int, default=3)
+parser.add_argument("--output", help="Write the results to this JSON file")
+parser.add_argument("--compare", help="Compare with results from this JSON file")
+
+_STAGES = ["load", "merge", "build", "unparse", "format"]
+
+
+def _measure(
+    repeat: int,
+    func: Callable[[], Any],
+) -> tuple[float, int, Any]:
+    """
+    Time a stage, and measure its peak memory in one more run
+
+    Returns:
+        The best time in seconds, the peak in bytes, and the stage's result
+        from the last run
+    """
+
+    seconds = _best_of(repeat, func)
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return seconds, peak - baseline, result
+
+
+def _get_all_of_members(schemas: list[Schema]) -> list[list[ir.ObjectSchema]]:
+    """
+    Get the inline object members of each model's `allOf`, which are merged
+    """
+
+    members: list[list[ir.ObjectSchema]] = []
+    for schema in schemas:
+        ir_schema = ir.from_schema(schema)
+
+        if isinstance(ir_schema, ir.ObjectSchema) and ir_schema.allOf:
+            objects = [s for s in ir_schema.allOf if isinstance(s, ir.ObjectSchema)]
+
+            if len(objects) > 0:
+                members.append(objects)
+
+    return members
+
+
+def _merge(
+    members: list[list[ir.ObjectSchema]],
+    resolver: RefResolver,
+) -> MergeCache:
+    cache = MergeCache(max_size=max(1, len(members)))
+    for objects in members:
+        cache.merge(objects, resolver)
+
+    return cache
+
+
+def _get_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run(args: argparse.Namespace, parameters: dict[str, Any]) -> dict[str, Any]:
+    import black
+
+    root = create_root_schema_dict(
+        model_count=args.models,
+        property_count=args.properties,
+        seed=args.seed,
+        all_of_fan_in=args.all_of,
+        union_width=args.union_width,
+        enum_size=args.enum_size,
+        depth=args.depth,
+    )
+    logger = logging.getLogger(__name__)
+    logger.disabled = True
+
+    stages: dict[str, dict[str, float]] = {}
+
+    def add_stage(name: str, func: Callable[[], Any]) -> Any:
+        seconds, peak, result = _measure(args.repeat, func)
+        stages[name] = {"seconds": seconds, "peak_bytes": peak}
+
+        return result
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "schema.json")
+        with open(path, "w") as f:
+            json.dump(root, f)
+
+        schemas, resolver = add_stage(
+            "load",
+            lambda: load_model_schemas_and_resolver(logger, path),
+        )
+
+    schemas = [
+        (
+            ObjectSchema.parse_obj(root["properties"][schema.get_schema_name()])
+            if isinstance(schema, AllOfSchema)
+            else schema
+        )
+        for schema in schemas
+    ]
+    members = _get_all_of_members(schemas)
+
+    merge_cache = add_stage("merge", lambda: _merge(members, resolver))
+    tree = add_stage(
+        "build",
+        lambda: create_module_node(schemas, resolver, merge_cache),
+    )
+    sources = add_stage(
+        "unparse",
+        lambda: [ast.unparse(node) for node in tree.body],
+    )
+    formatted = add_stage("format", lambda: format_sources(sources))
+
+    return {
+        "parameters": parameters,
+        "commit": _get_commit(),
+        "python": platform.python_version(),
+        "black": black.__version__,
+        "counts": {
+            "models": len(schemas),
+            "all_of_models": len(members),
+            "statements": len(tree.body),
+            "output_bytes": sum(len(source) for source in formatted),
+        },
+        "stages": stages,
+    }
+
+
+def _print_results(results: dict[str, Any], previous: dict[str, Any] | None) -> None:
+    counts = results["counts"]
+    print(
+        f"models: {counts['models']}, allOf models: {counts['all_of_models']}, "
+        f"statements: {counts['statements']}"
+    )
+
+    if previous is None:
+        print("stage    seconds   peak MiB")
+    else:
+        print(f"stage    seconds   peak MiB  vs {previous.get('commit') or 'previous'}")
+
+    for name in _STAGES:
+        stage = results["stages"][name]
+        line = (
+            f"{name:<7}  {stage['seconds']:>7.3f}  "
+            f"{stage['peak_bytes'] / 2**20:>9.1f}"
+        )
+
+        previous_stage = None if previous is None else previous["stages"].get(name)
+        if previous_stage is not None:
+            line += (
+                f"  {stage['seconds'] / previous_stage['seconds']:>5.2f}x time, "
+                f"{stage['peak_bytes'] / max(1, previous_stage['peak_bytes']):.2f}x "
+                "memory"
+            )
+
+        print(line)
+
+
+def main() -> None:
+    args = parser.parse_args()
+    parameters = {
+        name: getattr(args, name)
+        for name in (
+            "models",
+            "properties",
+            "all_of",
+            "union_width",
+            "enum_size",
+            "depth",
+            "seed",
+        )
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+
+        if previous["parameters"] != parameters:
+            print(f"warning: {args.compare} was run with {previous['parameters']}")
+
+    results = _run(args, parameters)
+    _print_results(results, previous)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Measure how long `import json_schema_to_python` and the CLI's `--help` take to
+import this package, with `-X importtime`, against the budgets in
+`startup_budget.json`. Exits with an error if a budget is exceeded.
+
+Timings are the package's own imports (including the standard library modules
+it imports first), not interpreter startup, and are the best of several runs.
+Budgets leave headroom for slower machines; lower them when startup gets
+faster, so that it doesn't regress unnoticed.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --slowest 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--repeat", type=int, default=5)
+parser.add_argument(
+    "--slowest",
+    help="Number of slowest modules to list for each command, by their own time",
+    type=int,
+    default=5,
+)
+
+_BUDGET_PATH = os.path.join(os.path.dirname(__file__), "startup_budget.json")
+
+_PACKAGE_NAME = "json_schema_to_python"
+
+# Arguments to the interpreter, by name in the budget file
+_COMMANDS = {
+    "import": ["-c", f"import {_PACKAGE_NAME}"],
+    "help": ["-m", _PACKAGE_NAME, "--help"],
+}
+
+
+def _parse_import_times(output: str) -> list[tuple[str, int, int, int]]:
+    """
+    Get each module's name, nesting depth, own time and cumulative time (in
+    microseconds) from `-X importtime` output
+    """
+
+    modules: list[tuple[str, int, int, int]] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_time, cumulative_time, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), depth, int(self_time), int(cumulative_time)))
+
+    return modules
+
+
+def _time_command(arguments: list[str]) -> list[tuple[str, int, int, int]]:
+    # Timings with cached bytecode, as most runs are
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stderr
+
+    return _parse_import_times(output)
+
+
+def _get_package_modules(
+    modules: list[tuple[str, int, int, int]],
+) -> list[tuple[str, int, int, int]]:
+    """
+    Get the package's top-level imports, and the modules each imported
+    """
+
+    package_modules: list[tuple[str, int, int, int]] = []
+    # A module's imports are listed before it, and nested under it
+    nested: list[tuple[str, int, int, int]] = []
+
+    for module in modules:
+        name, depth, _, _ = module
+        nested.append(module)
+
+        if depth == 0:
+            if name.split(".")[0] == _PACKAGE_NAME:
+                package_modules += nested
+
+            nested = []
+
+    return package_modules
+
+
+def _get_package_time(modules: list[tuple[str, int, int, int]]) -> int:
+    """
+    Get the cumulative time of the package's top-level imports
+    """
+
+    return sum(
+        cumulative_time
+        for _, depth, _, cumulative_time in _get_package_modules(modules)
+        if depth == 0
+    )
+
+
+def main() -> None:
+    args = parser.parse_args()
+
+    with open(_BUDGET_PATH) as f:
+        budgets: dict[str, float] = json.load(f)
+
+    # Write bytecode before timing
+    for arguments in _COMMANDS.values():
+        _time_command(arguments)
+
+    is_over_budget = False
+    print("command  ms      budget ms")
+    for command, arguments in _COMMANDS.items():
+        runs = [_time_command(arguments) for _ in range(args.repeat)]
+        best = min(runs, key=_get_package_time)
+        milliseconds = _get_package_time(best) / 1e3
+        budget = budgets[command]
+
+        print(f"{command:<7}  {milliseconds:>6.2f}  {budget:>9.2f}")
+        slowest = sorted(_get_package_modules(best), key=lambda module: -module[2])
+        for name, _, self_time, _ in slowest[: args.slowest]:
+            print(f"           {self_time / 1e3:>6.2f}  {name}")
+
+        if milliseconds > budget:
+            is_over_budget = True
+            print(f"{command} is over its budget")
+
+    if is_over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
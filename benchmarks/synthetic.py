@@ -0,0 +1,181 @@
+"""
+Deterministic synthetic JSON Schema documents for benchmarks
+"""
+
+import random
+from typing import Any
+
+# Property names that `allOf` members draw from, so that members overlap
+_SHARED_PROPERTY_COUNT = 20
+
+_SHARED_PROPERTIES_PER_MEMBER = 4
+
+_UNION_MEMBERS: list[dict[str, Any]] = [
+    {"type": "string"},
+    {"type": "integer"},
+    {"type": "number"},
+    {"type": "boolean"},
+]
+
+
+def create_root_schema_dict(
+    *,
+    model_count: int,
+    property_count: int,
+    seed: int = 0,
+    all_of_fan_in: int = 0,
+    union_width: int = 2,
+    enum_size: int | None = None,
+    depth: int = 0,
+) -> dict[str, Any]:
+    """
+    Create a root schema dict whose `properties` contains `model_count` object
+    models (plus one enum model for every 10 object models).
+
+    Args:
+        model_count: Number of object models
+        property_count: Number of properties per object model
+        seed: Random seed. The same arguments always produce the same document
+        all_of_fan_in: Number of `allOf` members of every other object model:
+            a ref to another model, and inline object schemas with overlapping
+            properties, which are merged. 0 for no `allOf`.
+        union_width: Number of members of `anyOf` properties. Members past the
+            scalar types are refs to models.
+        enum_size: Number of values of each enum model. Defaults to a random
+            number from 2 to 20.
+        depth: Nesting depth of an inline object property that each object
+            model gets, named "nested". 0 for none.
+    """
+
+    rng = random.Random(seed)
+    enum_names = [f"Enum{i}" for i in range(max(1, model_count // 10))]
+    model_names = [f"Model{i}" for i in range(model_count)]
+    union = _create_union(union_width, model_names)
+
+    properties: dict[str, Any] = {}
+
+    for index, name in enumerate(model_names):
+        model_properties = {
+            f"property_{i}": _create_property_schema(
+                rng,
+                model_names,
+                enum_names,
+                union,
+            )
+            for i in range(property_count)
+        }
+
+        properties[name] = {
+            "id": f"#{name}",
+            "type": "object",
+            "properties": model_properties,
+            "required": sorted(
+                rng.sample(list(model_properties), k=len(model_properties) // 2)
+            ),
+        }
+
+        if depth > 0:
+            model_properties["nested"] = _create_nested_schema(depth)
+
+        if all_of_fan_in > 0 and index % 2 == 1:
+            properties[name]["allOf"] = _create_all_of_value(
+                rng,
+                all_of_fan_in,
+                model_names[:index],
+            )
+
+    for name in enum_names:
+        size = rng.randint(2, 20) if enum_size is None else enum_size
+        properties[name] = {
+            "id": f"#{name}",
+            "type": "string",
+            "enum": [f"value_{i}" for i in range(size)],
+        }
+
+    return {"id": "#root", "properties": properties}
+
+
+def _create_property_schema(
+    rng: random.Random,
+    model_names: list[str],
+    enum_names: list[str],
+    union: dict[str, Any],
+) -> dict[str, Any]:
+    kind = rng.randrange(9)
+
+    if kind == 0:
+        return {"type": "string"}
+    elif kind == 1:
+        return {"type": "integer"}
+    elif kind == 2:
+        return {"type": "number"}
+    elif kind == 3:
+        return {"type": "boolean"}
+    elif kind == 4:
+        return {"type": ["string", "null"]}
+    elif kind == 5:
+        return {"$ref": f"#{rng.choice(enum_names)}"}
+    elif kind == 6:
+        return {"type": "array", "items": [{"$ref": f"#{rng.choice(model_names)}"}]}
+    elif kind == 7:
+        return union
+    else:
+        return {"type": "string", "enum": ["a", "b", "c"]}
+
+
+def _create_union(width: int, model_names: list[str]) -> dict[str, Any]:
+    members = _UNION_MEMBERS[:width]
+    members += [
+        {"$ref": f"#{model_names[i % len(model_names)]}"}
+        for i in range(width - len(members))
+    ]
+
+    return {"anyOf": members}
+
+
+def _create_nested_schema(depth: int) -> dict[str, Any]:
+    schema: dict[str, Any] = {"type": "string"}
+    for _ in range(depth):
+        schema = {
+            "type": "object",
+            "properties": {"value": {"type": "string"}, "child": schema},
+            "required": ["value"],
+        }
+
+    return schema
+
+
+def _create_all_of_value(
+    rng: random.Random,
+    fan_in: int,
+    base_names: list[str],
+) -> list[dict[str, Any]]:
+    """
+    A ref to one of the base models, and inline object schemas. Properties
+    with the same name have compatible types, so that they can be merged.
+    """
+
+    members: list[dict[str, Any]] = [{"$ref": f"#{rng.choice(base_names)}"}]
+
+    for i in range(1, fan_in):
+        names = sorted(
+            rng.sample(range(_SHARED_PROPERTY_COUNT), k=_SHARED_PROPERTIES_PER_MEMBER)
+        )
+        members.append(
+            {
+                "type": "object",
+                "properties": {
+                    f"shared_{k}": {
+                        "type": (
+                            ["integer", "string", "null"]
+                            if (i + k) % 2
+                            else ["string", "null"]
+                        )
+                    }
+                    for k in names
+                },
+                "required": [f"shared_{names[0]}"],
+            }
+        )
+
+    return members
@@ -1,2 +1,48 @@
-from .file import convert_schemas_to_file_content
-from .json_schema import load_model_schemas
+"""
+Names are imported from their modules when they're first used, so that
+importing the package (e.g. for the CLI's `--help`, or to use a daemon) doesn't
+import pydantic and the code generator.
+"""
+
+import importlib
+
+# Rather than `typing.TYPE_CHECKING`, since importing typing is slow. Type
+# checkers treat any constant with this name the same way.
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from .file import convert_schemas_to_file_content
+    from .json_schema import (
+        MergeCache,
+        RefResolver,
+        SchemaCache,
+        iter_model_schemas,
+        load_model_schemas,
+        load_model_schemas_and_resolver,
+    )
+
+_modules_by_name = {
+    "convert_schemas_to_file_content": ".file",
+    "MergeCache": ".json_schema",
+    "RefResolver": ".json_schema",
+    "SchemaCache": ".json_schema",
+    "iter_model_schemas": ".json_schema",
+    "load_model_schemas": ".json_schema",
+    "load_model_schemas_and_resolver": ".json_schema",
+}
+
+
+def __getattr__(name: str) -> object:
+    module_name = _modules_by_name.get(name)
+
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value: object = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_modules_by_name})
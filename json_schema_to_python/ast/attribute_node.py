@@ -1,28 +1,64 @@
 import ast
 
-from json_schema_to_python import json_schema
-from json_schema_to_python.json_schema.types import Schema
+from json_schema_to_python.json_schema import ir
 from .list_node import create_list
 from .literal_node import create_literal_node
 from .types import AstName, convert_json_schema_type_to_ast_name
 from .union_node import create_union_node
 
 
+class AnnotationCache:
+    """
+    Annotation nodes keyed by their schema's fingerprint and whether the
+    property is required, so that each distinct type is built once and the
+    properties that have it share one node. Shared nodes must never be mutated.
+    """
+
+    def __init__(self) -> None:
+        self._annotations: dict[tuple[bytes, bool], ast.Name | ast.Subscript] = {}
+
+    def get_annotation(
+        self,
+        schema: ir.Schema,
+        is_required: bool,
+    ) -> ast.Name | ast.Subscript:
+        key = (schema.fingerprint, is_required)
+        annotation = self._annotations.get(key)
+
+        if annotation is None:
+            if is_required:
+                annotation = _get_type_value(schema)
+            else:
+                annotation = _create_not_required_node(
+                    self.get_annotation(schema, True)
+                )
+
+            self._annotations[key] = annotation
+
+        return annotation
+
+    def __len__(self) -> int:
+        return len(self._annotations)
+
+
 def get_attribute_node(
     property_name: str,
-    property_schema: Schema,
+    property_schema: ir.Schema,
     is_required: bool,
+    annotation_cache: AnnotationCache | None = None,
 ) -> ast.AnnAssign:
-    type_value = _get_type_value(property_schema)
+    """
+    Args:
+        annotation_cache: Share annotation nodes between properties
+    """
 
     annotation: ast.Name | ast.Subscript
-    if is_required:
-        annotation = type_value
+    if annotation_cache is not None:
+        annotation = annotation_cache.get_annotation(property_schema, is_required)
+    elif is_required:
+        annotation = _get_type_value(property_schema)
     else:
-        annotation = ast.Subscript(
-            slice=type_value,
-            value=AstName.NotRequired,
-        )
+        annotation = _create_not_required_node(_get_type_value(property_schema))
 
     return ast.AnnAssign(
         annotation=annotation,
@@ -31,23 +67,32 @@ def get_attribute_node(
     )
 
 
+def _create_not_required_node(
+    type_value: ast.Name | ast.Subscript,
+) -> ast.Subscript:
+    return ast.Subscript(
+        slice=type_value,
+        value=AstName.NotRequired,
+    )
+
+
 def _get_type_value(
-    schema: json_schema.types.Schema,
+    schema: ir.Schema,
 ) -> ast.Name | ast.Subscript:
     type_value: ast.Name | ast.Subscript
 
-    if isinstance(schema, json_schema.types.ArraySchema):
+    if isinstance(schema, ir.ArraySchema):
         type_value = create_list(schema)
-    elif isinstance(schema, json_schema.types.AllOfSchema):
+    elif isinstance(schema, ir.AllOfSchema):
         raise NotImplementedError()
-    elif isinstance(schema, json_schema.types.AnyOfSchema):
-        type_value = create_union_node(schema.anyOf.__root__)
-    elif isinstance(schema, json_schema.types.MultiTypeSchema):
+    elif isinstance(schema, ir.AnyOfSchema):
+        type_value = create_union_node(schema.anyOf)
+    elif isinstance(schema, ir.MultiTypeSchema):
         type_value = create_union_node(schema.type)
-    elif isinstance(schema, json_schema.types.TypelessSchema):
+    elif isinstance(schema, ir.TypelessSchema):
         type_value = ast.Name(id=schema.get_schema_name())
     else:
-        if json_schema.types.is_enum(schema):
+        if ir.is_enum(schema):
             type_value = create_literal_node(schema)
         else:
             type_value = convert_json_schema_type_to_ast_name(schema.type)
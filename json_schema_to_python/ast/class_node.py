@@ -1,19 +1,34 @@
 import ast
 
 from json_schema_to_python import json_schema
-from .attribute_node import get_attribute_node
+from json_schema_to_python.json_schema import ir
+from json_schema_to_python.json_schema.resolve import RefResolver
+from .attribute_node import AnnotationCache, get_attribute_node
 from .types import AstName
 
 
 def create_class_node(
-    schema: json_schema.types.ObjectSchema,
+    schema: ir.ObjectSchema,
+    resolver: RefResolver | None = None,
+    merge_cache: json_schema.MergeCache | None = None,
+    annotation_cache: AnnotationCache | None = None,
 ) -> ast.ClassDef:
     """
     Create a `Class` AST node for a model
+
+    Args:
+        resolver: Used to follow refs when merging `allOf` schemas
+        merge_cache: Reuse `allOf` merges across models
+        annotation_cache: Share annotation nodes across models
     """
 
     if schema.allOf:
-        class_def = _create_class_node_using_all_of(schema)
+        class_def = _create_class_node_using_all_of(
+            schema,
+            resolver,
+            merge_cache,
+            annotation_cache,
+        )
     else:
         class_def = ast.ClassDef(
             bases=[AstName.TypedDict],
@@ -29,14 +44,15 @@ def create_class_node(
         if class_def.bases == [AstName.TypedDict]:
             class_def.bases = []
 
-        class_def.bases.append(ast.Name(id=schema.ref.get_schema_name()))
+        class_def.bases.append(ast.Name(id=schema.ref_name))
 
     for k, v in schema.properties.items():
         class_def.body.append(
             get_attribute_node(
                 property_name=k,
                 property_schema=v,
-                is_required=k in schema.required,
+                is_required=k in schema.required_set,
+                annotation_cache=annotation_cache,
             )
         )
 
@@ -44,7 +60,10 @@ def create_class_node(
 
 
 def _create_class_node_using_all_of(
-    schema: json_schema.types.ObjectSchema,
+    schema: ir.ObjectSchema,
+    resolver: RefResolver | None = None,
+    merge_cache: json_schema.MergeCache | None = None,
+    annotation_cache: AnnotationCache | None = None,
 ) -> ast.ClassDef:
     """
     If an object schema uses the `allOf` keyword, then use multiple inheritence
@@ -71,15 +90,15 @@ def _create_class_node_using_all_of(
     assert schema.id is not None
 
     class_node: ast.ClassDef
-    subschemas = schema.allOf.__root__
+    subschemas = schema.allOf
     bases: list[ast.expr] = []
     body: list[ast.stmt] = []
-    subschemas_to_merge: list[json_schema.types.ObjectSchema] = []
+    subschemas_to_merge: list[ir.ObjectSchema] = []
 
     for subschema in subschemas:
-        if isinstance(subschema, json_schema.types.TypelessSchema):
+        if isinstance(subschema, ir.TypelessSchema):
             bases.append(ast.Name(id=subschema.get_schema_name()))
-        elif isinstance(subschema, json_schema.types.ObjectSchema):
+        elif isinstance(subschema, ir.ObjectSchema):
             subschemas_to_merge.append(subschema)
 
     if len(bases) == 0:
@@ -88,14 +107,19 @@ def _create_class_node_using_all_of(
     if len(subschemas_to_merge) == 0:
         body = [ast.Pass()]
     else:
-        merged_subschemas = json_schema.merge_schemas(subschemas_to_merge)
+        merged_subschemas = (
+            json_schema.merge_schemas(subschemas_to_merge, resolver)
+            if merge_cache is None
+            else merge_cache.merge(subschemas_to_merge, resolver)
+        )
 
         for k, v in merged_subschemas.properties.items():
             body.append(
                 get_attribute_node(
                     property_name=k,
                     property_schema=v,
-                    is_required=k in merged_subschemas.required,
+                    is_required=k in merged_subschemas.required_set,
+                    annotation_cache=annotation_cache,
                 )
             )
 
@@ -2,7 +2,9 @@ import ast
 import textwrap
 import unittest
 
+from json_schema_to_python.json_schema import ir
 from json_schema_to_python.json_schema.types import ObjectSchema
+from .attribute_node import AnnotationCache
 from .class_node import create_class_node
 
 
@@ -14,7 +16,10 @@ class Test_create_class_def(unittest.TestCase):
         # Remove leading and trailing newlines
         expectation = expectation.strip()
 
-        class_def = create_class_node(schema)
+        ir_schema = ir.from_schema(schema)
+        assert isinstance(ir_schema, ir.ObjectSchema)
+
+        class_def = create_class_node(ir_schema)
         assert ast.unparse(class_def) == expectation
 
     def test_basic_types(self) -> None:
@@ -378,3 +383,39 @@ class Test_create_class_def(unittest.TestCase):
                 a: NotRequired[Union[int, str]]
             """,
         )
+
+    def test_annotation_cache(self) -> None:
+        """
+        Properties with the same type share an annotation node
+        """
+
+        schema = ir.from_schema(
+            ObjectSchema.parse_obj(
+                {
+                    "id": "#Foo",
+                    "type": "object",
+                    "properties": {
+                        "a": {"type": "array", "items": [{"type": "string"}]},
+                        "b": {"type": "array", "items": [{"type": "string"}]},
+                        "c": {"type": "array", "items": [{"type": "string"}]},
+                        "d": {"type": "array", "items": [{"type": "integer"}]},
+                    },
+                    "required": ["a", "b"],
+                }
+            )
+        )
+        assert isinstance(schema, ir.ObjectSchema)
+
+        annotation_cache = AnnotationCache()
+        class_def = create_class_node(schema, annotation_cache=annotation_cache)
+
+        a, b, c, d = [
+            statement.annotation
+            for statement in class_def.body
+            if isinstance(statement, ast.AnnAssign)
+        ]
+        assert a is b
+        assert isinstance(c, ast.Subscript) and c.slice is a
+        assert len(annotation_cache) == 4
+
+        assert ast.unparse(class_def) == ast.unparse(create_class_node(schema))
@@ -1,11 +1,11 @@
 import ast
 
-from json_schema_to_python import json_schema
+from json_schema_to_python.json_schema import ir
 from json_schema_to_python.ast.literal_node import create_literal_node
 
 
 def create_enum_node(
-    schema: json_schema.types.EnumableSchema,
+    schema: ir.EnumableSchema,
 ) -> ast.Assign:
     assert schema.enum is not None
 
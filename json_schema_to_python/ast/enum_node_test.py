@@ -2,13 +2,17 @@ import ast
 import textwrap
 import unittest
 
+from json_schema_to_python.json_schema import ir
 from json_schema_to_python.json_schema.types import EnumableSchema, StringSchema
 from .enum_node import create_enum_node
 
 
 class Test_create_enum_class_def(unittest.TestCase):
     def _get_class_str(self, schema: EnumableSchema) -> str:
-        class_def = create_enum_node(schema)
+        ir_schema = ir.from_schema(schema)
+        assert ir.is_enum(ir_schema)
+
+        class_def = create_enum_node(ir_schema)
         return ast.unparse(class_def)
 
     def test_string_enum(self) -> None:
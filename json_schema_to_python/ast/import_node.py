@@ -1,42 +1,136 @@
 import ast
+from typing import Mapping
 
 from .types import AstName
 
+# The modules that the names models can use are imported from, in the order
+# their imports are written
+_imported_names_by_module = {
+    "enum": [AstName.Enum],
+    "typing": [AstName.Literal, AstName.Union],
+    "typing_extensions": [AstName.NotRequired, AstName.TypedDict],
+}
 
-def create_import_nodes() -> list[ast.ImportFrom]:
+_modules_by_name = {
+    name.id: module
+    for module, names in _imported_names_by_module.items()
+    for name in names
+}
+
+
+def create_import_nodes(
+    used_names: Mapping[str, bool] | None = None,
+    should_gate_typing_imports: bool = False,
+) -> list[ast.stmt]:
+    """
+    Create import ASTs
+
+    Args:
+        used_names: The names that the module uses (see `get_used_names`).
+            Defaults to every name that models can use.
+        should_gate_typing_imports: Import the names that are only used in
+            annotations under `if TYPE_CHECKING:`. The module imports faster,
+            but those annotations can't be evaluated at runtime (e.g. by
+            `typing.get_type_hints`).
+    """
+
+    if used_names is None:
+        used_names = dict.fromkeys(_modules_by_name, True)
+
+    runtime_names: dict[str, list[str]] = {}
+    type_checking_names: dict[str, list[str]] = {}
+
+    for module, names in _imported_names_by_module.items():
+        for name in names:
+            is_runtime = used_names.get(name.id)
+
+            if is_runtime is None:
+                continue
+
+            if is_runtime or not should_gate_typing_imports:
+                runtime_names.setdefault(module, []).append(name.id)
+            else:
+                type_checking_names.setdefault(module, []).append(name.id)
+
+    if len(type_checking_names) > 0:
+        runtime_names.setdefault("typing", []).append("TYPE_CHECKING")
+
+    nodes: list[ast.stmt] = [
+        ast.ImportFrom(
+            level=0,
+            module="__future__",
+            names=[ast.alias(name="annotations")],
+        ),
+        *_create_import_from_nodes(runtime_names),
+    ]
+
+    if len(type_checking_names) > 0:
+        nodes.append(
+            ast.If(
+                test=ast.Name(id="TYPE_CHECKING", ctx=ast.Load()),
+                body=_create_import_from_nodes(type_checking_names),
+                orelse=[],
+            )
+        )
+
+    return nodes
+
+
+def _create_import_from_nodes(names_by_module: dict[str, list[str]]) -> list[ast.stmt]:
+    return [
+        ast.ImportFrom(
+            level=0,
+            module=module,
+            names=[ast.alias(name=name) for name in sorted(names)],
+        )
+        for module, names in sorted(names_by_module.items())
+    ]
+
+
+def get_used_names(node: ast.stmt) -> dict[str, bool]:
+    """
+    Get the names from `create_import_nodes` that a model's node uses, and
+    whether each is used at runtime rather than only in annotations. Models'
+    annotations aren't evaluated, because of `from __future__ import
+    annotations`.
+    """
+
+    runtime_expressions: list[ast.AST]
+    annotations: list[ast.expr] = []
+
+    if isinstance(node, ast.ClassDef):
+        runtime_expressions = [*node.bases, *node.keywords, *node.decorator_list]
+
+        for statement in node.body:
+            if isinstance(statement, ast.AnnAssign):
+                annotations.append(statement.annotation)
+
+                if statement.value is not None:
+                    runtime_expressions.append(statement.value)
+            else:
+                runtime_expressions.append(statement)
+    else:
+        runtime_expressions = [node]
+
+    used_names: dict[str, bool] = {}
+
+    for annotation in annotations:
+        for child in ast.walk(annotation):
+            if isinstance(child, ast.Name) and child.id in _modules_by_name:
+                used_names.setdefault(child.id, False)
+
+    for expression in runtime_expressions:
+        for child in ast.walk(expression):
+            if isinstance(child, ast.Name) and child.id in _modules_by_name:
+                used_names[child.id] = True
+
+    return used_names
+
+
+def add_used_names(used_names: dict[str, bool], names: Mapping[str, bool]) -> None:
     """
-    Create import ASTs. These are static and will appear in the outputted file
-    even if they aren't used.
+    Add the names one node uses to the names a module uses
     """
 
-    future_import = ast.ImportFrom(
-        level=0,
-        module="__future__",
-        names=[AstName.annotations],
-    )
-
-    enum_import = ast.ImportFrom(
-        level=0,
-        module="enum",
-        names=[AstName.Enum],
-    )
-
-    typing_import = ast.ImportFrom(
-        level=0,
-        module="typing",
-        names=[
-            AstName.Literal,
-            AstName.Union,
-        ],
-    )
-
-    typing_extensions_import = ast.ImportFrom(
-        level=0,
-        module="typing_extensions",
-        names=[
-            AstName.NotRequired,
-            AstName.TypedDict,
-        ],
-    )
-
-    return [future_import, enum_import, typing_import, typing_extensions_import]
+    for name, is_runtime in names.items():
+        used_names[name] = used_names.get(name, False) or is_runtime
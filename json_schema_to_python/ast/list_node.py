@@ -1,11 +1,11 @@
 import ast
 
-from json_schema_to_python import json_schema
+from json_schema_to_python.json_schema import ir
 from .types import AstName, convert_json_schema_type_to_ast_name
 from .union_node import create_union_node
 
 
-def create_list(schema: json_schema.types.ArraySchema) -> ast.Subscript:
+def create_list(schema: ir.ArraySchema) -> ast.Subscript:
     """
     Create a `list` AST node
     """
@@ -27,7 +27,7 @@ def create_list(schema: json_schema.types.ArraySchema) -> ast.Subscript:
 
         subschema = schema.items[0]
 
-        if isinstance(subschema, json_schema.types.AllOfSchema):
+        if isinstance(subschema, ir.AllOfSchema):
             """
             Example:
                 ```
@@ -47,7 +47,7 @@ def create_list(schema: json_schema.types.ArraySchema) -> ast.Subscript:
             """
 
             raise NotImplementedError("nested allOf")
-        elif isinstance(subschema, json_schema.types.AnyOfSchema):
+        elif isinstance(subschema, ir.AnyOfSchema):
             """
             Example:
                 ```
@@ -67,7 +67,7 @@ def create_list(schema: json_schema.types.ArraySchema) -> ast.Subscript:
             """
 
             raise NotImplementedError("nested anyOf")
-        elif isinstance(subschema, json_schema.types.TypelessSchema):
+        elif isinstance(subschema, ir.TypelessSchema):
             """
             Example:
 
@@ -77,7 +77,7 @@ def create_list(schema: json_schema.types.ArraySchema) -> ast.Subscript:
             """
 
             slice = ast.Name(id=subschema.get_schema_name())
-        elif isinstance(subschema.type, list):
+        elif isinstance(subschema.type, tuple):
             """
             Example:
 
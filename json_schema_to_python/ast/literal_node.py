@@ -1,11 +1,11 @@
 import ast
 
-from json_schema_to_python import json_schema
+from json_schema_to_python.json_schema import ir
 from .types import AstName
 
 
 def create_literal_node(
-    schema: json_schema.types.EnumableSchema,
+    schema: ir.EnumableSchema,
 ) -> ast.Subscript:
     """
     Create a `Literal` AST node
@@ -1,30 +1,101 @@
 import ast
-from json_schema_to_python.json_schema.types import (
-    ObjectSchema,
-    Schema,
-    is_enum,
-)
+from typing import Iterable
+
+from json_schema_to_python.json_schema import MergeCache, ir
+from json_schema_to_python.json_schema.resolve import RefResolver
+from json_schema_to_python.json_schema.types import Schema
+from .attribute_node import AnnotationCache
 from .class_node import create_class_node
 from .enum_node import create_enum_node
-from .import_node import create_import_nodes
+from .import_node import add_used_names, create_import_nodes, get_used_names
+
+
+def create_module_node(
+    model_schemas: Iterable[Schema],
+    resolver: RefResolver | None = None,
+    merge_cache: MergeCache | None = None,
+    should_gate_typing_imports: bool = False,
+) -> ast.Module:
+    """
+    Args:
+        merge_cache: Reuse `allOf` merges, e.g. across runs in a long-running
+            process. Defaults to a cache for this module only.
+        should_gate_typing_imports: See `create_import_nodes`
+    """
+
+    if merge_cache is None:
+        merge_cache = MergeCache()
 
+    # Properties with the same type share an annotation node
+    annotation_cache = AnnotationCache()
 
-def create_module_node(model_schemas: list[Schema]) -> ast.Module:
-    class_nodes = [
-        create_class_node(schema)
-        for schema in model_schemas
-        if isinstance(schema, ObjectSchema)
-    ]
+    class_nodes: list[ast.stmt] = []
+    enum_nodes: list[ast.stmt] = []
+    used_names: dict[str, bool] = {}
 
-    enum_nodes = [
-        create_enum_node(schema) for schema in model_schemas if is_enum(schema)
-    ]
+    # Single pass so that schemas can be streamed in and dropped once their
+    # node is built
+    for model_schema in model_schemas:
+        node = create_model_node(
+            model_schema,
+            resolver,
+            merge_cache,
+            annotation_cache,
+        )
+
+        if node is None:
+            continue
+
+        if isinstance(node, ast.ClassDef):
+            class_nodes.append(node)
+        else:
+            enum_nodes.append(node)
+
+        add_used_names(used_names, get_used_names(node))
 
     return ast.Module(
         body=[
-            *create_import_nodes(),
+            *create_import_nodes(used_names, should_gate_typing_imports),
             *class_nodes,
             *enum_nodes,
         ],
         type_ignores=[],
     )
+
+
+def create_model_node(
+    model_schema: Schema,
+    resolver: RefResolver | None = None,
+    merge_cache: MergeCache | None = None,
+    annotation_cache: AnnotationCache | None = None,
+) -> ast.ClassDef | ast.Assign | None:
+    """
+    Create the node for a model: a class for an object schema, or an alias for
+    an enum. Other schemas don't get a node.
+    """
+
+    return create_ir_model_node(
+        ir.from_schema(model_schema),
+        resolver,
+        merge_cache,
+        annotation_cache,
+    )
+
+
+def create_ir_model_node(
+    schema: ir.Schema,
+    resolver: RefResolver | None = None,
+    merge_cache: MergeCache | None = None,
+    annotation_cache: AnnotationCache | None = None,
+) -> ast.ClassDef | ast.Assign | None:
+    """
+    Like `create_model_node`, for a schema that's already been converted
+    """
+
+    if isinstance(schema, ir.ObjectSchema):
+        return create_class_node(schema, resolver, merge_cache, annotation_cache)
+
+    if ir.is_enum(schema):
+        return create_enum_node(schema)
+
+    return None
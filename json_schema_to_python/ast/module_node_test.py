@@ -8,64 +8,32 @@ from .module_node import create_module_node
 
 
 class Test_create_module_node(unittest.TestCase):
-    def assert_module_str(self, schemas: list[Schema], expectation: str):
+    def assert_module_str(
+        self,
+        schemas: list[Schema],
+        expectation: str,
+        should_gate_typing_imports: bool = False,
+    ):
         # Dedent until at least 1 line is unindented
         expectation = textwrap.dedent(expectation)
 
         # Remove leading and trailing newlines
         expectation = expectation.strip()
 
-        class_def = create_module_node(schemas)
+        class_def = create_module_node(
+            schemas,
+            should_gate_typing_imports=should_gate_typing_imports,
+        )
         assert ast.unparse(class_def) == expectation
 
     def test_object_and_enum(self) -> None:
-        schemas = [
-            create_schema_from_dict(
-                {
-                    "id": "#Animal",
-                    "type": "object",
-                    "properties": {
-                        "is_adorable": {"type": "boolean"},
-                        "species": {"$ref": "#Species"},
-                        "weight": {"type": "number"},
-                    },
-                },
-            ),
-            create_schema_from_dict(
-                {
-                    "id": "#Pet",
-                    "type": "object",
-                    "$ref": "#Animal",
-                    "properties": {
-                        "id": {"type": "integer"},
-                        "name": {"type": "string"},
-                        "toys": {"type": "array", "items": [{"ref": "#Toy"}]},
-                    },
-                    "required": ["id", "is_adorable", "name", "species", "toys"],
-                },
-            ),
-            create_schema_from_dict(
-                {
-                    "id": "#Species",
-                    "type": "string",
-                    "enum": ["cat", "dog"],
-                },
-            ),
-            create_schema_from_dict(
-                {
-                    "id": "#Toy",
-                    "type": "object",
-                    "properties": {"is_squeaky": {"type": "boolean"}},
-                },
-            ),
-        ]
+        schemas = _create_schemas()
 
         self.assert_module_str(
             schemas,
             """
             from __future__ import annotations
-            from enum import Enum
-            from typing import Literal, Union
+            from typing import Literal
             from typing_extensions import NotRequired, TypedDict
 
             class Animal(TypedDict):
@@ -83,3 +51,78 @@ class Test_create_module_node(unittest.TestCase):
             Species = Literal['cat', 'dog']
             """,
         )
+
+    def test_gated_typing_imports(self) -> None:
+        """
+        Names only used in annotations are imported for type checkers only.
+        Literal is still imported, since the enum alias uses it at runtime.
+        """
+
+        self.assert_module_str(
+            _create_schemas(),
+            """
+            from __future__ import annotations
+            from typing import Literal, TYPE_CHECKING
+            from typing_extensions import TypedDict
+            if TYPE_CHECKING:
+                from typing_extensions import NotRequired
+
+            class Animal(TypedDict):
+                is_adorable: NotRequired[bool]
+                species: NotRequired[Species]
+                weight: NotRequired[float]
+
+            class Pet(Animal):
+                id: int
+                name: str
+                toys: list[Toy]
+
+            class Toy(TypedDict):
+                is_squeaky: NotRequired[bool]
+            Species = Literal['cat', 'dog']
+            """,
+            should_gate_typing_imports=True,
+        )
+
+
+def _create_schemas() -> list[Schema]:
+    return [
+        create_schema_from_dict(
+            {
+                "id": "#Animal",
+                "type": "object",
+                "properties": {
+                    "is_adorable": {"type": "boolean"},
+                    "species": {"$ref": "#Species"},
+                    "weight": {"type": "number"},
+                },
+            },
+        ),
+        create_schema_from_dict(
+            {
+                "id": "#Pet",
+                "type": "object",
+                "$ref": "#Animal",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "name": {"type": "string"},
+                    "toys": {"type": "array", "items": [{"ref": "#Toy"}]},
+                },
+                "required": ["id", "is_adorable", "name", "species", "toys"],
+            },
+        ),
+        create_schema_from_dict(
+            {
+                "id": "#Species",
+                "type": "string",
+                "enum": ["cat", "dog"],
+            },
+        ),
+        create_schema_from_dict(
+            {
+                "id": "#Toy",
+                "type": "object",
+                "properties": {"is_squeaky": {"type": "boolean"}},
+            },
+        ),
+    ]
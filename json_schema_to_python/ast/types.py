@@ -1,33 +1,51 @@
 import ast
 
 
+def _create_shared_name(id: str) -> ast.Name:
+    """
+    Create a `Name` node that's shared between trees. Its context and location
+    are set up front, so that nothing (e.g. `ast.fix_missing_locations` or
+    `compile`) needs to set them on it. Shared nodes must never be mutated.
+    """
+
+    return ast.Name(
+        id=id,
+        ctx=ast.Load(),
+        lineno=1,
+        col_offset=0,
+        end_lineno=1,
+        end_col_offset=len(id),
+    )
+
+
 class AstName:
-    annotations = ast.Name(id="annotations")
-    bool = ast.Name(id="bool")
-    dict = ast.Name(id="dict")
-    Enum = ast.Name(id="Enum")
-    float = ast.Name(id="float")
-    int = ast.Name(id="int")
-    list = ast.Name(id="list")
-    Literal = ast.Name(id="Literal")
-    none = ast.Name(id="None")
-    NotRequired = ast.Name(id="NotRequired")
-    Optional = ast.Name(id="Optional")
-    str = ast.Name(id="str")
-    TypedDict = ast.Name(id="TypedDict")
-    Union = ast.Name(id="Union")
+    annotations = _create_shared_name("annotations")
+    bool = _create_shared_name("bool")
+    dict = _create_shared_name("dict")
+    Enum = _create_shared_name("Enum")
+    float = _create_shared_name("float")
+    int = _create_shared_name("int")
+    list = _create_shared_name("list")
+    Literal = _create_shared_name("Literal")
+    none = _create_shared_name("None")
+    NotRequired = _create_shared_name("NotRequired")
+    Optional = _create_shared_name("Optional")
+    str = _create_shared_name("str")
+    TypedDict = _create_shared_name("TypedDict")
+    Union = _create_shared_name("Union")
 
 
-def convert_json_schema_type_to_ast_name(json_schema_type: str) -> ast.Name:
-    _json_schema_type_to_ast_name = {
-        "boolean": AstName.bool,
-        "object": AstName.dict,
-        "integer": AstName.int,
-        "null": AstName.none,
-        "number": AstName.float,
-        "string": AstName.str,
-    }
+_json_schema_type_to_ast_name = {
+    "boolean": AstName.bool,
+    "object": AstName.dict,
+    "integer": AstName.int,
+    "null": AstName.none,
+    "number": AstName.float,
+    "string": AstName.str,
+}
+
 
+def convert_json_schema_type_to_ast_name(json_schema_type: str) -> ast.Name:
     ast_name = _json_schema_type_to_ast_name.get(json_schema_type)
 
     if ast_name is None:
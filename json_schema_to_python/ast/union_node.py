@@ -1,16 +1,17 @@
 import ast
+from typing import Sequence
 
-from json_schema_to_python import json_schema
-from json_schema_to_python.json_schema.types import (
+from json_schema_to_python.json_schema import ir
+from json_schema_to_python.json_schema.ir import (
     is_list_of_schemas,
     is_list_of_schema_types,
-    SchemaType,
 )
+from json_schema_to_python.json_schema.types import SchemaType
 from .types import AstName, convert_json_schema_type_to_ast_name
 
 
 def create_union_node(
-    schemas: list[json_schema.types.Schema] | list[SchemaType],
+    schemas: Sequence[ir.Schema] | Sequence[SchemaType],
 ) -> ast.Subscript:
     """
     Create a `Union` AST node
@@ -33,7 +34,7 @@ def create_union_node(
         """
 
         for schema in schemas:
-            if isinstance(schema, json_schema.types.AllOfSchema):
+            if isinstance(schema, ir.AllOfSchema):
                 """
                 Example:
                     ```
@@ -53,7 +54,7 @@ def create_union_node(
                 """
 
                 raise NotImplementedError("nested allOf")
-            elif isinstance(schema, json_schema.types.AnyOfSchema):
+            elif isinstance(schema, ir.AnyOfSchema):
                 """
                 Example:
                     ```
@@ -73,7 +74,7 @@ def create_union_node(
                 """
 
                 raise NotImplementedError("nested anyOf")
-            elif isinstance(schema, json_schema.types.TypelessSchema):
+            elif isinstance(schema, ir.TypelessSchema):
                 """
                 Example:
 
@@ -83,7 +84,7 @@ def create_union_node(
                 """
 
                 dims.append(ast.Name(id=schema.get_schema_name()))
-            elif isinstance(schema.type, list):
+            elif isinstance(schema.type, tuple):
                 """
                 Example:
 
@@ -1,12 +1,18 @@
 import argparse
+import json
 import logging
+import sys
+from typing import TYPE_CHECKING, Any, Iterable
 
-import black
+# Only what's needed to parse arguments is imported up front, so that --help
+# and converting with a daemon are quick. The rest is imported by `_main`.
+from json_schema_to_python.client import convert_with_daemon
+from json_schema_to_python.defaults import DEFAULT_SHARD_SIZE, EMITTER_NAMES
+from json_schema_to_python.json_schema.decode import DECODER_NAMES
 
-from json_schema_to_python import (
-    convert_schemas_to_file_content,
-    load_model_schemas,
-)
+if TYPE_CHECKING:
+    from json_schema_to_python.json_schema import RefResolver
+    from json_schema_to_python.json_schema.types import Schema
 
 parser = argparse.ArgumentParser()
 parser.add_argument(
@@ -17,15 +23,135 @@ parser.add_argument(
 parser.add_argument(
     "--input",
     "-i",
-    help="Input JSON Schema file path",
+    help='Input JSON Schema file path, or "-" for stdin',
     required=True,
 )
+parser.add_argument(
+    "--only",
+    help=(
+        "Comma-separated schema names to generate, along with the schemas they "
+        "reference"
+    ),
+)
 parser.add_argument("--output", "-o", help="Output Python file path")
 parser.add_argument(
     "--silent",
     help="Silence logging",
     action="store_true",
 )
+parser.add_argument(
+    "--decoder",
+    help="JSON decoder (ignored with --stream). Defaults to the fastest installed",
+    choices=["auto", *DECODER_NAMES],
+    default="auto",
+)
+parser.add_argument(
+    "--stream",
+    help="Parse the input one model at a time to bound memory use",
+    action="store_true",
+)
+parser.add_argument(
+    "--no-cache",
+    help=(
+        "Don't reuse schemas loaded from the same input, or statements "
+        "formatted, in an earlier run (cached under "
+        "$XDG_CACHE_HOME/json-schema-to-python)"
+    ),
+    action="store_true",
+)
+parser.add_argument(
+    "--emitter",
+    help=(
+        'How to write the output. "direct" writes it already formatted, without '
+        "ast.unparse or black, and ignores --no-format"
+    ),
+    choices=EMITTER_NAMES,
+    default="ast",
+)
+parser.add_argument(
+    "--jobs",
+    "-j",
+    help="Number of processes to generate models in",
+    type=int,
+    default=1,
+)
+parser.add_argument(
+    "--incremental",
+    help=(
+        "Only generate the models whose schemas changed since the last "
+        "--incremental run, keeping a manifest next to the output"
+    ),
+    action="store_true",
+)
+parser.add_argument(
+    "--package",
+    help=(
+        "Write a package to --output, a directory, with models split into "
+        "modules along the refs between them"
+    ),
+    action="store_true",
+)
+parser.add_argument(
+    "--shard-size",
+    help="Number of models per module with --package",
+    type=int,
+    default=DEFAULT_SHARD_SIZE,
+)
+parser.add_argument(
+    "--type-checking-imports",
+    help=(
+        "Import names that are only used in annotations under "
+        '"if TYPE_CHECKING:". Faster to import, but the annotations can\'t be '
+        "evaluated at runtime (e.g. by typing.get_type_hints)"
+    ),
+    action="store_true",
+)
+parser.add_argument(
+    "--watch",
+    help=(
+        "Keep running, and write --output again each time the input or a "
+        "document it references changes. Only the models whose schemas changed "
+        "are generated."
+    ),
+    action="store_true",
+)
+parser.add_argument(
+    "--poll-interval",
+    help=(
+        "With --watch, check the input for changes every this many seconds "
+        "instead of using inotify"
+    ),
+    type=float,
+)
+parser.add_argument(
+    "--no-daemon",
+    help=(
+        "Don't convert with the daemon (python -m json_schema_to_python.daemon) "
+        "even if one is running. It's only used without --stream, "
+        "--incremental, --package, --watch, --no-cache and --jobs, and if it "
+        "runs the same versions of this package and black; otherwise the "
+        "conversion is local."
+    ),
+    action="store_true",
+)
+parser.add_argument(
+    "--profile",
+    help=(
+        "Write the wall and CPU time and peak memory of each stage (load, "
+        "extract, build, unparse, format, write), and counts of events like "
+        "failed schema parses and merges, as JSON to this file, or to stderr "
+        "without one. Tracing memory slows the run down. The daemon isn't "
+        "used, and events in --jobs workers aren't counted."
+    ),
+    nargs="?",
+    const="-",
+    metavar="PATH",
+)
+parser.add_argument(
+    "--cprofile",
+    help="Write cProfile stats of the run to this file, e.g. for pstats",
+    metavar="PATH",
+)
 
 
 def _main(
@@ -34,13 +160,131 @@ def _main(
     input_path: str,
     output_path: str | None = None,
     should_format: bool,
+    should_stream: bool = False,
+    decoder: str = "auto",
+    only: list[str] | None = None,
+    should_cache: bool = False,
+    emitter: str = "ast",
+    jobs: int = 1,
+    is_incremental: bool = False,
+    is_package: bool = False,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    should_gate_typing_imports: bool = False,
+    should_watch: bool = False,
+    poll_interval: float | None = None,
+    should_use_daemon: bool = False,
 ) -> None:
-    schemas = load_model_schemas(logger, input_path)
-    content = convert_schemas_to_file_content(schemas)
+    if should_watch:
+        from json_schema_to_python.formatting import FormatCache
+        from json_schema_to_python.watch import watch
+
+        assert output_path is not None
+        watch(
+            logger,
+            input_path,
+            output_path,
+            decoder,
+            only,
+            emitter=emitter,
+            should_format=should_format,
+            should_gate_typing_imports=should_gate_typing_imports,
+            format_cache=FormatCache(logger=logger) if should_cache else None,
+            poll_interval=poll_interval,
+        )
+        return
+
+    # The daemon always caches, and converts each input in one process
+    if should_use_daemon and not (
+        should_stream or is_package or is_incremental or not should_cache or jobs > 1
+    ):
+        result = convert_with_daemon(
+            input_path,
+            decoder=decoder,
+            only=only,
+            emitter=emitter,
+            should_format=should_format,
+            should_gate_typing_imports=should_gate_typing_imports,
+        )
 
-    if should_format:
-        content = black.format_str(content, mode=black.FileMode())
+        if result is not None:
+            content, warnings = result
+            for warning in warnings:
+                logger.warn(warning)
 
+            _write_content(content, output_path)
+            return
+
+    from json_schema_to_python import (
+        SchemaCache,
+        convert_schemas_to_file_content,
+        iter_model_schemas,
+        load_model_schemas_and_resolver,
+    )
+    from json_schema_to_python.formatting import FormatCache
+    from json_schema_to_python.incremental import write_file_incrementally
+    from json_schema_to_python.json_schema import profiling
+    from json_schema_to_python.package import write_package
+
+    schemas: Iterable[Schema]
+    resolver: RefResolver | None = None
+    if should_stream:
+        schemas = iter_model_schemas(logger, input_path)
+    else:
+        schemas, resolver = load_model_schemas_and_resolver(
+            logger,
+            input_path,
+            decoder,
+            only,
+            SchemaCache(logger=logger) if should_cache else None,
+        )
+
+    # Packages and incremental output are generated as they're written
+    if is_package:
+        assert output_path is not None
+        with profiling.stage("write"):
+            stats = write_package(
+                schemas,
+                output_path,
+                resolver,
+                emitter=emitter,
+                should_format=should_format,
+                jobs=jobs,
+                shard_size=shard_size,
+                should_gate_typing_imports=should_gate_typing_imports,
+            )
+        logger.info(f"Wrote {stats['models']} models in {stats['shards']} shards")
+        return
+
+    if is_incremental:
+        assert output_path is not None
+        with profiling.stage("write"):
+            stats = write_file_incrementally(
+                schemas,
+                output_path,
+                resolver,
+                emitter=emitter,
+                should_format=should_format,
+                should_gate_typing_imports=should_gate_typing_imports,
+                format_cache=FormatCache(logger=logger) if should_cache else None,
+            )
+        logger.info(f"Generated {stats['generated']} of {stats['models']} models")
+        return
+
+    content = convert_schemas_to_file_content(
+        schemas,
+        resolver,
+        emitter=emitter,
+        jobs=jobs,
+        should_gate_typing_imports=should_gate_typing_imports,
+        should_format=should_format,
+        format_cache=FormatCache(logger=logger) if should_cache else None,
+    )
+
+    with profiling.stage("write"):
+        _write_content(content, output_path)
+
+
+def _write_content(content: str, output_path: str | None) -> None:
     if output_path is not None:
         with open(output_path, "w+") as f:
             f.write(content)
@@ -48,14 +292,89 @@ def _main(
         print(content)
 
 
+def _write_profile(summary: dict[str, Any], path: str) -> None:
+    text = json.dumps(summary, indent=2)
+
+    if path == "-":
+        print(text, file=sys.stderr)
+    else:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+
+
 def run_cli() -> None:
     args = parser.parse_args()
+    if args.stream and args.only is not None:
+        parser.error("--only can't be used with --stream")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.stream and args.jobs > 1:
+        parser.error("--jobs can't be used with --stream")
+    if args.incremental and args.output is None:
+        parser.error("--incremental needs --output")
+    if args.incremental and args.jobs > 1:
+        parser.error("--jobs can't be used with --incremental")
+    if args.package and args.output is None:
+        parser.error("--package needs --output")
+    if args.package and args.incremental:
+        parser.error("--incremental can't be used with --package")
+    if args.shard_size < 1:
+        parser.error("--shard-size must be at least 1")
+    if args.watch and args.output is None:
+        parser.error("--watch needs --output")
+    if args.watch and args.input == "-":
+        parser.error("--watch can't be used with stdin")
+    if args.watch and (args.stream or args.package or args.jobs > 1):
+        parser.error("--watch can't be used with --stream, --package or --jobs")
+    if args.poll_interval is not None and args.poll_interval <= 0:
+        parser.error("--poll-interval must be positive")
+    if args.watch and (args.profile is not None or args.cprofile is not None):
+        parser.error("--watch can't be used with --profile or --cprofile")
+
     logger = logging.getLogger()
     logger.disabled = args.silent
 
-    _main(
-        logger=logger,
-        input_path=args.input,
-        output_path=args.output,
-        should_format=args.no_format is not True,
-    )
+    is_profiling = args.profile is not None or args.cprofile is not None
+
+    profiler = None
+    if args.profile is not None:
+        from json_schema_to_python.json_schema.profiling import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+
+    c_profile = None
+    if args.cprofile is not None:
+        import cProfile
+
+        c_profile = cProfile.Profile()
+        c_profile.enable()
+
+    try:
+        _main(
+            logger=logger,
+            input_path=args.input,
+            output_path=args.output,
+            should_format=args.no_format is not True,
+            should_stream=args.stream,
+            decoder=args.decoder,
+            only=None if args.only is None else args.only.split(","),
+            should_cache=args.no_cache is not True,
+            emitter=args.emitter,
+            jobs=args.jobs,
+            is_incremental=args.incremental,
+            is_package=args.package,
+            shard_size=args.shard_size,
+            should_gate_typing_imports=args.type_checking_imports,
+            should_watch=args.watch,
+            poll_interval=args.poll_interval,
+            should_use_daemon=args.no_daemon is not True and not is_profiling,
+        )
+    finally:
+        if c_profile is not None:
+            c_profile.disable()
+            c_profile.dump_stats(args.cprofile)
+
+        if profiler is not None:
+            profiler.stop()
+            _write_profile(profiler.get_summary(), args.profile)
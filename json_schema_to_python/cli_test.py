@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+_HEAVY_MODULES = [
+    "asyncio",
+    "black",
+    "concurrent.futures",
+    "multiprocessing",
+    "pydantic",
+]
+
+_LOADED_MODULES_CODE = """
+import json
+import sys
+import {module_name}
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def _get_loaded_modules(module_name: str) -> list[str]:
+    """
+    Get the modules that importing a module loads, in a fresh interpreter
+    """
+
+    output = subprocess.run(
+        [sys.executable, "-c", _LOADED_MODULES_CODE.format(module_name=module_name)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    modules: list[str] = json.loads(output)
+
+    return modules
+
+
+class Test_imports(unittest.TestCase):
+    def test_lazy(self) -> None:
+        """
+        Parsing arguments, and converting with a daemon, don't import the code
+        generator or its dependencies
+        """
+
+        for module_name in ("json_schema_to_python", "json_schema_to_python.cli"):
+            with self.subTest(module_name=module_name):
+                loaded_modules = _get_loaded_modules(module_name)
+                assert [m for m in _HEAVY_MODULES if m in loaded_modules] == []
+
+
+class Test_profile(unittest.TestCase):
+    def test_profile(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "schema.json")
+            output_path = os.path.join(directory, "models.py")
+            profile_path = os.path.join(directory, "profile.json")
+
+            with open(input_path, "w") as f:
+                json.dump(
+                    {
+                        "properties": {
+                            "Person": {
+                                "id": "#Person",
+                                "type": "object",
+                                "properties": {"name": {"type": "string"}},
+                            },
+                        },
+                    },
+                    f,
+                )
+
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "json_schema_to_python",
+                    "--input",
+                    input_path,
+                    "--output",
+                    output_path,
+                    "--no-format",
+                    "--no-cache",
+                    "--profile",
+                    profile_path,
+                ],
+                check=True,
+            )
+
+            with open(profile_path) as f:
+                summary = json.load(f)
+
+            assert os.path.exists(output_path)
+
+        assert list(summary["stages"]) == [
+            "load",
+            "extract",
+            "build",
+            "unparse",
+            "write",
+        ]
+        assert summary["counts"]["schema_parses"] == 2
+
+
+class Test_daemon(unittest.TestCase):
+    def test_stdin_version_mismatch(self) -> None:
+        """
+        Stdin is converted locally when the daemon has other versions
+        """
+
+        from .daemon import Daemon
+
+        document = {
+            "properties": {
+                "Person": {
+                    "id": "#Person",
+                    "type": "object",
+                    "properties": {"name": {"type": "string"}},
+                },
+            },
+        }
+
+        async def run(daemon: Daemon, directory: str) -> str:
+            socket_path = os.path.join(directory, "daemon.sock")
+            stop = asyncio.Event()
+            server = asyncio.create_task(daemon.serve(socket_path, stop))
+
+            while not os.path.exists(socket_path):
+                await asyncio.sleep(0.01)
+
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    lambda: subprocess.run(
+                        [
+                            sys.executable,
+                            "-m",
+                            "json_schema_to_python",
+                            "--input",
+                            "-",
+                            "--no-format",
+                        ],
+                        capture_output=True,
+                        check=True,
+                        env={
+                            **os.environ,
+                            "JSON_SCHEMA_TO_PYTHON_SOCKET": socket_path,
+                            "XDG_CACHE_HOME": os.path.join(directory, "cache"),
+                        },
+                        input=json.dumps(document).encode(),
+                    ),
+                )
+            finally:
+                stop.set()
+                await server
+
+            return result.stdout.decode()
+
+        daemon = Daemon()
+        daemon.versions = {**daemon.versions, "code": "other"}
+
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                content = asyncio.run(run(daemon, directory))
+        finally:
+            daemon.close()
+
+        assert "class Person(TypedDict" in content
+        assert daemon.get_metrics()["requests"] == 0
@@ -0,0 +1,166 @@
+"""
+Client for the daemon (see `daemon.py`), which converts schemas in a process
+that's already running, instead of paying for interpreter startup and imports
+each time.
+
+This module only imports the standard library, so that using it is cheap.
+
+Requests and responses are JSON objects, one per line. A request is one of:
+
+- `{"command": "convert", "input": <absolute path>, "options": {...}}`
+- `{"command": "convert", "data": <schema JSON>, "directory": <absolute path
+  that refs to other documents are relative to>, "options": {...}}`
+- `{"command": "versions"}`
+- `{"command": "metrics"}`
+
+where the options are `convert_with_daemon`'s. Convert requests also have the
+`"versions"` that the output depends on (see `get_versions`), and a daemon
+with other versions (e.g. one started before an upgrade) rejects them. A
+response has an `"error"` message if the request failed, and
+`"version_mismatch": true` if that's why. Several requests can be sent on one
+connection.
+"""
+
+import json
+import os
+import socket
+import sys
+from typing import Any, Collection
+
+from json_schema_to_python.json_schema.version import (
+    get_black_version,
+    get_code_version,
+)
+
+_SOCKET_NAME = "json-schema-to-python.sock"
+
+
+def get_default_socket_path() -> str:
+    """
+    `$JSON_SCHEMA_TO_PYTHON_SOCKET`, or a socket in `$XDG_RUNTIME_DIR`, or else
+    one in the temporary directory that's specific to the user
+    """
+
+    path = os.environ.get("JSON_SCHEMA_TO_PYTHON_SOCKET")
+    if path:
+        return path
+
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_directory:
+        return os.path.join(runtime_directory, _SOCKET_NAME)
+
+    # Imported here, since it's slow to import
+    import tempfile
+
+    return os.path.join(tempfile.gettempdir(), f"{os.getuid()}-{_SOCKET_NAME}")
+
+
+def get_versions() -> dict[str, str | None]:
+    """
+    Get the versions of this package's code and of black, which a daemon must
+    have the same of to convert for this process
+    """
+
+    return {"code": get_code_version(), "black": get_black_version()}
+
+
+def connect(socket_path: str | None = None) -> socket.socket | None:
+    """
+    Connect to the daemon
+
+    Returns:
+        The connection, or None if no daemon is listening on the socket
+    """
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        client.connect(socket_path or get_default_socket_path())
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        return None
+
+    return client
+
+
+def send_request(client: socket.socket, request: dict[str, Any]) -> dict[str, Any]:
+    """
+    Send a request to the daemon and wait for its response
+    """
+
+    client.sendall(json.dumps(request).encode() + b"\n")
+
+    with client.makefile("rb") as f:
+        line = f.readline()
+
+    if not line:
+        raise Exception("daemon closed the connection without responding")
+
+    response: dict[str, Any] = json.loads(line)
+
+    return response
+
+
+def convert_with_daemon(
+    input_path: str,
+    socket_path: str | None = None,
+    *,
+    decoder: str = "auto",
+    only: Collection[str] | None = None,
+    emitter: str = "ast",
+    should_format: bool = True,
+    should_gate_typing_imports: bool = False,
+) -> tuple[str, list[str]] | None:
+    """
+    Convert an input with the daemon, the way `convert_schemas_to_file_content`
+    would after `load_model_schemas_and_resolver`
+
+    Args:
+        input_path: JSON Schema file path, or "-" for stdin, which is sent to
+            the daemon
+
+    Returns:
+        The module's source and the warnings from loading the schemas, or None
+        if no daemon is listening, or the one that is has other versions
+    """
+
+    client = connect(socket_path)
+
+    if client is None:
+        return None
+
+    request: dict[str, Any] = {
+        "command": "convert",
+        "versions": get_versions(),
+        "options": {
+            "decoder": decoder,
+            "only": None if only is None else sorted(only),
+            "emitter": emitter,
+            "should_format": should_format,
+            "should_gate_typing_imports": should_gate_typing_imports,
+        },
+    }
+
+    with client:
+        if input_path == "-":
+            # Stdin can only be read once, so it's only read once the daemon
+            # is known to be able to convert it, instead of being sent to one
+            # that rejects it and lost to the local conversion
+            response = send_request(client, {"command": "versions"})
+            if response.get("versions") != request["versions"]:
+                return None
+
+            request["data"] = sys.stdin.buffer.read().decode()
+            request["directory"] = os.getcwd()
+        else:
+            request["input"] = os.path.abspath(input_path)
+
+        response = send_request(client, request)
+
+    if response.get("version_mismatch"):
+        return None
+
+    if "error" in response:
+        raise Exception(f"daemon failed to convert {input_path}: {response['error']}")
+
+    return response["content"], response["warnings"]
@@ -0,0 +1,510 @@
+"""
+Serve conversions over a Unix socket, so that builds that convert schemas many
+times don't pay for interpreter startup and imports each time. See `client.py`
+for the protocol; the CLI uses a daemon when one is listening.
+
+Requests are read with asyncio, and converted in a pool of worker processes.
+Identical requests that arrive while one is being converted wait for its
+result instead of converting again. Results are kept, up to a total size, for
+as long as the documents they were loaded from don't change. Each worker keeps
+a `ModelSchemaLoader` for the inputs it converted recently, so that
+definitions that didn't change aren't parsed again, and a format cache.
+
+Usage:
+    python -m json_schema_to_python.daemon --workers 4
+    python -m json_schema_to_python.daemon --metrics
+"""
+
+import argparse
+import asyncio
+import collections
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from json_schema_to_python.json_schema.load import ModelSchemaLoader
+from .client import connect, get_default_socket_path, get_versions, send_request
+from .defaults import EMITTER_NAMES
+from .file import convert_schemas_to_file_content
+from .formatting import FormatCache
+from .write import get_file_stat
+
+# Total size of the source of the results to keep
+DEFAULT_MAX_RESULT_SIZE = 64 * 1024 * 1024
+
+# Inline schemas can be large, and are sent on one line
+_MAX_REQUEST_SIZE = 1024 * 1024 * 1024
+
+# Number of inputs each worker keeps a loader for
+_MAX_LOADERS = 8
+
+# Number of recent requests that latency percentiles are over
+_LATENCY_WINDOW = 1024
+
+# Loaders for inline schemas get a path in the directory their refs are
+# relative to, which is never read
+_INLINE_NAME = "<inline>"
+
+_DEFAULT_OPTIONS: dict[str, Any] = {
+    "decoder": "auto",
+    "only": None,
+    "emitter": "ast",
+    "should_format": True,
+    "should_gate_typing_imports": False,
+}
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--socket",
+    help="Unix socket path. Defaults to the one the CLI connects to.",
+)
+parser.add_argument(
+    "--workers",
+    help="Number of processes to convert schemas in",
+    type=int,
+    default=os.cpu_count() or 1,
+)
+parser.add_argument(
+    "--max-result-size",
+    help="Total size in bytes of the results to keep",
+    type=int,
+    default=DEFAULT_MAX_RESULT_SIZE,
+)
+parser.add_argument(
+    "--metrics",
+    help="Print the metrics of the daemon that's listening, instead of starting one",
+    action="store_true",
+)
+
+# What each worker keeps between requests
+_loaders: collections.OrderedDict[
+    tuple[str, str, tuple[str, ...] | None], ModelSchemaLoader
+] = collections.OrderedDict()
+_format_cache: FormatCache | None = None
+_warnings: list[str] = []
+
+
+class _WarningHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord) -> None:
+        _warnings.append(record.getMessage())
+
+
+# Not registered with `logging`, so that warnings only go back to the client
+_logger = logging.Logger(__name__)
+_logger.addHandler(_WarningHandler())
+
+
+class _VersionMismatchError(Exception):
+    pass
+
+
+class Daemon:
+    """
+    Converts requests (see `client.py`) in worker processes
+
+    Args:
+        workers: Number of worker processes
+        max_result_size: Total size of the source of the results to keep. The
+            least recently used are evicted past this.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_result_size: int = DEFAULT_MAX_RESULT_SIZE,
+    ) -> None:
+        if workers < 1:
+            raise Exception("workers must be at least 1")
+
+        self.workers = workers
+        self.max_result_size = max_result_size
+        # Of the code that's been imported, which clients must have too
+        self.versions = get_versions()
+        self._executor = self._create_executor()
+        # Responses by request key, with the status (see `get_file_stat`) of
+        # the documents they were loaded from
+        self._results: collections.OrderedDict[
+            str, tuple[dict[str, tuple[int, int, int] | None], dict[str, Any]]
+        ] = collections.OrderedDict()
+        self._result_size = 0
+        self._pending: dict[str, asyncio.Task[dict[str, Any]]] = {}
+        self._counts: collections.Counter[str] = collections.Counter()
+        self._latencies: collections.deque[float] = collections.deque(
+            maxlen=_LATENCY_WINDOW
+        )
+        self._start_time = time.monotonic()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # Forked workers don't import everything again
+        context = (
+            multiprocessing.get_context("fork")
+            if "fork" in multiprocessing.get_all_start_methods()
+            else None
+        )
+
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+    async def handle_request(self, request: Any) -> dict[str, Any]:
+        """
+        Get the response to a request. Failed requests get an error response.
+        """
+
+        if isinstance(request, dict) and request.get("command") == "metrics":
+            return {"metrics": self.get_metrics()}
+
+        if isinstance(request, dict) and request.get("command") == "versions":
+            return {"versions": self.versions}
+
+        start = time.perf_counter()
+        self._counts["requests"] += 1
+
+        try:
+            if not isinstance(request, dict) or request.get("command") != "convert":
+                raise Exception("unknown command")
+
+            if request.get("versions") != self.versions:
+                raise _VersionMismatchError(
+                    f"the daemon has versions {self.versions}, not "
+                    f"{request.get('versions')}"
+                )
+
+            response = await self._convert(request)
+        except _VersionMismatchError as e:
+            self._counts["errors"] += 1
+            response = {"error": str(e), "version_mismatch": True}
+        except Exception as e:
+            self._counts["errors"] += 1
+            response = {"error": str(e) or type(e).__name__}
+
+        self._latencies.append(time.perf_counter() - start)
+
+        return response
+
+    async def _convert(self, request: dict[str, Any]) -> dict[str, Any]:
+        options = _get_options(request.get("options", {}))
+        data: bytes | None = None
+        dependencies: dict[str, tuple[int, int, int] | None] = {}
+
+        if "data" in request:
+            inline_data: bytes = request["data"].encode()
+            data = inline_data
+            path = os.path.join(request["directory"], _INLINE_NAME)
+            identity = hashlib.sha256(inline_data).hexdigest()
+        else:
+            path = request["input"]
+            # Taken before the input is read, so that a change while it's read
+            # invalidates the result
+            dependencies[path] = get_file_stat(path)
+            identity = repr(dependencies[path])
+
+        key = hashlib.sha256(
+            json.dumps([path, identity, options], sort_keys=True).encode()
+        ).hexdigest()
+
+        result = self._results.get(key)
+        if result is not None and all(
+            get_file_stat(dependency) == stat for dependency, stat in result[0].items()
+        ):
+            self._results.move_to_end(key)
+            self._counts["result_hits"] += 1
+
+            return result[1]
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._run_conversion(key, path, data, options, dependencies)
+            )
+            self._pending[key] = task
+        else:
+            self._counts["coalesced"] += 1
+
+        # A client that disconnects doesn't cancel the conversion for the
+        # others waiting for it
+        return await asyncio.shield(task)
+
+    async def _run_conversion(
+        self,
+        key: str,
+        path: str,
+        data: bytes | None,
+        options: dict[str, Any],
+        dependencies: dict[str, tuple[int, int, int] | None],
+    ) -> dict[str, Any]:
+        self._counts["conversions"] += 1
+        executor = self._executor
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor,
+                _convert,
+                path,
+                data,
+                options,
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. it was killed), so the pool can't be used
+            if self._executor is executor:
+                self._executor = self._create_executor()
+
+            raise Exception("worker process exited")
+        finally:
+            del self._pending[key]
+
+        response = {"content": result["content"], "warnings": result["warnings"]}
+        self._add_result(key, {**dependencies, **result["documents"]}, response)
+
+        return response
+
+    def _add_result(
+        self,
+        key: str,
+        dependencies: dict[str, tuple[int, int, int] | None],
+        response: dict[str, Any],
+    ) -> None:
+        previous = self._results.pop(key, None)
+        if previous is not None:
+            self._result_size -= len(previous[1]["content"])
+
+        self._results[key] = (dependencies, response)
+        self._result_size += len(response["content"])
+
+        while self._result_size > self.max_result_size:
+            _, (_, evicted) = self._results.popitem(last=False)
+            self._result_size -= len(evicted["content"])
+
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        Get counts of the requests and how they were served, the sizes of the
+        caches, and latency percentiles over recent requests
+        """
+
+        latencies = sorted(self._latencies)
+
+        def get_percentile(fraction: float) -> float:
+            index = min(len(latencies) - 1, int(fraction * len(latencies)))
+            return latencies[index] * 1e3
+
+        latency_ms: dict[str, float] = {}
+        if len(latencies) > 0:
+            latency_ms = {
+                "mean": sum(latencies) / len(latencies) * 1e3,
+                "p50": get_percentile(0.5),
+                "p90": get_percentile(0.9),
+                "p99": get_percentile(0.99),
+                "max": latencies[-1] * 1e3,
+            }
+
+        return {
+            "uptime": time.monotonic() - self._start_time,
+            "workers": self.workers,
+            "requests": self._counts["requests"],
+            "errors": self._counts["errors"],
+            "conversions": self._counts["conversions"],
+            "result_hits": self._counts["result_hits"],
+            "coalesced": self._counts["coalesced"],
+            "in_flight": len(self._pending),
+            "results": len(self._results),
+            "result_size": self._result_size,
+            "latency_ms": latency_ms,
+        }
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response: dict[str, Any] = {"error": "invalid request"}
+                else:
+                    response = await self.handle_request(request)
+
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # The client went away, or sent a line that's too long
+            pass
+        finally:
+            writer.close()
+
+    async def serve(
+        self,
+        socket_path: str | None = None,
+        stop: asyncio.Event | None = None,
+    ) -> None:
+        """
+        Serve requests on a Unix socket until `stop` is set. The socket is
+        only accessible to the current user, and is removed afterwards.
+        """
+
+        socket_path = socket_path or get_default_socket_path()
+        _remove_stale_socket(socket_path)
+
+        umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(
+                self._handle_connection,
+                socket_path,
+                limit=_MAX_REQUEST_SIZE,
+            )
+        finally:
+            os.umask(umask)
+
+        try:
+            async with server:
+                await (stop or asyncio.Event()).wait()
+        finally:
+            os.remove(socket_path)
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+
+def _get_options(options: Any) -> dict[str, Any]:
+    """
+    Validate a request's options, and fill in the defaults
+    """
+
+    if not isinstance(options, dict):
+        raise Exception("options must be an object")
+
+    for name in options:
+        if name not in _DEFAULT_OPTIONS:
+            raise Exception(f"unknown option {name}")
+
+    options = {**_DEFAULT_OPTIONS, **options}
+
+    if options["emitter"] not in EMITTER_NAMES:
+        raise Exception(f"unknown emitter {options['emitter']}")
+
+    if options["only"] is not None:
+        options["only"] = sorted(options["only"])
+
+    return options
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Remove a socket left behind by a daemon that exited without removing it
+
+    Raises:
+        If a daemon is listening on the socket
+    """
+
+    client = connect(socket_path)
+
+    if client is not None:
+        client.close()
+        raise Exception(f"a daemon is already listening on {socket_path}")
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+
+def _convert(path: str, data: bytes | None, options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert an input, in a worker
+
+    Returns:
+        The module's source, the warnings from loading the schemas, and the
+        status of the documents that the input references
+    """
+
+    global _format_cache
+
+    only = options["only"]
+    loader_key = (path, options["decoder"], None if only is None else tuple(only))
+
+    loader = _loaders.pop(loader_key, None)
+    if loader is None:
+        # Each conversion returns all of its warnings, as a local run logs
+        loader = ModelSchemaLoader(
+            _logger,
+            path,
+            options["decoder"],
+            only,
+            should_repeat_warnings=True,
+        )
+
+    _loaders[loader_key] = loader
+    while len(_loaders) > _MAX_LOADERS:
+        _loaders.popitem(last=False)
+
+    if _format_cache is None:
+        _format_cache = FormatCache()
+
+    _warnings.clear()
+    schemas, resolver = loader.load(data)
+    content = convert_schemas_to_file_content(
+        schemas,
+        resolver,
+        emitter=options["emitter"],
+        should_gate_typing_imports=options["should_gate_typing_imports"],
+        should_format=options["should_format"],
+        format_cache=_format_cache,
+    )
+
+    root_path = os.path.abspath(path)
+
+    return {
+        "content": content,
+        "warnings": list(_warnings),
+        "documents": {
+            document: get_file_stat(document)
+            for document in loader.documents
+            if document != root_path
+        },
+    }
+
+
+async def _serve_until_signal(daemon: Daemon, socket_path: str | None) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stop.set)
+
+    await daemon.serve(socket_path, stop)
+
+
+def main() -> None:
+    args = parser.parse_args()
+
+    if args.metrics:
+        client = connect(args.socket)
+        if client is None:
+            parser.error("no daemon is listening")
+
+        with client:
+            response = send_request(client, {"command": "metrics"})
+
+        print(json.dumps(response["metrics"], indent=2))
+        return
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    daemon = Daemon(args.workers, args.max_result_size)
+    try:
+        asyncio.run(_serve_until_signal(daemon, args.socket))
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
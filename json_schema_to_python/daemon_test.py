@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from typing import Any
+
+from .client import convert_with_daemon, get_versions
+from .daemon import Daemon
+from .file import convert_schemas_to_file_content
+from .json_schema.load import load_model_schemas_and_resolver
+
+
+def _create_document(name: str) -> dict[str, Any]:
+    return {
+        "properties": {
+            name: {
+                "id": f"#{name}",
+                "type": "object",
+                "properties": {"address": {"$ref": "common.json#Address"}},
+            },
+            "Skipped": {"type": "string"},
+        },
+    }
+
+
+class Test_Daemon(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.directory.name, "schema.json")
+        self.common_path = os.path.join(self.directory.name, "common.json")
+        self.socket_path = os.path.join(self.directory.name, "daemon.sock")
+
+        self.write(self.input_path, _create_document("Person"))
+        self.write(self.common_path, self.create_common_document("string"))
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, path: str, document: dict[str, Any]) -> None:
+        with open(path, "w") as f:
+            json.dump(document, f)
+
+    def create_common_document(self, country_type: str) -> dict[str, Any]:
+        return {
+            "properties": {
+                "Address": {
+                    "id": "#Address",
+                    "type": "object",
+                    "properties": {"country": {"type": country_type}},
+                },
+            },
+        }
+
+    def get_expected(self) -> str:
+        schemas, resolver = load_model_schemas_and_resolver(
+            mock.Mock(),
+            self.input_path,
+        )
+
+        return convert_schemas_to_file_content(schemas, resolver, should_format=True)
+
+    def test_requests(self) -> None:
+        async def run(daemon: Daemon) -> None:
+            request = {
+                "command": "convert",
+                "input": self.input_path,
+                "versions": get_versions(),
+            }
+
+            # The second waits for the first's conversion
+            first, second = await asyncio.gather(
+                daemon.handle_request(request),
+                daemon.handle_request(request),
+            )
+            assert first == second
+            assert first["content"] == self.get_expected()
+            assert first["warnings"] == ["skipping schema: no id"]
+
+            assert await daemon.handle_request(request) == first
+
+            # Changing a referenced document invalidates the result
+            self.write(self.common_path, self.create_common_document("integer"))
+            changed = await daemon.handle_request(request)
+            assert changed["content"] == self.get_expected()
+            assert changed["content"] != first["content"]
+            assert changed["warnings"] == ["skipping schema: no id"]
+
+            assert "error" in await daemon.handle_request(
+                {**request, "options": {"x": 1}}
+            )
+
+            # A client with other versions (e.g. after an upgrade) is rejected
+            mismatch = await daemon.handle_request(
+                {**request, "versions": {**get_versions(), "black": "0"}}
+            )
+            assert mismatch["version_mismatch"] is True
+
+            metrics = daemon.get_metrics()
+            assert {
+                name: metrics[name]
+                for name in ("requests", "errors", "conversions", "coalesced")
+            } == {"requests": 6, "errors": 2, "conversions": 2, "coalesced": 1}
+            assert metrics["result_hits"] == 1
+            assert metrics["latency_ms"]["max"] >= metrics["latency_ms"]["p50"]
+
+        daemon = Daemon()
+        try:
+            asyncio.run(run(daemon))
+        finally:
+            daemon.close()
+
+    def test_client(self) -> None:
+        async def run(daemon: Daemon) -> tuple[str, list[str]] | None:
+            stop = asyncio.Event()
+            server = asyncio.create_task(daemon.serve(self.socket_path, stop))
+
+            while not os.path.exists(self.socket_path):
+                await asyncio.sleep(0.01)
+
+            try:
+                # Converted locally instead
+                with mock.patch(
+                    "json_schema_to_python.client.get_code_version",
+                    return_value="other",
+                ):
+                    assert (
+                        await asyncio.get_running_loop().run_in_executor(
+                            None,
+                            lambda: convert_with_daemon(
+                                self.input_path,
+                                self.socket_path,
+                            ),
+                        )
+                        is None
+                    )
+
+                return await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    lambda: convert_with_daemon(self.input_path, self.socket_path),
+                )
+            finally:
+                stop.set()
+                await server
+
+        daemon = Daemon()
+        try:
+            result = asyncio.run(run(daemon))
+        finally:
+            daemon.close()
+
+        assert result == (self.get_expected(), ["skipping schema: no id"])
+        assert not os.path.exists(self.socket_path)
+
+        # No daemon is listening
+        assert convert_with_daemon(self.input_path, self.socket_path) is None
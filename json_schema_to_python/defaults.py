@@ -0,0 +1,8 @@
+"""
+Option values that the CLI needs to parse its arguments, kept apart from the
+modules that implement the options so that parsing doesn't import them
+"""
+
+EMITTER_NAMES = ["ast", "direct"]
+
+DEFAULT_SHARD_SIZE = 250
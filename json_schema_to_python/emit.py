@@ -0,0 +1,791 @@
+"""
+Write a generated module as source text that's already formatted, without
+going through `ast.unparse` and black.
+
+The output is byte-identical to `black.format_str(ast.unparse(module))` with
+black's default mode (black 22.3). Only the shapes of node that
+`create_module_node` builds are supported: `from x import a, b`, classes with
+`Name` bases whose bodies are `name: annotation` or `pass`, and
+`Name = annotation` aliases, where annotations are names, constants and
+subscripts. Anything else falls back to `ast.unparse` and black.
+
+Line splitting is a port of the parts of black's `linegen` that those shapes
+reach: right-hand splits (omitting trailers and optional parentheses where
+black would), delimiter splits on commas and magic trailing commas. Leaves
+and lines are mutated the same way black mutates them, since later splits
+depend on it.
+"""
+
+import ast
+import functools
+import re
+from typing import Callable, Iterable, Iterator
+
+_LINE_LENGTH = 88
+
+_NAME = "NAME"
+_STRING = "STRING"
+_NUMBER = "NUMBER"
+_LPAR = "("
+_RPAR = ")"
+_LSQB = "["
+_RSQB = "]"
+_COMMA = ","
+_COLON = ":"
+_EQUAL = "="
+
+_OPENING_BRACKETS = {_LPAR, _LSQB}
+_CLOSING_BRACKETS = {_RPAR, _RSQB}
+_BRACKETS = {_LPAR: _RPAR, _LSQB: _RSQB}
+
+# Parent node types that black looks at. Leaves that black creates while
+# splitting, and leaves it detaches, have no parent.
+_NODE = "node"
+_ATOM = "atom"
+_CLASSDEF = "classdef"
+_IMPORT_FROM = "import_from"
+_TRAILER = "trailer"
+
+# Also allow splitting on optional parentheses that can otherwise be omitted
+_FORCE_OPTIONAL_PARENTHESES = "force_optional_parentheses"
+
+
+class _Unsupported(Exception):
+    pass
+
+
+class _CannotTransform(Exception):
+    pass
+
+
+class _CannotSplit(_CannotTransform):
+    pass
+
+
+class _Leaf:
+    """
+    A token. `whitespace` is the prefix black would give it when it isn't the
+    first on a line.
+    """
+
+    __slots__ = (
+        "type",
+        "value",
+        "parent",
+        "whitespace",
+        "prefix",
+        "bracket_depth",
+        "opening_bracket",
+    )
+
+    def __init__(
+        self,
+        type: str,
+        value: str,
+        parent: str | None = _NODE,
+        whitespace: str = "",
+    ) -> None:
+        self.type = type
+        self.value = value
+        self.parent = parent
+        self.whitespace = whitespace
+        self.prefix = ""
+        self.bracket_depth = 0
+        self.opening_bracket: _Leaf | None = None
+
+
+class _Line:
+    __slots__ = (
+        "depth",
+        "leaves",
+        "inside_brackets",
+        "should_split_rhs",
+        "magic_trailing_comma",
+        "delimiters",
+        "invisible",
+        "_bracket_depth",
+        "_bracket_match",
+    )
+
+    def __init__(self, depth: int = 0, inside_brackets: bool = False) -> None:
+        self.depth = depth
+        self.leaves: list[_Leaf] = []
+        self.inside_brackets = inside_brackets
+        self.should_split_rhs = False
+        self.magic_trailing_comma: _Leaf | None = None
+
+        # Ids of the commas at bracket depth 0, the only delimiters in our shapes
+        self.delimiters: set[int] = set()
+        self.invisible: list[_Leaf] = []
+        self._bracket_depth = 0
+        self._bracket_match: dict[tuple[int, str], _Leaf] = {}
+
+    @property
+    def is_import(self) -> bool:
+        return (
+            len(self.leaves) > 0
+            and self.leaves[0].value == "from"
+            and self.leaves[0].parent == _IMPORT_FROM
+        )
+
+    @property
+    def is_class(self) -> bool:
+        return len(self.leaves) > 0 and self.leaves[0].value == "class"
+
+    def clone(self) -> "_Line":
+        line = _Line(self.depth, self.inside_brackets)
+        line.should_split_rhs = self.should_split_rhs
+        line.magic_trailing_comma = self.magic_trailing_comma
+
+        return line
+
+    def append(self, leaf: _Leaf, preformatted: bool = False) -> None:
+        if len(self.leaves) > 0 and not preformatted:
+            leaf.prefix += leaf.whitespace
+
+        if self.inside_brackets or not preformatted:
+            self._mark(leaf)
+
+            if self._has_magic_trailing_comma(leaf):
+                self.magic_trailing_comma = leaf
+
+        self.leaves.append(leaf)
+
+    def _mark(self, leaf: _Leaf) -> None:
+        if leaf.type in _CLOSING_BRACKETS:
+            self._bracket_depth -= 1
+            leaf.opening_bracket = self._bracket_match.pop(
+                (self._bracket_depth, leaf.type)
+            )
+
+            if not leaf.value:
+                self.invisible.append(leaf)
+
+        leaf.bracket_depth = self._bracket_depth
+
+        if self._bracket_depth == 0 and leaf.type == _COMMA:
+            self.delimiters.add(id(leaf))
+
+        if leaf.type in _OPENING_BRACKETS:
+            self._bracket_match[(self._bracket_depth, _BRACKETS[leaf.type])] = leaf
+            self._bracket_depth += 1
+
+            if not leaf.value:
+                self.invisible.append(leaf)
+
+    def _has_magic_trailing_comma(self, closing: _Leaf) -> bool:
+        if not (
+            closing.type in _CLOSING_BRACKETS
+            and len(self.leaves) > 0
+            and self.leaves[-1].type == _COMMA
+        ):
+            return False
+
+        if closing.type == _RSQB or self.is_import:
+            return True
+
+        # Parentheses only ever hold class bases and import names, which are
+        # never one-tuples
+        return closing.opening_bracket is not None
+
+    def __str__(self) -> str:
+        if len(self.leaves) == 0:
+            return ""
+
+        first, *rest = self.leaves
+
+        return (
+            first.prefix
+            + "    " * self.depth
+            + first.value
+            + "".join(leaf.prefix + leaf.value for leaf in rest)
+        )
+
+
+def _is_line_short_enough(line_str: str) -> bool:
+    return len(line_str) <= _LINE_LENGTH and "\n" not in line_str
+
+
+def _transform_line(line: _Line, features: frozenset[str]) -> Iterator[_Line]:
+    line_str = str(line)
+
+    if (
+        not line.should_split_rhs
+        and line.magic_trailing_comma is None
+        and _is_line_short_enough(line_str)
+    ):
+        yield line
+        return
+
+    transformers = [_delimiter_split, _rhs] if line.inside_brackets else [_rhs]
+
+    for transform in transformers:
+        try:
+            result = _run_transformer(line, transform, features, line_str)
+        except _CannotTransform:
+            continue
+
+        yield from result
+        return
+
+    yield line
+
+
+def _run_transformer(
+    line: _Line,
+    transform: Callable[[_Line, frozenset[str]], Iterator[_Line]],
+    features: frozenset[str],
+    line_str: str,
+) -> list[_Line]:
+    result: list[_Line] = []
+    for transformed_line in transform(line, features):
+        if str(transformed_line) == line_str:
+            raise _CannotTransform()
+
+        result.extend(_transform_line(transformed_line, features))
+
+    if (
+        transform is not _rhs
+        or len(line.invisible) == 0
+        or any(bracket.value for bracket in line.invisible)
+        or _is_line_short_enough(str(result[0]))
+        or any(leaf.parent is None for leaf in line.leaves)
+    ):
+        return result
+
+    # Get a second opinion that splits on the optional parentheses, using
+    # fresh leaves. Black detaches the old leaves from their parents here.
+    line_copy = line.clone()
+    for leaf in line.leaves:
+        line_copy.append(_Leaf(leaf.type, leaf.value, leaf.parent, leaf.whitespace))
+        leaf.parent = None
+
+    second_opinion = _run_transformer(
+        line_copy,
+        transform,
+        features | {_FORCE_OPTIONAL_PARENTHESES},
+        line_str,
+    )
+    if all(_is_line_short_enough(str(result_line)) for result_line in second_opinion):
+        result = second_opinion
+
+    return result
+
+
+def _rhs(line: _Line, features: frozenset[str]) -> Iterator[_Line]:
+    """
+    Split on the last bracket pair, increasingly gluing trailers together to
+    split on an earlier pair instead
+    """
+
+    for omit in _generate_trailers_to_omit(line):
+        lines = list(_right_hand_split(line, features, omit))
+        if _is_line_short_enough(str(lines[0])):
+            yield from lines
+            return
+
+    yield from _right_hand_split(line, features)
+
+
+def _generate_trailers_to_omit(line: _Line) -> Iterator[set[int]]:
+    omit: set[int] = set()
+    if line.magic_trailing_comma is None:
+        yield omit
+
+    length = 4 * line.depth
+    opening_bracket: _Leaf | None = None
+    closing_bracket: _Leaf | None = None
+    inner_brackets: set[int] = set()
+
+    for index in range(len(line.leaves) - 1, -1, -1):
+        leaf = line.leaves[index]
+        length += len(leaf.prefix) + len(leaf.value)
+        if length > _LINE_LENGTH:
+            break
+
+        prev = line.leaves[index - 1] if index > 0 else None
+
+        if opening_bracket is not None:
+            if leaf is opening_bracket:
+                opening_bracket = None
+            elif leaf.type in _CLOSING_BRACKETS:
+                # Never omit bracket pairs with trailing commas, they explode
+                if (
+                    prev is not None
+                    and prev.type == _COMMA
+                    and leaf.opening_bracket is not None
+                ):
+                    break
+
+                inner_brackets.add(id(leaf))
+        elif leaf.type in _CLOSING_BRACKETS:
+            if prev is not None and prev.type in _OPENING_BRACKETS:
+                inner_brackets.add(id(leaf))
+                continue
+
+            if closing_bracket is not None:
+                omit.add(id(closing_bracket))
+                omit.update(inner_brackets)
+                inner_brackets.clear()
+                yield omit
+
+            if (
+                prev is not None
+                and prev.type == _COMMA
+                and leaf.opening_bracket is not None
+            ):
+                break
+
+            if leaf.value:
+                opening_bracket = leaf.opening_bracket
+                closing_bracket = leaf
+
+
+def _right_hand_split(
+    line: _Line,
+    features: frozenset[str],
+    omit: Iterable[int] = (),
+) -> Iterator[_Line]:
+    omit = set(omit)
+    tail_leaves: list[_Leaf] = []
+    body_leaves: list[_Leaf] = []
+    head_leaves: list[_Leaf] = []
+    current_leaves = tail_leaves
+    opening_bracket: _Leaf | None = None
+    closing_bracket: _Leaf | None = None
+
+    for leaf in reversed(line.leaves):
+        if current_leaves is body_leaves and leaf is opening_bracket:
+            current_leaves = head_leaves if len(body_leaves) > 0 else tail_leaves
+
+        current_leaves.append(leaf)
+
+        if (
+            current_leaves is tail_leaves
+            and leaf.type in _CLOSING_BRACKETS
+            and id(leaf) not in omit
+        ):
+            opening_bracket = leaf.opening_bracket
+            closing_bracket = leaf
+            current_leaves = body_leaves
+
+    if opening_bracket is None or closing_bracket is None or len(head_leaves) == 0:
+        raise _CannotSplit()
+
+    tail_leaves.reverse()
+    body_leaves.reverse()
+    head_leaves.reverse()
+    head = _bracket_split_build_line(head_leaves, line, opening_bracket)
+    body = _bracket_split_build_line(body_leaves, line, opening_bracket, True)
+    tail = _bracket_split_build_line(tail_leaves, line, opening_bracket)
+
+    tail_length = len(str(tail).strip())
+    if len(body.leaves) == 0 and tail_length < 3:
+        raise _CannotSplit()
+
+    if (
+        _FORCE_OPTIONAL_PARENTHESES not in features
+        and opening_bracket.type == _LPAR
+        and not opening_bracket.value
+        and closing_bracket.type == _RPAR
+        and not closing_bracket.value
+        and not line.is_import
+        # Optional parentheses only ever wrap a single name or subscript here,
+        # so black's `can_omit_invisible_parens` always holds
+        and len(body.delimiters) == 0
+    ):
+        try:
+            yield from _right_hand_split(
+                line,
+                features,
+                {id(closing_bracket), *omit},
+            )
+            return
+        except _CannotSplit as e:
+            if len(body.leaves) < 2 and not _is_line_short_enough(str(body)):
+                raise _CannotSplit() from e
+
+    # Make optional parentheses visible
+    if opening_bracket.type == _LPAR:
+        opening_bracket.value = "("
+    if closing_bracket.type == _RPAR:
+        closing_bracket.value = ")"
+
+    for result in (head, body, tail):
+        if len(result.leaves) > 0:
+            yield result
+
+
+def _bracket_split_build_line(
+    leaves: list[_Leaf],
+    original: _Line,
+    opening_bracket: _Leaf,
+    is_body: bool = False,
+) -> _Line:
+    result = _Line(original.depth)
+
+    if is_body:
+        result.inside_brackets = True
+        result.depth += 1
+
+        if len(leaves) > 0:
+            leaves[0].prefix = ""
+
+            # Imports get a trailing comma
+            if original.is_import and leaves[-1].type != _COMMA:
+                leaves.append(_Leaf(_COMMA, ",", None))
+
+    for leaf in leaves:
+        result.append(leaf, preformatted=True)
+
+    if is_body and _should_split_line(result, opening_bracket):
+        result.should_split_rhs = True
+
+    return result
+
+
+def _should_split_line(line: _Line, opening_bracket: _Leaf) -> bool:
+    """
+    Whether the body of a right-hand split should be exploded one item per line
+    """
+
+    if opening_bracket.parent is None or len(line.leaves) == 0:
+        return False
+
+    trailing_comma = line.leaves[-1].type == _COMMA
+    if not any(
+        not trailing_comma or delimiter != id(line.leaves[-1])
+        for delimiter in line.delimiters
+    ):
+        return False
+
+    return trailing_comma or opening_bracket.parent in (_ATOM, _IMPORT_FROM)
+
+
+def _delimiter_split(line: _Line, features: frozenset[str]) -> Iterator[_Line]:
+    """
+    Split after each comma at bracket depth 0, adding a trailing comma
+    """
+
+    if len(line.leaves) == 0:
+        raise _CannotSplit()
+
+    last_leaf = line.leaves[-1]
+    if not any(delimiter != id(last_leaf) for delimiter in line.delimiters):
+        raise _CannotSplit()
+
+    current_line = _Line(line.depth, line.inside_brackets)
+
+    for leaf in line.leaves:
+        current_line.append(leaf, preformatted=True)
+
+        if id(leaf) in line.delimiters:
+            current_line.leaves[0].prefix = ""
+            yield current_line
+
+            current_line = _Line(line.depth, line.inside_brackets)
+
+    if len(current_line.leaves) > 0:
+        if current_line.leaves[-1].type != _COMMA:
+            current_line.append(_Leaf(_COMMA, ",", None))
+
+        current_line.leaves[0].prefix = ""
+        yield current_line
+
+
+def _normalize_string_quotes(s: str) -> str:
+    """
+    Prefer double quotes unless that needs more escaping, like black does.
+    `s` is a `repr`, so it has no prefix and isn't triple-quoted.
+    """
+
+    if s[0] == '"':
+        orig_quote, new_quote = '"', "'"
+    else:
+        orig_quote, new_quote = "'", '"'
+
+    unescaped_new_quote = _get_quote_pattern(rf"(([^\\]|^)(\\\\)*){new_quote}")
+    escaped_new_quote = _get_quote_pattern(rf"([^\\]|^)\\((?:\\\\)*){new_quote}")
+    escaped_orig_quote = _get_quote_pattern(rf"([^\\]|^)\\((?:\\\\)*){orig_quote}")
+
+    body = s[1:-1]
+    new_body = _sub_twice(escaped_new_quote, rf"\1\2{new_quote}", body)
+    if body != new_body:
+        # Consider the string without unnecessary escapes as the original
+        body = new_body
+        s = f"{orig_quote}{body}{orig_quote}"
+
+    new_body = _sub_twice(escaped_orig_quote, rf"\1\2{orig_quote}", new_body)
+    new_body = _sub_twice(unescaped_new_quote, rf"\1\\{new_quote}", new_body)
+
+    orig_escape_count = body.count("\\")
+    new_escape_count = new_body.count("\\")
+    if new_escape_count > orig_escape_count:
+        return s
+
+    if new_escape_count == orig_escape_count and orig_quote == '"':
+        return s
+
+    return f"{new_quote}{new_body}{new_quote}"
+
+
+@functools.lru_cache()
+def _get_quote_pattern(pattern: str) -> re.Pattern[str]:
+    return re.compile(pattern)
+
+
+def _sub_twice(pattern: re.Pattern[str], replacement: str, original: str) -> str:
+    """
+    Substitute twice, since matches can overlap
+    """
+
+    return pattern.sub(replacement, pattern.sub(replacement, original))
+
+
+def _normalize_numeric_literal(text: str) -> str:
+    text = text.lower()
+
+    if "e" in text and not text.startswith("0x"):
+        before, after = text.split("e")
+        if after.startswith("+"):
+            after = after[1:]
+
+        text = f"{before}e{after}"
+
+    return text
+
+
+def _create_constant_leaf(value: object, whitespace: str) -> _Leaf:
+    if value is None or isinstance(value, bool):
+        return _Leaf(_NAME, str(value), whitespace=whitespace)
+
+    text = ast.unparse(ast.Constant(value=value))
+
+    if isinstance(value, str):
+        if "\n" in text:
+            raise _Unsupported()
+
+        return _Leaf(_STRING, _normalize_string_quotes(text), whitespace=whitespace)
+
+    if isinstance(value, (int, float)) and "j" not in text and "(" not in text:
+        return _Leaf(_NUMBER, _normalize_numeric_literal(text), whitespace=whitespace)
+
+    raise _Unsupported()
+
+
+def _append_expression_leaves(
+    leaves: list[_Leaf],
+    node: ast.expr,
+    whitespace: str,
+) -> None:
+    if isinstance(node, ast.Name):
+        leaves.append(_Leaf(_NAME, node.id, whitespace=whitespace))
+    elif isinstance(node, ast.Constant):
+        leaves.append(_create_constant_leaf(node.value, whitespace))
+    elif isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name):
+        leaves.append(_Leaf(_NAME, node.value.id, whitespace=whitespace))
+        leaves.append(_Leaf(_LSQB, "[", _TRAILER))
+
+        if isinstance(node.slice, ast.Tuple):
+            if len(node.slice.elts) == 0:
+                raise _Unsupported()
+
+            for i, element in enumerate(node.slice.elts):
+                _append_expression_leaves(leaves, element, "" if i == 0 else " ")
+                if i < len(node.slice.elts) - 1 or len(node.slice.elts) == 1:
+                    leaves.append(_Leaf(_COMMA, ","))
+        else:
+            _append_expression_leaves(leaves, node.slice, "")
+
+        leaves.append(_Leaf(_RSQB, "]", _TRAILER))
+    else:
+        raise _Unsupported()
+
+
+def _create_lines(node: ast.stmt) -> list[_Line]:
+    """
+    Create the logical lines of a statement, one per line of `ast.unparse`'s
+    output
+    """
+
+    leaves: list[_Leaf] = []
+    lines: list[_Line] = []
+
+    if isinstance(node, ast.ImportFrom):
+        leaves.append(_Leaf(_NAME, "from", _IMPORT_FROM))
+        # The module is never split, so a relative one's dots can go in the
+        # same leaf
+        leaves.append(
+            _Leaf(_NAME, "." * node.level + (node.module or ""), whitespace=" ")
+        )
+        leaves.append(_Leaf(_NAME, "import", whitespace=" "))
+        leaves.append(_Leaf(_LPAR, "", _IMPORT_FROM, " "))
+
+        for i, alias in enumerate(node.names):
+            # `ast.unparse` writes names in place of aliases the same way
+            alias_name: str
+            if isinstance(alias, ast.Name):
+                alias_name = alias.id
+            elif alias.asname is None and alias.name != "*":
+                alias_name = alias.name
+            else:
+                raise _Unsupported()
+
+            if i > 0:
+                leaves.append(_Leaf(_COMMA, ","))
+
+            leaves.append(_Leaf(_NAME, alias_name, whitespace="" if i == 0 else " "))
+
+        leaves.append(_Leaf(_RPAR, "", _IMPORT_FROM))
+    elif isinstance(node, ast.ClassDef):
+        if len(node.keywords) > 0 or len(node.decorator_list) > 0:
+            raise _Unsupported()
+
+        leaves.append(_Leaf(_NAME, "class"))
+        leaves.append(_Leaf(_NAME, node.name, whitespace=" "))
+
+        if len(node.bases) > 0:
+            leaves.append(_Leaf(_LPAR, "(", _CLASSDEF))
+
+            for i, base in enumerate(node.bases):
+                if not isinstance(base, ast.Name):
+                    raise _Unsupported()
+
+                if i > 0:
+                    leaves.append(_Leaf(_COMMA, ","))
+
+                leaves.append(_Leaf(_NAME, base.id, whitespace="" if i == 0 else " "))
+
+            leaves.append(_Leaf(_RPAR, ")", _CLASSDEF))
+
+        leaves.append(_Leaf(_COLON, ":", _CLASSDEF))
+
+        for statement in node.body:
+            body_leaves: list[_Leaf] = []
+
+            if isinstance(statement, ast.Pass):
+                body_leaves.append(_Leaf(_NAME, "pass"))
+            elif (
+                isinstance(statement, ast.AnnAssign)
+                and isinstance(statement.target, ast.Name)
+                and statement.value is None
+                and statement.simple == 1
+            ):
+                body_leaves.append(_Leaf(_NAME, statement.target.id))
+                body_leaves.append(_Leaf(_COLON, ":"))
+                _append_expression_leaves(body_leaves, statement.annotation, " ")
+            else:
+                raise _Unsupported()
+
+            lines.append(_create_line(body_leaves, 1))
+    elif (
+        isinstance(node, ast.Assign)
+        and len(node.targets) == 1
+        and isinstance(node.targets[0], ast.Name)
+    ):
+        # Black wraps the right-hand side in invisible parentheses, which it
+        # can split on
+        leaves.append(_Leaf(_NAME, node.targets[0].id))
+        leaves.append(_Leaf(_EQUAL, "=", whitespace=" "))
+        leaves.append(_Leaf(_LPAR, "", _ATOM, " "))
+        _append_expression_leaves(leaves, node.value, "")
+        leaves.append(_Leaf(_RPAR, "", _ATOM))
+    else:
+        raise _Unsupported()
+
+    return [_create_line(leaves, 0), *lines]
+
+
+def _create_line(leaves: list[_Leaf], depth: int) -> _Line:
+    line = _Line(depth)
+    for leaf in leaves:
+        line.append(leaf)
+
+    return line
+
+
+def get_statement_kind(node: ast.stmt) -> str:
+    """
+    Get "import", "definition" or "other", which is all that decides the blank
+    lines around a top-level statement
+    """
+
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return "import"
+
+    if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+        return "definition"
+
+    return "other"
+
+
+def get_empty_lines(previous_kind: str | None, kind: str) -> int:
+    """
+    Get the number of blank lines black puts before a top-level statement
+    """
+
+    if previous_kind is None:
+        return 0
+
+    # Definitions are surrounded by 2 blank lines
+    if kind == "definition" or previous_kind == "definition":
+        return 2
+
+    # And a block of imports is followed by at least 1
+    if previous_kind == "import" and kind != "import":
+        return 1
+
+    return 0
+
+
+def _emit_statement(node: ast.stmt) -> str:
+    """
+    Like `emit_statement`, but raise `_Unsupported` for shapes that aren't
+    supported
+    """
+
+    # Blank lines within our statements are always 0, since class bodies only
+    # hold annotations
+    return "".join(
+        f"{transformed_line}\n"
+        for line in _create_lines(node)
+        for transformed_line in _transform_line(line, frozenset())
+    )
+
+
+def emit_statement(node: ast.stmt) -> str:
+    """
+    Get a top-level statement's source, formatted as black would format it,
+    without the blank lines before it
+    """
+
+    try:
+        return _emit_statement(node)
+    except _Unsupported:
+        import black
+
+        return black.format_str(ast.unparse(node), mode=black.FileMode())
+
+
+def _join_statements(
+    nodes: Iterable[ast.stmt],
+    emit: Callable[[ast.stmt], str],
+) -> str:
+    parts: list[str] = []
+    previous_kind: str | None = None
+
+    for node in nodes:
+        kind = get_statement_kind(node)
+        parts.append("\n" * get_empty_lines(previous_kind, kind))
+        parts.append(emit(node))
+        previous_kind = kind
+
+    return "".join(parts)
+
+
+def emit_module(module: ast.Module) -> str:
+    """
+    Get a module's source, formatted as black would format it
+    """
+
+    return _join_statements(module.body, emit_statement)
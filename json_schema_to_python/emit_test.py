@@ -0,0 +1,150 @@
+import ast
+import random
+import unittest
+
+import black
+
+from json_schema_to_python.ast import create_module_node
+from json_schema_to_python.ast.import_node import create_import_nodes
+from json_schema_to_python.json_schema.types import create_schema_from_dict
+from .emit import _emit_statement, _join_statements, emit_module
+
+
+def _format(module: ast.Module) -> str:
+    return black.format_str(ast.unparse(module), mode=black.FileMode())
+
+
+def _create_name(r: random.Random) -> str:
+    return "N" + "".join(r.choice("abcXYZ_") for _ in range(r.choice([1, 8, 40, 90])))
+
+
+def _create_constant(r: random.Random) -> ast.Constant:
+    if r.random() < 0.5:
+        return ast.Constant(
+            "".join(r.choice("ab'\" \\\t\n\x00é") for _ in range(r.choice([1, 8, 90])))
+        )
+
+    return ast.Constant(
+        r.choice([0, -1, 1.5, -2.5e100, 1e-05, 1e16, True, None, 10**30])
+    )
+
+
+def _create_annotation(r: random.Random, depth: int = 0) -> ast.expr:
+    k = r.random()
+    if depth > 3 or k < 0.3:
+        return ast.Name(_create_name(r))
+
+    if k < 0.5:
+        constants: list[ast.expr] = [
+            _create_constant(r) for _ in range(r.choice([1, 2, 20]))
+        ]
+        return ast.Subscript(
+            ast.Name("Literal"),
+            ast.Tuple(constants) if len(constants) > 1 else constants[0],
+        )
+
+    if k < 0.7:
+        return ast.Subscript(ast.Name("list"), _create_annotation(r, depth + 1))
+
+    # Single-element tuples are written with a trailing comma, which black
+    # treats as magic
+    elements = [_create_annotation(r, depth + 1) for _ in range(r.choice([1, 2, 6]))]
+    return ast.Subscript(ast.Name("Union"), ast.Tuple(elements))
+
+
+def _create_module(r: random.Random) -> ast.Module:
+    body: list[ast.stmt] = [*create_import_nodes()]
+
+    for _ in range(r.randint(0, 3)):
+        class_body: list[ast.stmt] = [
+            ast.AnnAssign(ast.Name(_create_name(r)), _create_annotation(r), None, 1)
+            for _ in range(r.randint(0, 3))
+        ]
+        body.append(
+            ast.ClassDef(
+                _create_name(r),
+                [ast.Name(_create_name(r)) for _ in range(r.randint(0, 3))],
+                [],
+                class_body or [ast.Pass()],
+                [],
+            )
+        )
+
+    for _ in range(r.randint(0, 3)):
+        body.append(ast.Assign([ast.Name(_create_name(r))], _create_annotation(r)))
+
+    return ast.fix_missing_locations(ast.Module(body, []))
+
+
+class Test_emit_module(unittest.TestCase):
+    def assert_same(self, module: ast.Module) -> None:
+        # Don't go through `emit_module`, which falls back to black
+        assert _join_statements(module.body, _emit_statement) == _format(module)
+
+    def test_schemas(self) -> None:
+        long_name = "VeryLong" * 11
+        schemas = [
+            create_schema_from_dict(
+                {
+                    "id": "#Pet",
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "tags": {"type": "array", "items": [{"$ref": f"#{long_name}"}]},
+                        "kind": {
+                            "anyOf": [
+                                {"type": "string", "enum": [f"kind_{i}"]}
+                                for i in range(20)
+                            ]
+                        },
+                        "size": {"type": ["integer", "number", "null"]},
+                    },
+                    "required": ["name"],
+                },
+            ),
+            create_schema_from_dict(
+                {
+                    "id": f"#{long_name}",
+                    "type": "object",
+                    "properties": {"id": {"type": "integer"}},
+                },
+            ),
+            create_schema_from_dict(
+                {"id": "#Quote", "type": "string", "enum": ["it's", 'say "hi"']},
+            ),
+            create_schema_from_dict(
+                {"id": f"#{long_name}Size", "type": "integer", "enum": [1]},
+            ),
+            create_schema_from_dict(
+                {"id": "#Ratio", "type": "number", "enum": [0.5, 1e100, -2.0]},
+            ),
+        ]
+
+        self.assert_same(create_module_node(schemas))
+
+        # `if TYPE_CHECKING:` falls back to black
+        module = create_module_node(schemas, should_gate_typing_imports=True)
+        assert emit_module(module) == _format(module)
+
+    def test_random(self) -> None:
+        for seed in range(100):
+            with self.subTest(seed=seed):
+                self.assert_same(_create_module(random.Random(seed)))
+
+    def test_relative_imports(self) -> None:
+        names = [ast.alias(f"Model{i}") for i in range(20)]
+        module = ast.Module(
+            [
+                ast.ImportFrom("shard_0", names[:1], 1),
+                ast.ImportFrom("shard_1", names, 1),
+                ast.ImportFrom(None, names[:2], 2),
+            ],
+            [],
+        )
+
+        self.assert_same(module)
+
+    def test_unsupported(self) -> None:
+        module = ast.parse("import os\ndef f(a, b):\n    return a\nA = 1")
+
+        assert emit_module(module) == _format(module)
@@ -1,10 +1,281 @@
 import ast
+from typing import Iterable
 
 from json_schema_to_python.ast import create_module_node
+from json_schema_to_python.ast.attribute_node import AnnotationCache
+from json_schema_to_python.ast.import_node import (
+    add_used_names,
+    create_import_nodes,
+    get_used_names,
+)
+from json_schema_to_python.ast.module_node import create_model_node
+from json_schema_to_python.emit import (
+    emit_module,
+    emit_statement,
+    get_empty_lines,
+    get_statement_kind,
+)
+from json_schema_to_python.json_schema import MergeCache, profiling
+from json_schema_to_python.json_schema.resolve import RefResolver
 from json_schema_to_python.json_schema.types import Schema
+from .defaults import EMITTER_NAMES
+from .formatting import FormatCache, format_sources
 
+# Fewer, bigger chunks make for less overhead, but more of them balance the
+# work better
+_MAX_CHUNK_SIZE = 512
+_CHUNKS_PER_JOB = 4
 
-def convert_schemas_to_file_content(schemas: list[Schema]) -> str:
-    tree = create_module_node(schemas)
+# What workers need to generate fragments. Set before the worker processes are
+# forked, so that they inherit it instead of it being pickled.
+_worker_state: tuple[
+    list[Schema],
+    RefResolver | None,
+    MergeCache,
+    AnnotationCache,
+    str,
+] | None = None
 
-    return ast.unparse(tree)
+
+def convert_schemas_to_file_content(
+    schemas: Iterable[Schema],
+    resolver: RefResolver | None = None,
+    merge_cache: MergeCache | None = None,
+    emitter: str = "ast",
+    jobs: int = 1,
+    should_gate_typing_imports: bool = False,
+    should_format: bool = False,
+    format_cache: FormatCache | None = None,
+) -> str:
+    """
+    Args:
+        emitter: "ast" to write the module with `ast.unparse`, or "direct" to
+            write it already formatted the way black would
+        jobs: Number of processes to generate models' source and format it
+            in. The output is the same as with 1. Generating needs the "fork"
+            start method; where that isn't available, models are generated in
+            this process.
+        should_gate_typing_imports: See `create_import_nodes`
+        should_format: Format the "ast" emitter's output with black, one
+            top-level statement at a time. The output is the same as
+            formatting the whole module.
+        format_cache: Reuse statements formatted in earlier runs
+    """
+
+    if emitter not in EMITTER_NAMES:
+        raise Exception(f"unknown emitter {emitter}")
+
+    if jobs < 1:
+        raise Exception("jobs must be at least 1")
+
+    fragments: list[tuple[str, str]]
+
+    if jobs > 1 and can_fork():
+        # Models' source is generated along with their nodes
+        with profiling.stage("build"):
+            fragments = _create_fragments_in_parallel(
+                list(schemas),
+                resolver,
+                merge_cache,
+                emitter,
+                jobs,
+                should_gate_typing_imports,
+            )
+    else:
+        with profiling.stage("build"):
+            tree = create_module_node(
+                schemas,
+                resolver,
+                merge_cache,
+                should_gate_typing_imports,
+            )
+
+        if emitter == "direct":
+            with profiling.stage("emit"):
+                return emit_module(tree)
+
+        with profiling.stage("unparse"):
+            if not should_format:
+                return ast.unparse(tree)
+
+            fragments = [
+                (get_statement_kind(node), ast.unparse(node)) for node in tree.body
+            ]
+
+    is_formatted = emitter == "direct"
+
+    if emitter == "ast" and should_format:
+        with profiling.stage("format"):
+            sources = format_sources(
+                [source for _, source in fragments],
+                format_cache,
+                jobs,
+            )
+        fragments = [(kind, source) for (kind, _), source in zip(fragments, sources)]
+        is_formatted = True
+
+    return join_fragments(fragments, is_formatted)
+
+
+def _create_fragments_in_parallel(
+    schemas: list[Schema],
+    resolver: RefResolver | None,
+    merge_cache: MergeCache | None,
+    emitter: str,
+    jobs: int,
+    should_gate_typing_imports: bool,
+) -> list[tuple[str, str]]:
+    """
+    Get the kinds and source of a module's statements (see `create_fragment`),
+    generating models in worker processes
+    """
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _worker_state
+
+    chunk_size = max(1, min(_MAX_CHUNK_SIZE, len(schemas) // (jobs * _CHUNKS_PER_JOB)))
+    chunks = [
+        (start, min(start + chunk_size, len(schemas)))
+        for start in range(0, len(schemas), chunk_size)
+    ]
+
+    _worker_state = (
+        schemas,
+        resolver,
+        merge_cache if merge_cache is not None else MergeCache(),
+        AnnotationCache(),
+        emitter,
+    )
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("fork"),
+        ) as executor:
+            # `map` yields results in the order of the chunks, whichever
+            # finishes first
+            results = list(executor.map(_create_fragments, chunks))
+    finally:
+        _worker_state = None
+
+    # Same order as `create_module_node`: imports, classes, then enums
+    class_fragments: list[tuple[str, str]] = []
+    enum_fragments: list[tuple[str, str]] = []
+    used_names: dict[str, bool] = {}
+    for fragments in results:
+        for kind, source, names in fragments:
+            if kind == "definition":
+                class_fragments.append((kind, source))
+            else:
+                enum_fragments.append((kind, source))
+
+            add_used_names(used_names, names)
+
+    import_fragments = [
+        create_fragment(node, emitter)
+        for node in create_import_nodes(used_names, should_gate_typing_imports)
+    ]
+
+    return [*import_fragments, *class_fragments, *enum_fragments]
+
+
+def _create_fragments(
+    chunk: tuple[int, int],
+) -> list[tuple[str, str, dict[str, bool]]]:
+    """
+    Generate the source of the models in a chunk of the schemas, in a worker,
+    along with the names each uses (see `get_used_names`)
+    """
+
+    assert _worker_state is not None
+    schemas, resolver, merge_cache, annotation_cache, emitter = _worker_state
+
+    fragments: list[tuple[str, str, dict[str, bool]]] = []
+    for model_schema in schemas[chunk[0] : chunk[1]]:
+        node = create_model_node(
+            model_schema,
+            resolver,
+            merge_cache,
+            annotation_cache,
+        )
+
+        if node is not None:
+            fragments.append((*create_fragment(node, emitter), get_used_names(node)))
+
+    return fragments
+
+
+def can_fork() -> bool:
+    """
+    Check whether worker processes can be forked, so that they inherit what
+    they need instead of it being pickled
+    """
+
+    # Only imported for workers, since it's slow to import
+    import multiprocessing
+
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def create_fragment(
+    node: ast.stmt,
+    emitter: str,
+    should_format: bool = False,
+) -> tuple[str, str]:
+    """
+    Get a statement's kind (see `get_statement_kind`) and source
+
+    Args:
+        should_format: Format the source with black. Source from the "direct"
+            emitter is always formatted.
+    """
+
+    if emitter == "direct":
+        return get_statement_kind(node), emit_statement(node)
+
+    source = ast.unparse(node)
+
+    if should_format:
+        import black
+
+        source = black.format_str(source, mode=black.FileMode())
+
+    return get_statement_kind(node), source
+
+
+def get_fragment_separator(
+    previous_kind: str | None,
+    kind: str,
+    is_formatted: bool,
+) -> str:
+    """
+    Get what goes between two statements' source, the way black or
+    `ast.unparse` would write it
+    """
+
+    if is_formatted:
+        return "\n" * get_empty_lines(previous_kind, kind)
+
+    if previous_kind is None:
+        return ""
+
+    # `ast.unparse` puts a blank line before definitions
+    return "\n\n" if kind == "definition" else "\n"
+
+
+def join_fragments(fragments: list[tuple[str, str]], is_formatted: bool) -> str:
+    """
+    Join statements' kinds and source into a module's source
+    """
+
+    parts: list[str] = []
+    previous_kind: str | None = None
+
+    for kind, source in fragments:
+        parts.append(get_fragment_separator(previous_kind, kind, is_formatted))
+        parts.append(source)
+        previous_kind = kind
+
+    return "".join(parts)
@@ -0,0 +1,86 @@
+import unittest
+
+import black
+
+from json_schema_to_python.json_schema.types import Schema, create_schema_from_dict
+from .file import convert_schemas_to_file_content
+
+
+class Test_convert_schemas_to_file_content(unittest.TestCase):
+    def test_jobs(self) -> None:
+        """
+        Generating models in parallel gives the same output
+        """
+
+        schemas: list[Schema] = []
+        for i in range(50):
+            schemas.append(
+                create_schema_from_dict(
+                    {
+                        "id": f"#Model{i}",
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "kind": {"$ref": f"#Kind{i}"},
+                        },
+                        "required": ["name"],
+                    }
+                )
+            )
+            schemas.append(
+                create_schema_from_dict(
+                    {"id": f"#Kind{i}", "type": "string", "enum": ["a", "b"]}
+                )
+            )
+
+        for emitter in ("ast", "direct"):
+            with self.subTest(emitter=emitter):
+                assert convert_schemas_to_file_content(
+                    schemas,
+                    emitter=emitter,
+                    jobs=3,
+                ) == convert_schemas_to_file_content(schemas, emitter=emitter)
+
+    def test_format(self) -> None:
+        """
+        Formatting one statement at a time gives the same output as formatting
+        the whole module
+        """
+
+        schemas = [
+            create_schema_from_dict(
+                {
+                    "id": f"#Model{i}",
+                    "type": "object",
+                    "properties": {
+                        f"property_{k}": {"type": ["string", "integer", "null"]}
+                        for k in range(i)
+                    },
+                }
+            )
+            for i in range(1, 20)
+        ]
+
+        for should_gate_typing_imports in (False, True):
+            expected = black.format_str(
+                convert_schemas_to_file_content(
+                    schemas,
+                    should_gate_typing_imports=should_gate_typing_imports,
+                ),
+                mode=black.FileMode(),
+            )
+
+            for jobs in (1, 3):
+                with self.subTest(
+                    should_gate_typing_imports=should_gate_typing_imports,
+                    jobs=jobs,
+                ):
+                    assert (
+                        convert_schemas_to_file_content(
+                            schemas,
+                            jobs=jobs,
+                            should_gate_typing_imports=should_gate_typing_imports,
+                            should_format=True,
+                        )
+                        == expected
+                    )
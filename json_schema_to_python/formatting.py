@@ -0,0 +1,190 @@
+"""
+Format source with black one top-level statement at a time, so that statements
+that were formatted before don't need to be formatted again, and the rest can
+be formatted in parallel.
+
+Black formats top-level statements independently of each other, besides the
+blank lines between them (see `get_fragment_separator`), so joining formatted
+statements gives the same output as formatting the whole module.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+
+from json_schema_to_python.json_schema import profiling
+from json_schema_to_python.json_schema.cache import get_default_cache_directory
+from .write import write_file_atomically
+
+# Enough for a few large modules
+_DEFAULT_MAX_ENTRIES = 100_000
+
+# Workers get statements in chunks, since each is quick to format
+_CHUNK_SIZE = 64
+
+
+class FormatCache:
+    """
+    On-disk cache of formatted statements, keyed by their unformatted source,
+    black's mode and black's version. Entries are kept in a single file, which
+    is read on first use and written by `save`.
+
+    Args:
+        directory: Where the entries are stored. Created if it doesn't exist.
+            Defaults to a subdirectory of the schema cache's.
+        max_entries: Number of entries to keep. The least recently used are
+            evicted past this.
+        logger: Logger for entries that can't be saved. Saving never fails
+            the run.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.directory = directory or os.path.join(
+            get_default_cache_directory(),
+            "format",
+        )
+        self.max_entries = max_entries
+        self.logger = logger or logging.getLogger(__name__)
+        self._entries: dict[str, str] | None = None
+        self._is_changed = False
+
+    @property
+    def _path(self) -> str:
+        return os.path.join(self.directory, "statements.pickle")
+
+    def _load(self) -> dict[str, str]:
+        if self._entries is None:
+            try:
+                with open(self._path, "rb") as f:
+                    self._entries = pickle.load(f)
+            except Exception:
+                # A missing, corrupt or incompatible file is empty
+                self._entries = {}
+
+            if not isinstance(self._entries, dict):
+                self._entries = {}
+
+        return self._entries
+
+    def get(self, key: str) -> str | None:
+        entries = self._load()
+        source = entries.pop(key, None)
+
+        # Entries are in the order they were last used
+        if source is not None:
+            entries[key] = source
+
+        return source
+
+    def set(self, key: str, source: str) -> None:
+        entries = self._load()
+        entries.pop(key, None)
+        entries[key] = source
+
+        while len(entries) > self.max_entries:
+            del entries[next(iter(entries))]
+
+        self._is_changed = True
+
+    def save(self) -> None:
+        """
+        Write the entries, if any were added since they were read
+        """
+
+        if self._entries is None or not self._is_changed:
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            write_file_atomically(
+                self._path,
+                pickle.dumps(self._entries, protocol=pickle.HIGHEST_PROTOCOL),
+            )
+        except OSError as e:
+            self.logger.warning(f"can't write to the format cache: {e}")
+            return
+
+        self._is_changed = False
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+def format_sources(
+    sources: list[str],
+    cache: FormatCache | None = None,
+    jobs: int = 1,
+) -> list[str]:
+    """
+    Format top-level statements' source with black
+
+    Args:
+        cache: Reuse statements formatted in earlier runs. New ones are added
+            to it, and it's saved.
+        jobs: Number of processes to format the statements that aren't cached
+            in
+    """
+
+    import black
+
+    mode = black.FileMode()
+    prefix = f"{black.__version__}\0{mode.get_cache_key()}\0"
+
+    formatted: list[str] = []
+    # Statements to format, with the indexes of each in `sources`
+    misses: dict[str, list[int]] = {}
+    keys: dict[str, str] = {}
+
+    for i, source in enumerate(sources):
+        key = hashlib.blake2b(
+            (prefix + source).encode(),
+            digest_size=16,
+        ).hexdigest()
+        cached = None if cache is None else cache.get(key)
+        formatted.append("" if cached is None else cached)
+
+        if cached is None:
+            misses.setdefault(source, []).append(i)
+            keys[source] = key
+
+    miss_sources = list(misses)
+
+    if profiling.counts is not None:
+        profiling.counts["formatted_statements"] += len(miss_sources)
+        profiling.counts["format_cache_hits"] += len(sources) - sum(
+            len(indexes) for indexes in misses.values()
+        )
+
+    if jobs > 1 and len(miss_sources) > _CHUNK_SIZE:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(
+                executor.map(_format_source, miss_sources, chunksize=_CHUNK_SIZE)
+            )
+    else:
+        results = [_format_source(source) for source in miss_sources]
+
+    for source, result in zip(miss_sources, results):
+        for i in misses[source]:
+            formatted[i] = result
+
+        if cache is not None:
+            cache.set(keys[source], result)
+
+    if cache is not None:
+        cache.save()
+
+    return formatted
+
+
+def _format_source(source: str) -> str:
+    import black
+
+    return black.format_str(source, mode=black.FileMode())
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import black
+
+from .formatting import FormatCache, format_sources
+
+
+def _create_sources(count: int) -> list[str]:
+    return [
+        f"class Model{i}(TypedDict): a: Union[str, None]; b: Literal['x', 'y']"
+        for i in range(count)
+    ]
+
+
+class Test_format_sources(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_cache(self) -> None:
+        sources = _create_sources(3)
+        expected = [black.format_str(s, mode=black.FileMode()) for s in sources]
+
+        assert format_sources(sources, FormatCache(self.directory.name)) == expected
+
+        # A new cache reads the saved entries, and formats nothing
+        cache = FormatCache(self.directory.name)
+        with mock.patch(
+            "json_schema_to_python.formatting._format_source",
+            side_effect=AssertionError,
+        ):
+            assert format_sources(sources, cache) == expected
+
+        assert len(cache) == 3
+
+    def test_eviction(self) -> None:
+        cache = FormatCache(self.directory.name, max_entries=2)
+        format_sources(_create_sources(3), cache)
+
+        assert len(cache) == 2
+        assert len(FormatCache(self.directory.name)) == 2
+
+    def test_corrupt(self) -> None:
+        os.makedirs(self.directory.name, exist_ok=True)
+        with open(os.path.join(self.directory.name, "statements.pickle"), "w") as f:
+            f.write("not a pickle")
+
+        sources = _create_sources(1)
+        assert format_sources(sources, FormatCache(self.directory.name)) == [
+            black.format_str(sources[0], mode=black.FileMode())
+        ]
+
+    def test_unusable_directory(self) -> None:
+        """
+        Statements are still formatted when the cache can't be saved
+        """
+
+        path = os.path.join(self.directory.name, "file")
+        with open(path, "w") as f:
+            f.write("")
+
+        cache = FormatCache(os.path.join(path, "format"))
+        sources = _create_sources(1)
+
+        with self.assertLogs(cache.logger, "WARNING"):
+            assert format_sources(sources, cache) == [
+                black.format_str(sources[0], mode=black.FileMode())
+            ]
+
+    def test_jobs(self) -> None:
+        # More than one chunk's worth, with duplicates
+        sources = _create_sources(100) * 2
+
+        assert format_sources(sources, jobs=3) == format_sources(sources)
@@ -0,0 +1,304 @@
+"""
+Regenerate only the models whose schemas changed since the last run.
+
+A manifest next to the output records, for each model, a key for its schema
+and where its source is in the output. On the next run, models whose key is
+in the manifest are copied from the existing output, and only the others are
+generated (and formatted). The result is the same as generating the whole
+file.
+
+A model's key covers its schema's fingerprint, which includes everything
+nested in it, and for `allOf` models the schemas that merging follows refs
+to. Anything else that changes the output (this package's source, the emitter,
+formatting, black's version) invalidates the whole manifest, as does editing
+the output by hand.
+
+A process that writes the same output repeatedly (e.g. in watch mode) can keep
+an `IncrementalState` between runs, so that the manifest isn't read back, and
+schemas that are the same objects as in the last run aren't converted again.
+"""
+
+import hashlib
+import json
+from typing import Any, Iterable
+
+from json_schema_to_python.ast.attribute_node import AnnotationCache
+from json_schema_to_python.ast.import_node import (
+    add_used_names,
+    create_import_nodes,
+    get_used_names,
+)
+from json_schema_to_python.ast.module_node import create_ir_model_node
+from json_schema_to_python.json_schema import MergeCache, ir
+from json_schema_to_python.json_schema.resolve import RefResolver
+from json_schema_to_python.json_schema.types import Schema
+from json_schema_to_python.json_schema.version import get_code_version
+from .defaults import EMITTER_NAMES
+from .file import create_fragment, get_fragment_separator
+from .formatting import FormatCache, format_sources
+from .write import get_file_stat, write_file_atomically
+
+
+def get_manifest_path(output_path: str) -> str:
+    return f"{output_path}.manifest.json"
+
+
+class IncrementalState:
+    """
+    What `write_file_incrementally` keeps between runs that write the same
+    output: the models' source from the last run, and the schemas it
+    converted, by the schema objects they were converted from. Only the last
+    run's are kept. Schemas mustn't be mutated between runs.
+    """
+
+    def __init__(self) -> None:
+        # What the fragments are for, and the output file they're in (see
+        # `get_file_stat`)
+        self.version: str | None = None
+        self.output_stat: tuple[int, int, int] | None = None
+        self.fragments: dict[str, tuple[str, str, dict[str, bool]]] = {}
+        # Keyed by `id`, with the schema object so that the id isn't reused
+        self.ir_schemas: dict[int, tuple[Schema, ir.Schema]] = {}
+
+
+def write_file_incrementally(
+    schemas: Iterable[Schema],
+    output_path: str,
+    resolver: RefResolver | None = None,
+    emitter: str = "ast",
+    should_format: bool = True,
+    should_gate_typing_imports: bool = False,
+    format_cache: FormatCache | None = None,
+    state: IncrementalState | None = None,
+) -> dict[str, int]:
+    """
+    Write the module for some schemas to a file, reusing the source of the
+    models that haven't changed since it was last written by this function
+
+    Args:
+        emitter: See `convert_schemas_to_file_content`
+        should_format: Format the output with black. Output from the "direct"
+            emitter is always formatted.
+        should_gate_typing_imports: See `create_import_nodes`
+        format_cache: Reuse statements formatted in earlier runs
+        state: Reuse what an earlier call with the same state did, instead of
+            reading the manifest. Updated with what this call does.
+
+    Returns:
+        The number of models, and of models that were generated
+    """
+
+    if emitter not in EMITTER_NAMES:
+        raise Exception(f"unknown emitter {emitter}")
+
+    is_formatted = should_format or emitter == "direct"
+    version = _get_version(emitter, is_formatted)
+    manifest_path = get_manifest_path(output_path)
+
+    if (
+        state is not None
+        and state.version == version
+        and state.output_stat == get_file_stat(output_path)
+    ):
+        previous_fragments = state.fragments
+    else:
+        previous_fragments = _load_previous_fragments(
+            output_path,
+            manifest_path,
+            version,
+        )
+
+    previous_ir_schemas = {} if state is None else state.ir_schemas
+
+    merge_cache = MergeCache()
+    annotation_cache = AnnotationCache()
+
+    # Same order as `create_module_node`: classes, then enums
+    class_fragments: list[tuple[str, str, str]] = []
+    enum_fragments: list[tuple[str, str, str]] = []
+    # The generated fragments, by list and index, which are formatted together
+    generated: list[tuple[list[tuple[str, str, str]], int]] = []
+    # The names each model uses, which the manifest records since reused
+    # models have no node to get them from
+    names_by_key: dict[str, dict[str, bool]] = {}
+    used_names: dict[str, bool] = {}
+    ir_schemas: dict[int, tuple[Schema, ir.Schema]] = {}
+
+    for model_schema in schemas:
+        previous_ir_schema = previous_ir_schemas.get(id(model_schema))
+
+        if previous_ir_schema is not None and previous_ir_schema[0] is model_schema:
+            schema = previous_ir_schema[1]
+        else:
+            schema = ir.from_schema(model_schema)
+
+        ir_schemas[id(model_schema)] = (model_schema, schema)
+
+        if isinstance(schema, ir.ObjectSchema):
+            fragments = class_fragments
+        elif ir.is_enum(schema):
+            fragments = enum_fragments
+        else:
+            continue
+
+        key = _get_model_key(schema, resolver)
+        previous_fragment = previous_fragments.get(key)
+
+        if previous_fragment is None:
+            node = create_ir_model_node(
+                schema,
+                resolver,
+                merge_cache,
+                annotation_cache,
+            )
+            assert node is not None
+            kind, source = create_fragment(node, emitter)
+            names = get_used_names(node)
+            generated.append((fragments, len(fragments)))
+        else:
+            kind, source, names = previous_fragment
+
+        fragments.append((key, kind, source))
+        names_by_key[key] = names
+        add_used_names(used_names, names)
+
+    generated_count = len(generated)
+
+    # Imports are cheap, and have no key
+    import_fragments = [
+        ("", *create_fragment(node, emitter))
+        for node in create_import_nodes(used_names, should_gate_typing_imports)
+    ]
+
+    if should_format and emitter == "ast":
+        generated += [(import_fragments, i) for i in range(len(import_fragments))]
+        sources = format_sources(
+            [fragments[i][2] for fragments, i in generated],
+            format_cache,
+        )
+
+        for (fragments, i), source in zip(generated, sources):
+            key, kind, _ = fragments[i]
+            fragments[i] = (key, kind, source)
+
+    parts: list[str] = []
+    entries: list[tuple[str, str, int, int, dict[str, bool]]] = []
+    fragments_by_key: dict[str, tuple[str, str, dict[str, bool]]] = {}
+    offset = 0
+    previous_kind: str | None = None
+
+    for key, kind, source in [*import_fragments, *class_fragments, *enum_fragments]:
+        separator = get_fragment_separator(previous_kind, kind, is_formatted)
+        parts.append(separator)
+        parts.append(source)
+        offset += len(separator)
+
+        if key:
+            entries.append((key, kind, offset, offset + len(source), names_by_key[key]))
+            fragments_by_key[key] = (kind, source, names_by_key[key])
+
+        offset += len(source)
+        previous_kind = kind
+
+    content = "".join(parts).encode()
+
+    # A run that's interrupted between the two leaves a manifest that doesn't
+    # match the output, which the next run ignores
+    write_file_atomically(output_path, content)
+    write_file_atomically(
+        manifest_path,
+        json.dumps(
+            {
+                "version": version,
+                "output": hashlib.sha256(content).hexdigest(),
+                "fragments": entries,
+            }
+        ).encode(),
+    )
+
+    if state is not None:
+        state.version = version
+        state.output_stat = get_file_stat(output_path)
+        state.fragments = fragments_by_key
+        state.ir_schemas = ir_schemas
+
+    return {
+        "models": len(class_fragments) + len(enum_fragments),
+        "generated": generated_count,
+    }
+
+
+def _get_version(emitter: str, is_formatted: bool) -> str:
+    """
+    Identify everything besides the schemas that the output depends on
+    """
+
+    parts = [get_code_version(), emitter, str(is_formatted)]
+
+    if is_formatted and emitter != "direct":
+        import black
+
+        parts.append(black.__version__)
+
+    return "\0".join(parts)
+
+
+def _get_model_key(schema: ir.Schema, resolver: RefResolver | None) -> str:
+    digest = hashlib.blake2b(schema.fingerprint, digest_size=16)
+
+    if (
+        resolver is not None
+        and isinstance(schema, ir.ObjectSchema)
+        and schema.allOf is not None
+    ):
+        # Merging follows refs in overlapping properties, so the model depends
+        # on what they point to. Any ref might overlap.
+        for subschema in schema.allOf:
+            if not isinstance(subschema, ir.ObjectSchema):
+                continue
+
+            for property_schema in subschema.properties.values():
+                if isinstance(property_schema, ir.TypelessSchema):
+                    try:
+                        digest.update(resolver.follow(property_schema).fingerprint)
+                    except Exception:
+                        # A ref that can't be followed only fails the merge
+                        # if it overlaps. The key changes once it can be.
+                        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def _load_previous_fragments(
+    output_path: str,
+    manifest_path: str,
+    version: str,
+) -> dict[str, tuple[str, str, dict[str, bool]]]:
+    """
+    Get the kind, source and used names (see `get_used_names`) of the models in
+    the existing output, by key. Empty if there's no output or manifest, or
+    they can't be reused.
+    """
+
+    try:
+        with open(manifest_path, "rb") as f:
+            manifest: dict[str, Any] = json.load(f)
+
+        with open(output_path, "rb") as f:
+            data = f.read()
+    except (OSError, ValueError):
+        return {}
+
+    if (
+        not isinstance(manifest, dict)
+        or manifest.get("version") != version
+        or manifest.get("output") != hashlib.sha256(data).hexdigest()
+    ):
+        return {}
+
+    content = data.decode()
+
+    return {
+        key: (kind, content[start:end], names)
+        for key, kind, start, end, names in manifest["fragments"]
+    }
@@ -0,0 +1,179 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from typing import Any
+
+import black
+
+from json_schema_to_python.json_schema.resolve import RefResolver
+from json_schema_to_python.json_schema.types import (
+    ObjectSchema,
+    Schema,
+    create_schema_from_dict,
+)
+from .file import convert_schemas_to_file_content
+from .incremental import (
+    IncrementalState,
+    get_manifest_path,
+    write_file_incrementally,
+)
+
+
+def _create_document(kind_type: str) -> dict[str, Any]:
+    definitions: list[dict[str, Any]] = [
+        {
+            "id": f"#Model{i}",
+            "type": "object",
+            "properties": {"name": {"type": "string"}, "kind": {"$ref": "#Kind"}},
+            "required": ["name"],
+        }
+        for i in range(10)
+    ]
+    definitions += [
+        {"id": "#Kind", "type": kind_type},
+        {"id": "#Color", "type": "string", "enum": ["red", "blue"]},
+        {
+            "id": "#Merged",
+            "type": "object",
+            "properties": {"id": {"type": "integer"}},
+            "allOf": [
+                {"type": "object", "properties": {"kind": {"$ref": "#Kind"}}},
+                {
+                    "type": "object",
+                    "properties": {"kind": {"type": ["string", "integer"]}},
+                },
+            ],
+        },
+    ]
+
+    return {"definitions": definitions}
+
+
+class Test_write_file_incrementally(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.directory.name, "models.py")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(
+        self,
+        document: dict[str, Any],
+        emitter: str = "ast",
+        should_format: bool = True,
+    ) -> dict[str, int]:
+        """
+        Write the output incrementally, and check that it's the same as
+        generating it all at once
+        """
+
+        resolver = RefResolver(document)
+        # Parsed as an object schema, since `create_schema_from_dict` would
+        # parse the `allOf` one as an `AllOfSchema`
+        schemas: list[Schema] = [
+            ObjectSchema.parse_obj(definition)
+            if "allOf" in definition
+            else create_schema_from_dict(definition)
+            for definition in document["definitions"]
+        ]
+
+        stats = write_file_incrementally(
+            schemas,
+            self.output_path,
+            resolver,
+            emitter,
+            should_format,
+        )
+
+        expected = convert_schemas_to_file_content(schemas, resolver, emitter=emitter)
+        if should_format and emitter == "ast":
+            expected = black.format_str(expected, mode=black.FileMode())
+
+        with open(self.output_path) as f:
+            assert f.read() == expected
+
+        return stats
+
+    def test_unchanged(self) -> None:
+        for emitter, should_format in (("ast", True), ("ast", False), ("direct", True)):
+            with self.subTest(emitter=emitter, should_format=should_format):
+                document = _create_document("string")
+
+                assert self.write(document, emitter, should_format)["generated"] == 12
+                assert self.write(document, emitter, should_format) == {
+                    "models": 12,
+                    "generated": 0,
+                }
+
+                os.remove(get_manifest_path(self.output_path))
+
+    def test_changed(self) -> None:
+        self.write(_create_document("string"))
+
+        document = _create_document("string")
+        document["definitions"][3]["properties"]["age"] = {"type": "integer"}
+        assert self.write(document)["generated"] == 1
+
+    def test_merge_inputs_changed(self) -> None:
+        """
+        A model is regenerated when a schema that its `allOf` merge follows a
+        ref to changes, even though the model's own schema hasn't
+        """
+
+        self.write(_create_document("string"))
+
+        # Kind isn't a model, so only Merged changes
+        assert self.write(_create_document("integer"))["generated"] == 1
+
+    def test_edited_output(self) -> None:
+        self.write(_create_document("string"))
+
+        with open(self.output_path, "a") as f:
+            f.write("# edited\n")
+
+        assert self.write(_create_document("string"))["generated"] == 12
+
+    def test_state(self) -> None:
+        """
+        A state from the last run is used instead of the manifest, and schemas
+        that are the same objects aren't converted again
+        """
+
+        document = _create_document("string")
+        schemas = [create_schema_from_dict(d) for d in document["definitions"][:10]]
+        state = IncrementalState()
+
+        assert write_file_incrementally(schemas, self.output_path, state=state) == {
+            "models": 10,
+            "generated": 10,
+        }
+        with open(self.output_path) as f:
+            expected = f.read()
+
+        os.remove(get_manifest_path(self.output_path))
+        with mock.patch(
+            "json_schema_to_python.json_schema.ir.from_schema",
+            side_effect=AssertionError,
+        ):
+            assert (
+                write_file_incrementally(schemas, self.output_path, state=state)[
+                    "generated"
+                ]
+                == 0
+            )
+
+        with open(self.output_path) as f:
+            assert f.read() == expected
+
+        # Editing the output invalidates the state
+        with open(self.output_path, "a") as f:
+            f.write("# edited\n")
+
+        assert (
+            write_file_incrementally(schemas, self.output_path, state=state)[
+                "generated"
+            ]
+            == 10
+        )
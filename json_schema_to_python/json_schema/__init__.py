@@ -1,3 +1,58 @@
-from . import types
-from .load import load_model_schemas
-from .merge import merge_schemas
+"""
+Names are imported from their modules when they're first used (see the
+parent package)
+"""
+
+import importlib
+
+# See the parent package
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from . import ir, profiling, types
+    from .cache import SchemaCache
+    from .load import (
+        ModelSchemaLoader,
+        iter_model_schemas,
+        load_model_schemas,
+        load_model_schemas_and_resolver,
+    )
+    from .merge import MergeCache, merge_schemas
+    from .resolve import DocumentCache, RefResolver
+
+# Submodules map to None
+_modules_by_name: dict[str, str | None] = {
+    "ir": None,
+    "profiling": None,
+    "types": None,
+    "SchemaCache": ".cache",
+    "ModelSchemaLoader": ".load",
+    "iter_model_schemas": ".load",
+    "load_model_schemas": ".load",
+    "load_model_schemas_and_resolver": ".load",
+    "MergeCache": ".merge",
+    "merge_schemas": ".merge",
+    "DocumentCache": ".resolve",
+    "RefResolver": ".resolve",
+}
+
+
+def __getattr__(name: str) -> object:
+    if name not in _modules_by_name:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name = _modules_by_name[name]
+
+    value: object
+    if module_name is None:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_modules_by_name})
@@ -3,6 +3,11 @@ import pydantic
 
 
 class BaseModel(pydantic.BaseModel):
+    class Config:
+        # Return model instances that already match a member of a union field
+        # as-is instead of trying to coerce them into each member in turn
+        smart_union = True
+
     def to_dict(self) -> dict[str, Any]:
         # Don't include any keys whose values haven't been explicitly set. In
         # other words, leave out defaulted attributes.
@@ -23,3 +28,4 @@ class BaseModel(pydantic.BaseModel):
 
 
 Field = pydantic.Field
+validator = pydantic.validator
@@ -0,0 +1,203 @@
+"""
+On-disk cache of loaded model schemas.
+
+Entries are keyed by the input's path and content, the options it was loaded
+with and a hash of this package's source (there's no released version to key
+on), so editing either the input or the code invalidates them. Documents
+pulled in through cross-file refs are recorded with each entry and re-hashed on
+lookup.
+"""
+
+import contextlib
+import gc
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from typing import Collection, Iterable, Iterator
+
+import pydantic
+
+from .types import Schema
+from .version import get_code_version
+
+
+def get_default_cache_directory() -> str:
+    """
+    `$XDG_CACHE_HOME/json-schema-to-python`, or `~/.cache/json-schema-to-python`
+    """
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+
+    return os.path.join(base, "json-schema-to-python")
+
+
+def _hash_file(path: str) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+@contextlib.contextmanager
+def _gc_disabled() -> Iterator[None]:
+    """
+    Unpickling allocates a lot of objects that all survive, so cyclic GC passes
+    during it are wasted work
+    """
+
+    was_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+class SchemaCache:
+    """
+    Args:
+        directory: Where entries are stored. Created if it doesn't exist.
+        max_size: Total size in bytes of the entries to keep. The least
+            recently used entries are evicted past this.
+        logger: Logger for entries that can't be stored. Storing an entry
+            never fails the run.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_size: int = 256 * 1024 * 1024,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.directory = directory or get_default_cache_directory()
+        self.max_size = max_size
+        self.logger = logger or logging.getLogger(__name__)
+        self._code_version: str | None = None
+
+    def get_key(
+        self,
+        path: str,
+        data: bytes,
+        only: Collection[str] | None = None,
+    ) -> str:
+        """
+        Get the key for an input's path, content and load options. The path is
+        part of the key since relative refs to other documents depend on it.
+        """
+
+        if self._code_version is None:
+            self._code_version = get_code_version()
+
+        digest = hashlib.sha256()
+        for part in (
+            self._code_version,
+            pydantic.VERSION,
+            sys.version,
+            os.path.abspath(path),
+            repr(None if only is None else sorted(only)),
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+
+        digest.update(data)
+
+        return digest.hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def get(self, key: str) -> list[Schema] | None:
+        """
+        Get the schemas stored for a key, or None if there aren't any or a
+        document they were loaded from has changed
+        """
+
+        path = self._get_path(key)
+
+        try:
+            with open(path, "rb") as f:
+                dependencies: dict[str, str | None] = pickle.load(f)
+                for dependency, digest in dependencies.items():
+                    if _hash_file(dependency) != digest:
+                        return None
+
+                with _gc_disabled():
+                    schemas: list[Schema] = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # A corrupt or incompatible entry is a miss
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+            return None
+
+        # Eviction is by modification time, so mark the entry as recently used
+        with contextlib.suppress(OSError):
+            os.utime(path)
+
+        return schemas
+
+    def set(
+        self,
+        key: str,
+        schemas: list[Schema],
+        dependencies: Iterable[str] = (),
+    ) -> None:
+        """
+        Store schemas for a key
+
+        Args:
+            dependencies: Paths of other documents the schemas were loaded from
+        """
+
+        digests: dict[str, str | None] = {
+            dependency: _hash_file(dependency) for dependency in dependencies
+        }
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            # Write to a temporary file and rename it, so concurrent runs never
+            # see a partial entry
+            fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(digests, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(schemas, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+                os.replace(temporary_path, self._get_path(key))
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.remove(temporary_path)
+
+                raise
+
+            self._evict()
+        except OSError as e:
+            self.logger.warning(f"can't write to the schema cache: {e}")
+
+    def _evict(self) -> None:
+        entries: list[tuple[float, int, str]] = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pickle"):
+                with contextlib.suppress(OSError):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+            size -= entry_size
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+from .cache import SchemaCache
+from .types import Schema, StringSchema
+
+
+class Test_SchemaCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SchemaCache(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_round_trip(self) -> None:
+        key = self.cache.get_key("a.json", b"{}")
+        assert self.cache.get(key) is None
+
+        schemas: list[Schema] = [StringSchema(id="#Foo", type="string")]
+        self.cache.set(key, schemas)
+
+        assert self.cache.get(key) == schemas
+
+    def test_key(self) -> None:
+        keys = {
+            self.cache.get_key("a.json", b"{}"),
+            self.cache.get_key("a.json", b"{ }"),
+            self.cache.get_key("a.json", b"{}", ["Foo"]),
+            self.cache.get_key("b.json", b"{}"),
+        }
+
+        assert len(keys) == 4
+        assert self.cache.get_key("a.json", b"{}", ["A", "B"]) == self.cache.get_key(
+            "a.json",
+            b"{}",
+            ["B", "A"],
+        )
+
+    def test_dependency_changed(self) -> None:
+        path = os.path.join(self.directory.name, "common.json")
+        with open(path, "w") as f:
+            f.write("{}")
+
+        key = self.cache.get_key("a.json", b"{}")
+        self.cache.set(key, [], [path])
+        assert self.cache.get(key) == []
+
+        with open(path, "w") as f:
+            f.write('{"properties": {}}')
+
+        assert self.cache.get(key) is None
+
+    def test_unusable_directory(self) -> None:
+        """
+        Entries that can't be written are skipped, with a warning
+        """
+
+        path = os.path.join(self.directory.name, "file")
+        with open(path, "w") as f:
+            f.write("")
+
+        cache = SchemaCache(os.path.join(path, "cache"))
+        key = cache.get_key("a.json", b"{}")
+
+        with self.assertLogs(cache.logger, "WARNING"):
+            cache.set(key, [StringSchema(id="#Foo", type="string")])
+
+        assert cache.get(key) is None
+
+    def test_corrupt(self) -> None:
+        key = self.cache.get_key("a.json", b"{}")
+        with open(os.path.join(self.directory.name, f"{key}.pickle"), "wb") as f:
+            f.write(b"nope")
+
+        assert self.cache.get(key) is None
+
+    def test_evict(self) -> None:
+        schemas: list[Schema] = [StringSchema(id="#Foo", type="string")]
+
+        self.cache.set("a", schemas)
+        size = os.path.getsize(os.path.join(self.directory.name, "a.pickle"))
+
+        self.cache.max_size = size * 2
+        os.utime(os.path.join(self.directory.name, "a.pickle"), (0, 0))
+        self.cache.set("b", schemas)
+        self.cache.set("c", schemas)
+
+        # The least recently used entry is evicted first
+        assert self.cache.get("a") is None
+        assert self.cache.get("b") == schemas
+        assert self.cache.get("c") == schemas
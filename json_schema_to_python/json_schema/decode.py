@@ -0,0 +1,97 @@
+import importlib.util
+import json
+import mmap
+import sys
+from typing import Any, Callable
+
+Decoder = Callable[[bytes | memoryview], Any]
+
+# In order of preference for "auto"
+DECODER_NAMES = ["orjson", "msgspec", "json"]
+
+
+def _decode_with_json(data: bytes | memoryview) -> Any:
+    # The stdlib decoder only accepts bytes and str, so a buffer is copied
+    # (bytes aren't)
+    return json.loads(bytes(data))
+
+
+def _decode_with_msgspec(data: bytes | memoryview) -> Any:
+    import msgspec  # type: ignore[import]
+
+    return msgspec.json.decode(data)
+
+
+def _decode_with_orjson(data: bytes | memoryview) -> Any:
+    import orjson  # type: ignore[import]
+
+    return orjson.loads(data)
+
+
+_decoders: dict[str, Decoder] = {
+    "json": _decode_with_json,
+    "msgspec": _decode_with_msgspec,
+    "orjson": _decode_with_orjson,
+}
+
+# Decoders that parse a buffer in place, which a memory-mapped file is handed
+# to without copying it
+_buffer_decoders: set[Decoder] = {_decode_with_msgspec, _decode_with_orjson}
+
+
+def get_decoder(name: str = "auto") -> Decoder:
+    """
+    Get a JSON decoder by name. "auto" picks the fastest installed decoder and
+    falls back to the stdlib.
+
+    Args:
+        name: "auto" or one of `DECODER_NAMES`
+    """
+
+    if name == "auto":
+        for decoder_name in DECODER_NAMES:
+            if decoder_name == "json" or importlib.util.find_spec(decoder_name):
+                return _decoders[decoder_name]
+
+    decoder = _decoders.get(name)
+    if decoder is None:
+        raise Exception(f"unknown JSON decoder {name}")
+
+    if name != "json" and importlib.util.find_spec(name) is None:
+        raise Exception(f"JSON decoder {name} is not installed")
+
+    return decoder
+
+
+def read_file(path: str) -> bytes:
+    """
+    Read a whole file. A path of "-" means stdin.
+    """
+
+    if path == "-":
+        return sys.stdin.buffer.read()
+
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def decode_file(path: str, decoder: Decoder) -> Any:
+    """
+    Decode a JSON file. For decoders that accept a buffer, the file is
+    memory-mapped and handed to the decoder without reading it into memory
+    first. Others get the file's bytes, since they'd copy a mapped file into
+    bytes anyway. A path of "-" means stdin.
+    """
+
+    if path == "-" or decoder not in _buffer_decoders:
+        return decoder(read_file(path))
+
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return decoder(f.read())
+
+        with mapped, memoryview(mapped) as data:
+            return decoder(data)
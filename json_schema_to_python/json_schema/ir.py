@@ -0,0 +1,585 @@
+"""
+Compact, immutable schemas for the codegen hot path.
+
+Pydantic models carry validators, `__fields_set__` and a per-instance
+`__dict__`. Once a schema has been validated, `from_schema` converts it into
+these `__slots__` classes, which the merge and AST code work with instead.
+Names are interned and derived values (schema names, `required` sets) are
+computed once during conversion.
+
+Every schema has a structural `fingerprint`, which is stable across processes
+and is what equality and hashing use. `from_schema` hash-conses its results,
+so structurally identical schemas (e.g. every `{"type": "string"}`) are a
+single shared object.
+"""
+
+from __future__ import annotations
+import hashlib
+import sys
+from types import MappingProxyType
+from typing import (
+    Any,
+    Literal,
+    Mapping,
+    Sequence,
+    TypeGuard,
+    TypeVar,
+    Union,
+    cast,
+)
+import weakref
+
+from . import types
+
+
+def _intern(value: str | None) -> str | None:
+    if value is None:
+        return None
+
+    return sys.intern(value)
+
+
+def _get_name(value: str | None) -> str | None:
+    if value is None:
+        return None
+
+    return sys.intern(value.split("#")[-1])
+
+
+def _get_fingerprint_value(value: Any) -> Any:
+    """
+    Replace subschemas with their fingerprints so that the value's `repr` is a
+    flat, unambiguous encoding. `repr` also keeps 1, 1.0 and True apart.
+    """
+
+    if isinstance(value, _BaseSchema):
+        return value.fingerprint
+    elif isinstance(value, tuple):
+        return tuple(
+            item.fingerprint if isinstance(item, _BaseSchema) else item
+            for item in value
+        )
+    elif isinstance(value, MappingProxyType):
+        return tuple((k, v.fingerprint) for k, v in value.items())
+
+    return value
+
+
+# Bypasses the immutability of the schema classes during initialization
+_setattr = object.__setattr__
+
+
+class _BaseSchema:
+    __slots__ = ("id", "name", "ref", "ref_name", "_fingerprint", "__weakref__")
+
+    # Attributes that make up the schema's value. Derived attributes (like
+    # `name`) are left out
+    _fields: tuple[str, ...] = ("id", "ref")
+
+    id: str | None
+    name: str | None
+    ref: str | None
+    ref_name: str | None
+    _fingerprint: bytes | None
+
+    def __init__(self, *, id: str | None = None, ref: str | None = None) -> None:
+        _setattr(self, "id", _intern(id))
+        _setattr(self, "name", _get_name(id))
+        _setattr(self, "ref", _intern(ref))
+        _setattr(self, "ref_name", _get_name(ref))
+        _setattr(self, "_fingerprint", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, _BaseSchema):
+            return False
+
+        return self.fingerprint == other.fingerprint
+
+    def __hash__(self) -> int:
+        return hash(self.fingerprint)
+
+    @property
+    def fingerprint(self) -> bytes:
+        """
+        Digest of the schema's kind and fields. Subschemas contribute their own
+        (cached) fingerprints, so this is only computed once per schema.
+        """
+
+        fingerprint = self._fingerprint
+
+        if fingerprint is None:
+            key: list[Any] = [type(self).__name__]
+            for f in self._fields:
+                value = getattr(self, f)
+
+                # Most fields are unset or strings, which need no conversion
+                if value is None or type(value) is str:
+                    key.append(value)
+                else:
+                    key.append(_get_fingerprint_value(value))
+
+            fingerprint = hashlib.blake2b(
+                repr(key).encode(),
+                digest_size=16,
+            ).digest()
+            _setattr(self, "_fingerprint", fingerprint)
+
+        return fingerprint
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{f}={getattr(self, f)!r}"
+            for f in self._fields
+            if getattr(self, f) is not None
+        )
+
+        return f"{type(self).__name__}({values})"
+
+    def get_schema_name(self) -> str:
+        if self.name is None:
+            raise Exception("missing id")
+
+        return self.name
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Dict form of the schema. Like `base.BaseModel.to_dict`, attributes that
+        weren't set (`None` or empty) are left out.
+        """
+
+        value: dict[str, Any] = {}
+
+        for f in self._fields:
+            attribute = getattr(self, f)
+
+            if attribute is None:
+                continue
+            elif isinstance(attribute, _BaseSchema):
+                value[f] = attribute.to_dict()
+            elif isinstance(attribute, MappingProxyType):
+                if len(attribute) > 0:
+                    value[f] = {k: v.to_dict() for k, v in attribute.items()}
+            elif isinstance(attribute, tuple):
+                value[f] = [
+                    item.to_dict() if isinstance(item, _BaseSchema) else item
+                    for item in attribute
+                ]
+            else:
+                value[f] = attribute
+
+        return value
+
+
+class AllOfSchema(_BaseSchema):
+    __slots__ = ("allOf", "type")
+    _fields = ("id", "ref", "type", "allOf")
+
+    allOf: tuple[ObjectSchema | TypelessSchema, ...]
+    type: Literal["object"] | None
+
+    def __init__(
+        self,
+        *,
+        allOf: Sequence[ObjectSchema | TypelessSchema],
+        id: str | None = None,
+        ref: str | None = None,
+        type: Literal["object"] | None = None,
+    ) -> None:
+        super().__init__(id=id, ref=ref)
+        _setattr(self, "allOf", tuple(allOf))
+        _setattr(self, "type", type)
+
+
+class AnyOfSchema(_BaseSchema):
+    __slots__ = ("anyOf", "type")
+    _fields = ("id", "ref", "type", "anyOf")
+
+    anyOf: tuple[Schema, ...]
+    type: Literal["object"] | None
+
+    def __init__(
+        self,
+        *,
+        anyOf: Sequence[Schema],
+        id: str | None = None,
+        ref: str | None = None,
+        type: Literal["object"] | None = None,
+    ) -> None:
+        super().__init__(id=id, ref=ref)
+        _setattr(self, "anyOf", tuple(anyOf))
+        _setattr(self, "type", type)
+
+
+class ArraySchema(_BaseSchema):
+    __slots__ = ("items",)
+    _fields = ("id", "ref", "type", "items")
+
+    type: Literal["array"] = "array"
+    items: tuple[Schema, ...]
+
+    def __init__(
+        self,
+        *,
+        items: Sequence[Schema],
+        ref: str | None = None,
+    ) -> None:
+        super().__init__(ref=ref)
+        _setattr(self, "items", tuple(items))
+
+
+class BooleanSchema(_BaseSchema):
+    __slots__ = ()
+    _fields = ("id", "ref", "type")
+
+    type: Literal["boolean"] = "boolean"
+
+    def __init__(self, *, ref: str | None = None) -> None:
+        super().__init__(ref=ref)
+
+
+class IntegerSchema(_BaseSchema):
+    __slots__ = ("enum",)
+    _fields = ("id", "ref", "type", "enum")
+
+    type: Literal["integer"] = "integer"
+    enum: tuple[int, ...] | None
+
+    def __init__(
+        self,
+        *,
+        enum: Sequence[int] | None = None,
+        id: str | None = None,
+        ref: str | None = None,
+    ) -> None:
+        super().__init__(id=id, ref=ref)
+        _setattr(self, "enum", None if enum is None else tuple(enum))
+
+
+class MultiTypeSchema(_BaseSchema):
+    __slots__ = ("type",)
+    _fields = ("id", "ref", "type")
+
+    type: tuple[types.SchemaType, ...]
+
+    def __init__(
+        self,
+        *,
+        type: Sequence[types.SchemaType],
+        id: str | None = None,
+        ref: str | None = None,
+    ) -> None:
+        super().__init__(id=id, ref=ref)
+        _setattr(self, "type", tuple(type))
+
+
+class NullSchema(_BaseSchema):
+    __slots__ = ()
+    _fields = ("id", "ref", "type")
+
+    type: Literal["null"] = "null"
+
+    def __init__(self, *, ref: str | None = None) -> None:
+        super().__init__(ref=ref)
+
+
+class NumberSchema(_BaseSchema):
+    __slots__ = ("enum",)
+    _fields = ("id", "ref", "type", "enum")
+
+    type: Literal["number"] = "number"
+    enum: tuple[float, ...] | None
+
+    def __init__(
+        self,
+        *,
+        enum: Sequence[float] | None = None,
+        id: str | None = None,
+        ref: str | None = None,
+    ) -> None:
+        super().__init__(id=id, ref=ref)
+        _setattr(self, "enum", None if enum is None else tuple(enum))
+
+
+class ObjectSchema(_BaseSchema):
+    __slots__ = ("allOf", "properties", "required", "required_set")
+    _fields = ("id", "ref", "type", "allOf", "properties", "required")
+
+    type: Literal["object"] = "object"
+    allOf: tuple[ObjectSchema | TypelessSchema, ...] | None
+    properties: Mapping[str, Schema]
+
+    # `None` when `required` wasn't set, which matters when merging
+    required: tuple[str, ...] | None
+    required_set: frozenset[str]
+
+    def __init__(
+        self,
+        *,
+        allOf: Sequence[ObjectSchema | TypelessSchema] | None = None,
+        id: str | None = None,
+        properties: Mapping[str, Schema] | None = None,
+        ref: str | None = None,
+        required: Sequence[str] | None = None,
+    ) -> None:
+        super().__init__(id=id, ref=ref)
+        _setattr(self, "allOf", None if allOf is None else tuple(allOf))
+        _setattr(
+            self,
+            "properties",
+            MappingProxyType(
+                {}
+                if properties is None
+                else {sys.intern(k): v for k, v in properties.items()}
+            ),
+        )
+        _setattr(
+            self,
+            "required",
+            None if required is None else tuple(sys.intern(k) for k in required),
+        )
+        _setattr(self, "required_set", frozenset(required or ()))
+
+
+class StringSchema(_BaseSchema):
+    __slots__ = ("enum",)
+    _fields = ("id", "ref", "type", "enum")
+
+    type: Literal["string"] = "string"
+    enum: tuple[str, ...] | None
+
+    def __init__(
+        self,
+        *,
+        enum: Sequence[str] | None = None,
+        id: str | None = None,
+        ref: str | None = None,
+    ) -> None:
+        super().__init__(id=id, ref=ref)
+        _setattr(self, "enum", None if enum is None else tuple(enum))
+
+
+class TypelessSchema(_BaseSchema):
+    __slots__ = ()
+    _fields = ("id", "ref", "type")
+
+    type: None = None
+
+    ref: str
+    ref_name: str
+
+    def __init__(self, *, ref: str, id: str | None = None) -> None:
+        super().__init__(id=id, ref=ref)
+
+    def get_schema_name(self) -> str:
+        return self.ref_name
+
+
+Schema = Union[
+    AllOfSchema,
+    AnyOfSchema,
+    ArraySchema,
+    BooleanSchema,
+    IntegerSchema,
+    MultiTypeSchema,
+    NullSchema,
+    NumberSchema,
+    ObjectSchema,
+    StringSchema,
+    TypelessSchema,
+]
+
+EnumableSchema = Union[IntegerSchema, NumberSchema, StringSchema]
+
+
+_SchemaT = TypeVar("_SchemaT", bound=_BaseSchema)
+
+# Hash-consing table. Entries go away once nothing else references the schema
+_interned_schemas: weakref.WeakValueDictionary[
+    bytes, _BaseSchema
+] = weakref.WeakValueDictionary()
+
+
+def intern_schema(schema: _SchemaT) -> _SchemaT:
+    """
+    Return the shared schema that's structurally identical to `schema`. If
+    there isn't one yet, then `schema` becomes the shared one.
+    """
+
+    # Fingerprints include the schema class, so this is the same type
+    return cast(_SchemaT, _interned_schemas.setdefault(schema.fingerprint, schema))
+
+
+# Shared schemas for bare primitive types (e.g. `{"type": "string"}`), which are
+# the most common subschemas by far
+_primitive_schemas: dict[type, Schema] = {
+    types.BooleanSchema: intern_schema(BooleanSchema()),
+    types.IntegerSchema: intern_schema(IntegerSchema()),
+    types.NullSchema: intern_schema(NullSchema()),
+    types.NumberSchema: intern_schema(NumberSchema()),
+    types.StringSchema: intern_schema(StringSchema()),
+}
+
+
+def from_schema(schema: types.Schema) -> Schema:
+    """
+    Convert a validated Pydantic schema into its compact form. Structurally
+    identical subschemas are shared.
+    """
+
+    if (
+        schema.id is None
+        and schema.ref is None
+        and getattr(schema, "enum", None) is None
+    ):
+        primitive_schema = _primitive_schemas.get(type(schema))
+        if primitive_schema is not None:
+            return primitive_schema
+
+    return intern_schema(_convert_schema(schema))
+
+
+def _convert_schema(schema: types.Schema) -> Schema:
+    id = schema.id
+    ref = None if schema.ref is None else schema.ref.__root__
+
+    # Exact type checks because `isinstance` is slow for Pydantic's ABC-based
+    # model classes
+
+    if type(schema) is types.AllOfSchema:
+        return AllOfSchema(
+            allOf=_from_all_of_value(schema.allOf),
+            id=id,
+            ref=ref,
+            type=schema.type,
+        )
+    elif type(schema) is types.AnyOfSchema:
+        return AnyOfSchema(
+            anyOf=[from_schema(subschema) for subschema in schema.anyOf.__root__],
+            id=id,
+            ref=ref,
+            type=schema.type,
+        )
+    elif type(schema) is types.ArraySchema:
+        return ArraySchema(
+            items=[from_schema(subschema) for subschema in schema.items],
+            ref=ref,
+        )
+    elif type(schema) is types.BooleanSchema:
+        return BooleanSchema(ref=ref)
+    elif type(schema) is types.IntegerSchema:
+        return IntegerSchema(enum=schema.enum, id=id, ref=ref)
+    elif type(schema) is types.MultiTypeSchema:
+        return MultiTypeSchema(type=schema.type, id=id, ref=ref)
+    elif type(schema) is types.NullSchema:
+        return NullSchema(ref=ref)
+    elif type(schema) is types.NumberSchema:
+        return NumberSchema(enum=schema.enum, id=id, ref=ref)
+    elif type(schema) is types.ObjectSchema:
+        return ObjectSchema(
+            allOf=None if schema.allOf is None else _from_all_of_value(schema.allOf),
+            id=id,
+            properties={k: from_schema(v) for k, v in schema.properties.items()},
+            ref=ref,
+            required=(
+                None if schema.was_attribute_defaulted("required") else schema.required
+            ),
+        )
+    elif type(schema) is types.StringSchema:
+        return StringSchema(enum=schema.enum, id=id, ref=ref)
+    elif type(schema) is types.TypelessSchema:
+        return TypelessSchema(ref=schema.ref.__root__, id=id)
+
+    # Should be unreachable
+    raise Exception("unknown schema type")
+
+
+def _from_all_of_value(
+    value: types.AllOfValue,
+) -> list[ObjectSchema | TypelessSchema]:
+    subschemas: list[ObjectSchema | TypelessSchema] = []
+
+    for subschema in value.__root__:
+        if isinstance(subschema, types.ObjectSchema):
+            subschemas.append(_from_object_schema(subschema))
+        else:
+            subschemas.append(
+                intern_schema(
+                    TypelessSchema(ref=subschema.ref.__root__, id=subschema.id)
+                )
+            )
+
+    return subschemas
+
+
+def _from_object_schema(schema: types.ObjectSchema) -> ObjectSchema:
+    converted = from_schema(schema)
+    assert isinstance(converted, ObjectSchema)
+
+    return converted
+
+
+_schema_classes_by_type: dict[str, type[_BaseSchema]] = {
+    "boolean": BooleanSchema,
+    "integer": IntegerSchema,
+    "null": NullSchema,
+    "number": NumberSchema,
+    "object": ObjectSchema,
+    "string": StringSchema,
+}
+
+
+# One shared schema per type, since they're immutable
+_schemas_by_type: dict[str, Schema] = {
+    type: intern_schema(cast(Schema, schema_class()))
+    for type, schema_class in _schema_classes_by_type.items()
+}
+
+
+def get_schema_from_type(type: types.SchemaType) -> Schema:
+    """
+    Get a schema object from a schema type string
+    """
+
+    schema = _schemas_by_type.get(type)
+
+    if schema is None:
+        raise Exception(f"no schema found for type {type}")
+
+    return schema
+
+
+def is_enum(value: Schema) -> TypeGuard[EnumableSchema]:
+    return getattr(value, "enum", None) is not None
+
+
+def is_schema(value: Any) -> TypeGuard[Schema]:
+    return isinstance(value, _BaseSchema)
+
+
+def is_list_of_object_schemas(
+    value: Sequence,
+) -> TypeGuard[Sequence[ObjectSchema]]:
+    return all(isinstance(item, ObjectSchema) for item in value)
+
+
+def is_list_of_schemas(value: Sequence) -> TypeGuard[Sequence[Schema]]:
+    return all(isinstance(item, _BaseSchema) for item in value)
+
+
+def is_list_of_schema_types(
+    value: Sequence,
+) -> TypeGuard[Sequence[types.SchemaType]]:
+    return all(isinstance(item, str) and item in _schema_types for item in value)
+
+
+_schema_types = frozenset(
+    ["array", "boolean", "integer", "object", "null", "number", "string"]
+)
@@ -0,0 +1,114 @@
+import unittest
+
+from . import ir
+from .types import create_schema_from_dict
+
+
+class Test_from_schema(unittest.TestCase):
+    def test_to_dict(self) -> None:
+        """
+        Converted schemas have the same dict form as the Pydantic schemas
+        """
+
+        value = {
+            "id": "#Foo",
+            "type": "object",
+            "$ref": "#Bar",
+            "properties": {
+                "a": {"type": "array", "items": [{"$ref": "#Baz"}]},
+                "b": {"anyOf": [{"type": "integer"}, {"type": "null"}]},
+                "c": {"type": ["integer", "string"]},
+                "d": {"type": "string", "enum": ["x", "y"]},
+                "e": {"type": "boolean"},
+                "f": {"type": "number"},
+            },
+            "required": ["a", "c"],
+        }
+
+        schema = create_schema_from_dict(value)
+        ir_schema = ir.from_schema(schema)
+
+        assert ir_schema.to_dict() == schema.to_dict()
+
+    def test_object(self) -> None:
+        schema = ir.from_schema(
+            create_schema_from_dict(
+                {
+                    "id": "#Foo",
+                    "type": "object",
+                    "$ref": "#Bar",
+                    "properties": {"a": {"type": "integer"}},
+                    "required": ["a"],
+                }
+            )
+        )
+
+        assert isinstance(schema, ir.ObjectSchema)
+        assert schema.get_schema_name() == "Foo"
+        assert schema.ref_name == "Bar"
+        assert schema.required_set == frozenset(["a"])
+        assert schema.properties == {"a": ir.IntegerSchema()}
+
+    def test_required_not_set(self) -> None:
+        schema = ir.from_schema(create_schema_from_dict({"type": "object"}))
+
+        assert isinstance(schema, ir.ObjectSchema)
+        assert schema.required is None
+        assert schema.required_set == frozenset()
+
+    def test_immutable(self) -> None:
+        schema = ir.from_schema(create_schema_from_dict({"$ref": "#Foo"}))
+
+        with self.assertRaises(AttributeError):
+            schema.id = "#Bar"
+
+
+class Test_fingerprint(unittest.TestCase):
+    def test_structural(self) -> None:
+        a = ir.ObjectSchema(properties={"a": ir.IntegerSchema(enum=[1, 2])})
+        b = ir.ObjectSchema(properties={"a": ir.IntegerSchema(enum=[1, 2])})
+
+        assert a is not b
+        assert a.fingerprint == b.fingerprint
+        assert a == b
+        assert hash(a) == hash(b)
+
+    def test_different(self) -> None:
+        schemas = [
+            ir.IntegerSchema(),
+            ir.IntegerSchema(enum=[1]),
+            ir.NumberSchema(enum=[1.0]),
+            ir.StringSchema(enum=["1"]),
+            ir.MultiTypeSchema(type=["integer", "string"]),
+            ir.MultiTypeSchema(type=["string", "integer"]),
+            ir.ObjectSchema(),
+            ir.ObjectSchema(required=[]),
+            ir.TypelessSchema(ref="#Foo"),
+        ]
+
+        assert len({schema.fingerprint for schema in schemas}) == len(schemas)
+
+    def test_hash_consing(self) -> None:
+        """
+        Structurally identical subschemas are shared
+        """
+
+        schema = ir.from_schema(
+            create_schema_from_dict(
+                {
+                    "type": "object",
+                    "properties": {
+                        "a": {"type": "array", "items": [{"type": "string"}]},
+                        "b": {"type": "array", "items": [{"type": "string"}]},
+                        "c": {"type": "string"},
+                    },
+                }
+            )
+        )
+
+        assert isinstance(schema, ir.ObjectSchema)
+        assert schema.properties["a"] is schema.properties["b"]
+
+        a = schema.properties["a"]
+        assert isinstance(a, ir.ArraySchema)
+        assert a.items[0] is schema.properties["c"]
@@ -1,6 +1,41 @@
-import json
+import collections
+import contextlib
 import logging
-from .types import AnyOfValue, RootSchema, Schema
+import os
+import sys
+from typing import Any, Collection, Iterator, TextIO
+
+from . import profiling
+from .cache import SchemaCache
+from .decode import decode_file, get_decoder, read_file
+from .prune import prune_root_schema_dict
+from .resolve import DocumentCache, RefResolver, is_external_ref, iter_refs
+from .stream import iter_object_members
+from .types import AnyOfValue, RootSchema, Schema, create_schema_from_dict
+
+
+def _get_skip_warning(schema: Schema) -> str | None:
+    """
+    Get the warning for a schema that isn't a model, or None if it is one
+    """
+
+    if isinstance(schema, AnyOfValue):
+        return "skipping schema: is anyOf"
+
+    if schema.id is None:
+        return "skipping schema: no id"
+
+    return None
+
+
+def _is_model_schema(logger: logging.Logger, schema: Schema) -> bool:
+    warning = _get_skip_warning(schema)
+
+    if warning is not None:
+        logger.warn(warning)
+        return False
+
+    return True
 
 
 def _get_schemas_from_root_schema(
@@ -9,25 +44,293 @@ def _get_schemas_from_root_schema(
 ) -> list[Schema]:
     schemas: list[Schema] = []
     for schema in root_schema.properties.values():
-        if isinstance(schema, AnyOfValue):
-            logger.warn("skipping schema: is anyOf")
-            continue
+        if _is_model_schema(logger, schema):
+            schemas.append(schema)
+
+    return schemas
+
+
+@contextlib.contextmanager
+def _open_input(path: str) -> Iterator[TextIO]:
+    """
+    Open an input file. A path of "-" means stdin.
+    """
 
-        if schema.id is None:
-            logger.warn("skipping schema: no id")
+    if path == "-":
+        yield sys.stdin
+    else:
+        with open(path) as f:
+            yield f
+
+
+def _get_external_model_schemas(
+    logger: logging.Logger,
+    value: dict[str, Any],
+    resolver: RefResolver,
+    names: set[str],
+) -> list[Schema]:
+    """
+    Get the model schemas that the root schema references in other documents,
+    and the ones those reference in turn. A document is only loaded once a ref
+    reaches it. The refs in each schema are rewritten to be relative to the
+    root schema, so that the root schema's resolver follows them.
+
+    Args:
+        value: Decoded root schema
+        resolver: Resolver for the root schema
+        names: Names of the root schema's models. External models with the
+            same name are skipped.
+    """
+
+    pending = collections.deque(
+        (resolver, ref)
+        for ref in iter_refs(value.get("properties", {}))
+        if is_external_ref(ref)
+    )
+
+    seen: set[int] = set()
+    schemas: list[Schema] = []
+    while len(pending) > 0:
+        ref_resolver, ref = pending.popleft()
+        node, node_resolver = ref_resolver.find(ref)
+
+        # Schemas in the root document are already loaded
+        if node_resolver is resolver or id(node) in seen:
             continue
 
-        schemas.append(schema)
+        seen.add(id(node))
+
+        schema = create_schema_from_dict(node_resolver.rebase_refs(node, resolver))
+        if _is_model_schema(logger, schema):
+            name = schema.get_schema_name()
+            if name in names:
+                logger.warn(f"skipping external schema: duplicate name {name}")
+            else:
+                names.add(name)
+                schemas.append(schema)
+
+        pending.extend((node_resolver, ref) for ref in iter_refs(node))
+
+    return schemas
+
+
+def _parse_model_schemas(
+    logger: logging.Logger,
+    value: dict[str, Any],
+    resolver: RefResolver,
+    only: Collection[str] | None = None,
+) -> list[Schema]:
+    if only is not None:
+        value = prune_root_schema_dict(value, only)
+
+    schemas = _get_schemas_from_root_schema(logger, RootSchema.parse_obj(value))
+    schemas += _get_external_model_schemas(
+        logger,
+        value,
+        resolver,
+        {schema.get_schema_name() for schema in schemas},
+    )
 
     return schemas
 
 
-def _load_json_schema(path: str) -> RootSchema:
-    with open(path) as f:
-        return RootSchema.parse_obj(json.loads(f.read()))
+def _load_model_schemas(
+    logger: logging.Logger,
+    path: str,
+    decoder: str = "auto",
+    only: Collection[str] | None = None,
+    cache: SchemaCache | None = None,
+) -> tuple[list[Schema], RefResolver]:
+    decode = get_decoder(decoder)
+
+    # Other documents are decoded the same way as the root schema
+    documents = DocumentCache(decode)
+
+    if cache is None:
+        with profiling.stage("load"):
+            value = decode_file(path, decode)
+            resolver = documents.add(path, value)
+
+        with profiling.stage("extract"):
+            return _parse_model_schemas(logger, value, resolver, only), resolver
+
+    with profiling.stage("load"):
+        data = read_file(path)
+        key = cache.get_key(path, data, only)
+
+        # On a hit the root schema is only decoded if a ref needs resolving
+        resolver = documents.add(path, lambda: decode(data))
+
+    with profiling.stage("extract"):
+        schemas = cache.get(key)
+
+    if schemas is None:
+        with profiling.stage("load"):
+            document = resolver.document
+
+        with profiling.stage("extract"):
+            schemas = _parse_model_schemas(logger, document, resolver, only)
+
+            root_path = os.path.abspath(path)
+            cache.set(key, schemas, [p for p in documents if p != root_path])
+
+    return schemas, resolver
+
+
+def load_model_schemas(
+    logger: logging.Logger,
+    path: str,
+    decoder: str = "auto",
+    only: Collection[str] | None = None,
+    cache: SchemaCache | None = None,
+) -> list[Schema]:
+    """
+    Args:
+        logger: Logger for skipped schemas
+        path: JSON Schema file path, or "-" for stdin
+        decoder: JSON decoder name (see `decode.get_decoder`)
+        only: Only load these schemas and the schemas they reference
+        cache: Reuse the schemas loaded from the same input in an earlier run.
+            Skipped schemas aren't logged again when they come from the cache.
+
+    Schemas in other documents (e.g. `{"$ref": "common.json#Address"}`) are
+    loaded too, if they're referenced.
+    """
+
+    return _load_model_schemas(logger, path, decoder, only, cache)[0]
+
+
+def load_model_schemas_and_resolver(
+    logger: logging.Logger,
+    path: str,
+    decoder: str = "auto",
+    only: Collection[str] | None = None,
+    cache: SchemaCache | None = None,
+) -> tuple[list[Schema], RefResolver]:
+    """
+    Like `load_model_schemas`, but also return a resolver for the document's
+    refs. The resolver keeps the decoded documents alive.
+    """
+
+    return _load_model_schemas(logger, path, decoder, only, cache)
+
+
+class ModelSchemaLoader:
+    """
+    Load the model schemas from the same input repeatedly, e.g. each time it
+    changes. A model schema that's the same as in the previous load isn't
+    parsed again: the same schema object is returned for it, and it isn't
+    logged again if it's skipped, unless `should_repeat_warnings`.
+
+    Args:
+        See `load_model_schemas`. The path can't be "-".
+        should_repeat_warnings: Log the warnings for skipped schemas on every
+            load, e.g. so that each load's warnings are the same as
+            `load_model_schemas`'
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        path: str,
+        decoder: str = "auto",
+        only: Collection[str] | None = None,
+        should_repeat_warnings: bool = False,
+    ) -> None:
+        self.logger = logger
+        self.path = path
+        self.only = only
+        self.should_repeat_warnings = should_repeat_warnings
+        self._decode = get_decoder(decoder)
+        # The decoded schema, its parsed schema, and the warning if it's
+        # skipped, by name
+        self._parsed: dict[str, tuple[Any, Schema, str | None]] = {}
+        self.documents: list[str] = []
+
+    def load(self, data: bytes | None = None) -> tuple[list[Schema], RefResolver]:
+        """
+        Load the model schemas and a resolver for the document's refs. The
+        documents that were read, including the input, are in `documents`
+        afterwards.
+
+        Args:
+            data: The input's content, instead of reading it from the path.
+                Refs to other documents are still relative to the path.
+        """
+
+        documents = DocumentCache(self._decode)
+        value = (
+            decode_file(self.path, self._decode) if data is None else self._decode(data)
+        )
+        resolver = documents.add(self.path, value)
+
+        if self.only is not None:
+            value = prune_root_schema_dict(value, self.only)
+
+        properties = value.get("properties")
+        if not isinstance(properties, dict):
+            # Report the error the same way as `load_model_schemas`
+            RootSchema.parse_obj(value)
+
+        parsed: dict[str, tuple[Any, Schema, str | None]] = {}
+        schemas: list[Schema] = []
+        for name, definition in properties.items():
+            previous = self._parsed.get(name)
+
+            if previous is not None and previous[0] == definition:
+                parsed[name] = previous
+                _, schema, warning = previous
+
+                if warning is not None and self.should_repeat_warnings:
+                    self.logger.warn(warning)
+            else:
+                schema = RootSchema.parse_obj(
+                    {"properties": {name: definition}}
+                ).properties[name]
+                warning = _get_skip_warning(schema)
+                parsed[name] = (definition, schema, warning)
+
+                if warning is not None:
+                    self.logger.warn(warning)
+
+            if warning is None:
+                schemas.append(schema)
+
+        self._parsed = parsed
+
+        # Other documents are usually small, so they're parsed each time
+        schemas += _get_external_model_schemas(
+            self.logger,
+            value,
+            resolver,
+            {schema.get_schema_name() for schema in schemas},
+        )
+        self.documents = list(documents)
+
+        return schemas, resolver
+
+
+def iter_model_schemas(logger: logging.Logger, path: str) -> Iterator[Schema]:
+    """
+    Like `load_model_schemas`, but parse and validate the root schema's
+    `properties` one at a time. Memory use is bounded by the largest model
+    schema instead of the whole document.
+    """
 
+    with _open_input(path) as f:
+        members = iter_object_members(f, "properties", is_required=True)
 
-def load_model_schemas(logger: logging.Logger, path: str) -> list[Schema]:
-    root_schema = _load_json_schema(path)
+        try:
+            for name, value in members:
+                # Validate through RootSchema so that errors are reported the
+                # same way as when loading the whole document
+                schema = RootSchema.parse_obj({"properties": {name: value}}).properties[
+                    name
+                ]
 
-    return _get_schemas_from_root_schema(logger, root_schema)
+                if _is_model_schema(logger, schema):
+                    yield schema
+        except KeyError:
+            # There are no `properties`, which is reported the same way too
+            RootSchema.parse_obj({})
+            raise
@@ -0,0 +1,280 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from typing import Any
+
+import pydantic
+
+from . import ir
+from .cache import SchemaCache
+from .load import (
+    ModelSchemaLoader,
+    iter_model_schemas,
+    load_model_schemas,
+    load_model_schemas_and_resolver,
+)
+from .types import StringSchema
+
+
+class Test_load_model_schemas(unittest.TestCase):
+    def test_external(self) -> None:
+        """
+        Schemas referenced in other documents are loaded too
+        """
+
+        documents = {
+            "root.json": {
+                "properties": {
+                    "Person": {
+                        "id": "#Person",
+                        "type": "object",
+                        "properties": {"address": {"$ref": "common.json#Address"}},
+                    },
+                },
+            },
+            "common.json": {
+                "properties": {
+                    "Address": {
+                        "id": "#Address",
+                        "type": "object",
+                        "properties": {"country": {"$ref": "#Country"}},
+                    },
+                    "Country": {"id": "#Country", "type": "string"},
+                    "Unused": {"id": "#Unused", "type": "string"},
+                },
+            },
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            for name, document in documents.items():
+                with open(os.path.join(directory, name), "w") as f:
+                    json.dump(document, f)
+
+            schemas = load_model_schemas(
+                logging.getLogger(__name__),
+                os.path.join(directory, "root.json"),
+            )
+
+        assert [schema.get_schema_name() for schema in schemas] == [
+            "Person",
+            "Address",
+            "Country",
+        ]
+
+    def test_external_relative_refs(self) -> None:
+        """
+        Refs in schemas from other documents are relative to those documents,
+        and are rewritten to resolve the same from the root schema
+        """
+
+        documents = {
+            "root.json": {
+                "properties": {
+                    "Person": {
+                        "id": "#Person",
+                        "type": "object",
+                        "properties": {
+                            "address": {"$ref": "common/address.json#Address"},
+                        },
+                    },
+                },
+            },
+            "common/address.json": {
+                "properties": {
+                    "Address": {
+                        "id": "#Address",
+                        "type": "object",
+                        "properties": {
+                            "country": {"$ref": "#Country"},
+                            "region": {"$ref": "regions.json#Region"},
+                            "owner": {"$ref": "../root.json#Person"},
+                        },
+                    },
+                    "Country": {"id": "#Country", "type": "integer"},
+                },
+            },
+            "common/regions.json": {
+                "properties": {
+                    "Region": {"id": "#Region", "type": "string"},
+                },
+            },
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, "common"))
+            for name, document in documents.items():
+                with open(os.path.join(directory, name), "w") as f:
+                    json.dump(document, f)
+
+            schemas, resolver = load_model_schemas_and_resolver(
+                logging.getLogger(__name__),
+                os.path.join(directory, "root.json"),
+            )
+
+            address = ir.from_schema(schemas[1])
+            assert isinstance(address, ir.ObjectSchema)
+
+            assert {
+                name: schema.ref for name, schema in address.properties.items()
+            } == {
+                "country": "common/address.json#Country",
+                "region": "common/regions.json#Region",
+                "owner": "#Person",
+            }
+            assert [
+                resolver.follow(schema).type for schema in address.properties.values()
+            ] == ["integer", "string", "object"]
+
+    def test_only_pointer(self) -> None:
+        """
+        Only the named schemas, and the ones they reference by JSON Pointer,
+        are loaded
+        """
+
+        document = {
+            "properties": {
+                "Person": {
+                    "id": "#Person",
+                    "type": "object",
+                    "properties": {"address": {"$ref": "#/properties/Address"}},
+                },
+                "Address": {"id": "#Address", "type": "object"},
+                "Unrelated": {"id": "#Unrelated", "type": "object"},
+            },
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "root.json")
+            with open(path, "w") as f:
+                json.dump(document, f)
+
+            schemas = load_model_schemas(
+                logging.getLogger(__name__),
+                path,
+                only=["Person"],
+            )
+
+        assert [schema.get_schema_name() for schema in schemas] == [
+            "Person",
+            "Address",
+        ]
+
+    def test_cache_path(self) -> None:
+        """
+        Inputs with the same content in different directories don't share
+        cache entries, since their relative refs are to different documents
+        """
+
+        root = {
+            "properties": {
+                "Person": {
+                    "id": "#Person",
+                    "type": "object",
+                    "properties": {"address": {"$ref": "common.json#Address"}},
+                },
+            },
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SchemaCache(os.path.join(directory, "cache"))
+
+            for name, address_type in (("a", "string"), ("b", "integer")):
+                os.mkdir(os.path.join(directory, name))
+                with open(os.path.join(directory, name, "root.json"), "w") as f:
+                    json.dump(root, f)
+
+                with open(os.path.join(directory, name, "common.json"), "w") as f:
+                    json.dump(
+                        {
+                            "properties": {
+                                "Address": {"id": "#Address", "type": address_type},
+                            },
+                        },
+                        f,
+                    )
+
+            types = [
+                load_model_schemas(
+                    logging.getLogger(__name__),
+                    os.path.join(directory, name, "root.json"),
+                    cache=cache,
+                )[1].type
+                for name in ("a", "b")
+            ]
+
+        assert types == ["string", "integer"]
+
+
+class Test_iter_model_schemas(unittest.TestCase):
+    def test_same_as_load(self) -> None:
+        """
+        Streaming loads the same schemas, and fails the same way
+        """
+
+        logger = logging.getLogger(__name__)
+        documents: list[dict[str, Any]] = [
+            {
+                "properties": {
+                    "Person": {"id": "#Person", "type": "object", "properties": {}},
+                    "Color": {"id": "#Color", "type": "string", "enum": ["red"]},
+                },
+            },
+            {"properties": {}},
+            {"definitions": {"Person": {"id": "#Person", "type": "object"}}},
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "root.json")
+
+            for document in documents:
+                with self.subTest(document=document):
+                    with open(path, "w") as f:
+                        json.dump(document, f)
+
+                    if "properties" in document:
+                        assert list(iter_model_schemas(logger, path)) == (
+                            load_model_schemas(logger, path)
+                        )
+                        continue
+
+                    with self.assertRaises(pydantic.ValidationError):
+                        load_model_schemas(logger, path)
+
+                    with self.assertRaises(pydantic.ValidationError):
+                        list(iter_model_schemas(logger, path))
+
+
+class Test_ModelSchemaLoader(unittest.TestCase):
+    def test_reuse(self) -> None:
+        """
+        Schemas that didn't change between loads are the same objects
+        """
+
+        document: dict[str, Any] = {
+            "properties": {
+                "Person": {"id": "#Person", "type": "object", "properties": {}},
+                "Color": {"id": "#Color", "type": "string", "enum": ["red"]},
+            },
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "root.json")
+            with open(path, "w") as f:
+                json.dump(document, f)
+
+            loader = ModelSchemaLoader(logging.getLogger(__name__), path)
+            person, color = loader.load()[0]
+            assert loader.documents == [path]
+
+            document["properties"]["Color"]["enum"] = ["red", "blue"]
+            with open(path, "w") as f:
+                json.dump(document, f)
+
+            new_person, new_color = loader.load()[0]
+
+        assert new_person is person
+        assert new_color is not color
+        assert isinstance(new_color, StringSchema)
+        assert new_color.enum == ["red", "blue"]
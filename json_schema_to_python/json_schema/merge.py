@@ -1,92 +1,263 @@
-import copy
-from typing import TypeVar
+import collections
+import weakref
+from typing import Sequence
 
-from .types import (
-    AnyOfSchema,
-    ObjectSchema,
-    Schema,
-    get_schema_from_type,
-)
+from . import ir, profiling
+from .resolve import RefResolver
 
 
-def merge_schemas(schemas: list[ObjectSchema]) -> ObjectSchema:
+def merge_schemas(
+    schemas: Sequence[ir.ObjectSchema],
+    resolver: RefResolver | None = None,
+) -> ir.ObjectSchema:
+    """
+    Args:
+        schemas: Schemas to merge
+        resolver: Used to follow refs in overlapping properties. Without it,
+            overlapping refs can't be merged
+    """
+
+    if profiling.counts is not None:
+        profiling.counts["merges"] += 1
+        profiling.counts["merged_schemas"] += len(schemas)
+
     if len(schemas) == 0:
         return schemas[0]
 
-    new_schema = copy.deepcopy(schemas[0])
+    first = schemas[0]
+
+    # Copy-on-write: the first schema's properties are shared, and only the
+    # properties that other schemas add or narrow are collected here
+    changes: dict[str, ir.Schema] = {}
+
+    # Ordered by first appearance, so the output doesn't depend on set order
+    required: dict[str, None] | None = (
+        None if first.required is None else dict.fromkeys(first.required)
+    )
+
+    # Wide `allOf` lists intersect the same few property schemas over and over.
+    # Results are interned too, so an intersection that doesn't narrow the
+    # existing property is the same object, which the check below relies on.
+    intersections: dict[tuple[bytes, bytes], ir.Schema] = {}
 
     for schema in schemas[1:]:
         for property_name, property_schema in schema.properties.items():
-            if property_name in new_schema.properties:
-                property_schema = _get_schema_intersection(
-                    new_schema.properties[property_name],
-                    property_schema,
-                )
+            existing = changes.get(property_name)
+            if existing is None:
+                existing = first.properties.get(property_name)
+
+            if existing is not None:
+                key = (existing.fingerprint, property_schema.fingerprint)
+                intersection = intersections.get(key)
+
+                if intersection is None:
+                    intersection = ir.intern_schema(
+                        _get_schema_intersection(
+                            existing,
+                            property_schema,
+                            resolver,
+                        )
+                    )
+                    intersections[key] = intersection
+
+                if intersection is existing:
+                    continue
+
+                property_schema = intersection
+
+            changes[property_name] = property_schema
+
+        if schema.required is not None:
+            if required is None:
+                required = {}
+
+            required.update(dict.fromkeys(schema.required))
 
-            new_schema.properties[property_name] = property_schema
+    required_names = None if required is None else tuple(required)
 
-            if schema.was_attribute_defaulted("required") is False:
-                new_schema.required = list(set(new_schema.required + schema.required))
+    if len(changes) == 0 and required_names == first.required:
+        return first
 
-    return new_schema
+    return ir.ObjectSchema(
+        allOf=first.allOf,
+        id=first.id,
+        properties={**first.properties, **changes},
+        ref=first.ref,
+        required=required_names,
+    )
 
 
-def _get_schema_intersection(a: Schema, b: Schema) -> Schema:
+class MergeCache:
     """
-    Return a schema that's the intersection of both schema parameters
+    Bounded LRU of `merge_schemas` results. The same `allOf` combinations tend
+    to recur across many models, so each is only merged once.
+
+    Results are keyed by the ordered fingerprints of the merged schemas, which
+    are structural, so a changed schema is a different key. Refs are followed
+    through the resolver, so results are dropped whenever a different
+    resolver is used (e.g. after the input is reloaded).
+
+    Args:
+        max_size: Number of results to keep
     """
 
-    # Unable to resolve refs in this function
-    if a.ref is not None:
-        raise Exception("cannot find intersection for a ref")
-    if b.ref is not None:
-        raise Exception("cannot find intersection for a ref")
+    def __init__(self, max_size: int = 1024) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._results: collections.OrderedDict[
+            tuple[bytes, ...], ir.ObjectSchema
+        ] = collections.OrderedDict()
+        self._resolver: weakref.ref[RefResolver] | None = None
 
-    if isinstance(a, AnyOfSchema):
-        a_types = a.anyOf.__root__
-    elif a.type is None:
-        raise Exception("schema has no type")
-    elif isinstance(a.type, list):
-        a_types = [get_schema_from_type(type) for type in a.type]
-    else:
-        a_types = [get_schema_from_type(a.type)]
+    def merge(
+        self,
+        schemas: Sequence[ir.ObjectSchema],
+        resolver: RefResolver | None = None,
+    ) -> ir.ObjectSchema:
+        """
+        Like `merge_schemas`, but return the cached result if there is one
+        """
 
-    if isinstance(b, AnyOfSchema):
-        b_types = b.anyOf.__root__
-    elif b.type is None:
-        raise Exception("schema has no type")
-    elif isinstance(b.type, list):
-        b_types = [get_schema_from_type(type) for type in b.type]
+        resolver_ref = None if resolver is None else weakref.ref(resolver)
+        if resolver_ref != self._resolver:
+            self.clear()
+            self._resolver = resolver_ref
+
+        key = tuple(schema.fingerprint for schema in schemas)
+
+        merged = self._results.get(key)
+        if profiling.counts is not None:
+            profiling.counts[
+                "merge_cache_misses" if merged is None else "merge_cache_hits"
+            ] += 1
+
+        if merged is not None:
+            self.hits += 1
+            self._results.move_to_end(key)
+
+            return merged
+
+        self.misses += 1
+        merged = merge_schemas(schemas, resolver)
+
+        self._results[key] = merged
+        if len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+        return merged
+
+    def clear(self) -> None:
+        """
+        Drop every cached result. Counters are kept.
+        """
+
+        self._results.clear()
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._results),
+            "max_size": self.max_size,
+        }
+
+
+def _get_schema_intersection(
+    a: ir.Schema,
+    b: ir.Schema,
+    resolver: RefResolver | None = None,
+) -> ir.Schema:
+    """
+    Return a schema that's the intersection of both schema parameters. A ref
+    to a named model (e.g. `{"$ref": "#Address"}`) is kept when the other
+    schema is a ref to the same model, or doesn't narrow it, so that the
+    model's name isn't lost. Refs to two different named models conflict.
+    """
+
+    # Without a resolver, equal refs are taken to be relative to the same
+    # document. With one, refs are compared by what they point to, since a ref
+    # that's followed into another document is relative to that document.
+    if (
+        resolver is None
+        and isinstance(a, ir.TypelessSchema)
+        and isinstance(b, ir.TypelessSchema)
+        and a.ref == b.ref
+    ):
+        return a
+
+    if resolver is None:
+        followed_a, followed_b = a, b
     else:
-        b_types = [get_schema_from_type(b.type)]
+        followed_a = resolver.follow(a)
+        followed_b = resolver.follow(b)
 
-    types = _get_schemas_intersection(a_types, b_types)
+        # Schemas are hash-consed, so refs to the same target follow to the
+        # same object
+        if a is not followed_a and followed_a is followed_b:
+            return a
+
+    types = _get_schemas_intersection(
+        _get_type_schemas(followed_a),
+        _get_type_schemas(followed_b),
+    )
 
     if len(types) == 0:
         raise Exception("no schema intersection")
-    elif len(types) == 1:
+
+    models = [
+        (schema, followed)
+        for schema, followed in ((a, followed_a), (b, followed_b))
+        if schema is not followed and followed.id is not None
+    ]
+
+    if len(models) == 2:
+        raise Exception(f"conflicting refs {a.ref} and {b.ref}")
+
+    fingerprints = [item.fingerprint for item in types]
+    for schema, followed in models:
+        if fingerprints == [item.fingerprint for item in _get_type_schemas(followed)]:
+            return schema
+
+    if len(types) == 1:
         return types[0]
     else:
-        return AnyOfSchema.parse_obj({"anyOf": types})
+        return ir.AnyOfSchema(anyOf=types)
 
 
-T = TypeVar("T")
+def _get_type_schemas(schema: ir.Schema) -> Sequence[ir.Schema]:
+    """
+    Get the schemas that a schema is a union of. Typed schemas become the
+    shared schema for their type, whose fingerprint is only computed once.
+    """
+
+    # Unable to resolve refs in this function
+    if schema.ref is not None:
+        raise Exception("cannot find intersection for a ref")
 
+    if type(schema) is ir.AnyOfSchema:
+        return schema.anyOf
 
-def _get_schemas_intersection(a: list[Schema], b: list[Schema]) -> list[Schema]:
+    schema_type = schema.type
+    if schema_type is None:
+        raise Exception("schema has no type")
+    elif isinstance(schema_type, tuple):
+        return [ir.get_schema_from_type(t) for t in schema_type]
+    else:
+        return (ir.get_schema_from_type(schema_type),)
+
+
+def _get_schemas_intersection(
+    a: Sequence[ir.Schema],
+    b: Sequence[ir.Schema],
+) -> list[ir.Schema]:
     """
     Return a list that contains items that exist in both list parameters.
-    Retains list order.
+    Retains the order of `a`.
     """
 
-    new_list: list[Schema] = []
-
-    for item in a:
-        if item in b:
-            new_list.append(item)
-
-    for item in b:
-        if item not in new_list and item in a:
-            new_list.append(item)
+    # Schemas are compared by fingerprint, so this is linear instead of
+    # comparing every pair
+    b_fingerprints = {item.fingerprint for item in b}
 
-    return new_list
+    return [item for item in a if item.fingerprint in b_fingerprints]
@@ -1,26 +1,33 @@
 import unittest
 
 
-from .merge import _get_schemas_intersection, merge_schemas
+from . import ir
+from .merge import MergeCache, _get_schemas_intersection, merge_schemas
+from .resolve import RefResolver
 from .types import (
     IntegerSchema,
     Schema,
     create_schema_from_dict,
-    is_list_of_object_schemas,
 )
 
 
+def _create_ir_schema_from_dict(value: dict) -> ir.Schema:
+    return ir.from_schema(create_schema_from_dict(value))
+
+
 class Test_merge_schemas(unittest.TestCase):
     def assert_merge_schemas(
         self,
         schemas: list[Schema],
         expectation: dict,
     ) -> None:
-        if is_list_of_object_schemas(schemas):
-            assert merge_schemas(schemas).to_dict() == expectation
+        ir_schemas = [ir.from_schema(schema) for schema in schemas]
+
+        if ir.is_list_of_object_schemas(ir_schemas):
+            assert merge_schemas(ir_schemas).to_dict() == expectation
 
             # Ensure that schema order doesn't matter
-            assert merge_schemas(list(reversed(schemas))).to_dict() == expectation
+            assert merge_schemas(list(reversed(ir_schemas))).to_dict() == expectation
         else:
             raise Exception("schemas is not a list of ObjectSchema")
 
@@ -277,23 +284,242 @@ class Test_merge_schemas(unittest.TestCase):
 
         self.assert_merge_schemas(schemas, expectation)
 
+    def test_required_order(self) -> None:
+        """
+        `required` keeps the order names first appear in, including names from
+        schemas without properties
+        """
+
+        schemas = [
+            _create_ir_schema_from_dict(
+                {
+                    "type": "object",
+                    "properties": {"a": {"type": "integer"}},
+                    "required": ["b", "a"],
+                }
+            ),
+            _create_ir_schema_from_dict({"type": "object", "required": ["c", "a"]}),
+        ]
+
+        assert ir.is_list_of_object_schemas(schemas)
+        assert merge_schemas(schemas).required == ("b", "a", "c")
+
+    def test_unchanged(self) -> None:
+        """
+        The first schema is returned as-is when the others don't change it
+        """
+
+        schemas = [
+            _create_ir_schema_from_dict(
+                {
+                    "type": "object",
+                    "properties": {
+                        "a": {"type": "integer"},
+                        "b": {"type": ["integer", "null"]},
+                    },
+                }
+            ),
+            _create_ir_schema_from_dict(
+                {
+                    "type": "object",
+                    "properties": {"a": {"type": "integer"}},
+                }
+            ),
+        ]
+
+        assert ir.is_list_of_object_schemas(schemas)
+        assert merge_schemas(schemas) is schemas[0]
+
+    def test_ref_overlap(self) -> None:
+        """
+        Overlapping refs are followed when there's a resolver
+        """
+
+        resolver = RefResolver(
+            {
+                "definitions": {
+                    "Id": {"type": ["integer", "string"]},
+                },
+            }
+        )
+
+        schemas = [
+            _create_ir_schema_from_dict(
+                {
+                    "type": "object",
+                    "properties": {"a": {"$ref": "#/definitions/Id"}},
+                }
+            ),
+            _create_ir_schema_from_dict(
+                {
+                    "type": "object",
+                    "properties": {"a": {"type": "integer"}},
+                }
+            ),
+        ]
+
+        assert ir.is_list_of_object_schemas(schemas)
+
+        with self.assertRaises(Exception):
+            merge_schemas(schemas)
+
+        assert merge_schemas(schemas, resolver).to_dict() == {
+            "type": "object",
+            "properties": {"a": {"type": "integer"}},
+        }
+
+    def test_model_ref_overlap(self) -> None:
+        """
+        Refs to a named model are kept, rather than replaced by the model's
+        type
+        """
+
+        resolver = RefResolver(
+            {
+                "properties": {
+                    "Address": {
+                        "id": "#Address",
+                        "type": "object",
+                        "properties": {"street": {"type": "string"}},
+                    },
+                },
+            }
+        )
+
+        for other in (
+            {"$ref": "#Address"},
+            {"$ref": "#/properties/Address"},
+            {"type": "object"},
+        ):
+            with self.subTest(other=other):
+                schemas = [
+                    _create_ir_schema_from_dict(
+                        {
+                            "type": "object",
+                            "properties": {"home": {"$ref": "#Address"}},
+                        }
+                    ),
+                    _create_ir_schema_from_dict(
+                        {"type": "object", "properties": {"home": other}}
+                    ),
+                ]
+
+                assert ir.is_list_of_object_schemas(schemas)
+                assert merge_schemas(schemas, resolver).to_dict() == {
+                    "type": "object",
+                    "properties": {"home": {"ref": "#Address"}},
+                }
+
+        # The same ref doesn't need a resolver
+        same_schemas = [schemas[0], schemas[0]]
+        assert ir.is_list_of_object_schemas(same_schemas)
+        assert merge_schemas(same_schemas).to_dict() == {
+            "type": "object",
+            "properties": {"home": {"ref": "#Address"}},
+        }
+
+    def test_distinct_model_refs(self) -> None:
+        """
+        Refs to different named models conflict, even if they're both objects
+        """
+
+        resolver = RefResolver(
+            {
+                "properties": {
+                    "Address": {
+                        "id": "#Address",
+                        "type": "object",
+                        "properties": {"street": {"type": "string"}},
+                    },
+                    "Person": {
+                        "id": "#Person",
+                        "type": "object",
+                        "properties": {"name": {"type": "string"}},
+                    },
+                },
+            }
+        )
+
+        schemas = [
+            _create_ir_schema_from_dict(
+                {"type": "object", "properties": {"home": {"$ref": f"#{name}"}}}
+            )
+            for name in ("Address", "Person")
+        ]
+
+        assert ir.is_list_of_object_schemas(schemas)
+        with self.assertRaisesRegex(Exception, "conflicting refs"):
+            merge_schemas(schemas, resolver)
+
+
+class Test_MergeCache(unittest.TestCase):
+    def create_schemas(self, *property_names: str) -> list[ir.ObjectSchema]:
+        schemas = [
+            _create_ir_schema_from_dict(
+                {"type": "object", "properties": {name: {"type": "integer"}}}
+            )
+            for name in property_names
+        ]
+        assert ir.is_list_of_object_schemas(schemas)
+
+        return list(schemas)
+
+    def test_hit(self) -> None:
+        cache = MergeCache()
+
+        merged = cache.merge(self.create_schemas("a", "b"))
+        assert merged == merge_schemas(self.create_schemas("a", "b"))
+
+        # Structurally equal schemas hit, even if they're different objects
+        assert cache.merge(self.create_schemas("a", "b")) is merged
+        assert cache.merge(self.create_schemas("b", "a")) is not merged
+
+        assert cache.get_stats() == {
+            "hits": 1,
+            "misses": 2,
+            "size": 2,
+            "max_size": 1024,
+        }
+
+    def test_evict(self) -> None:
+        cache = MergeCache(max_size=2)
+
+        cache.merge(self.create_schemas("a", "b"))
+        cache.merge(self.create_schemas("a", "c"))
+        cache.merge(self.create_schemas("a", "b"))
+        cache.merge(self.create_schemas("a", "d"))
+
+        # The least recently used result was evicted
+        cache.merge(self.create_schemas("a", "b"))
+        cache.merge(self.create_schemas("a", "c"))
+        assert (cache.hits, cache.misses) == (2, 4)
+
+    def test_resolver_changed(self) -> None:
+        cache = MergeCache()
+        resolver = RefResolver({})
+
+        cache.merge(self.create_schemas("a", "b"), resolver)
+        cache.merge(self.create_schemas("a", "b"), resolver)
+        cache.merge(self.create_schemas("a", "b"), RefResolver({}))
+        assert (cache.hits, cache.misses) == (1, 2)
+
 
 class Test_get_schemas_intersection(unittest.TestCase):
     def test_primitives(self) -> None:
-        schemas_1 = [create_schema_from_dict({"type": "integer"})]
+        schemas_1 = [_create_ir_schema_from_dict({"type": "integer"})]
 
         schemas_2 = [
-            create_schema_from_dict({"type": "integer"}),
-            create_schema_from_dict({"type": "string"}),
+            _create_ir_schema_from_dict({"type": "integer"}),
+            _create_ir_schema_from_dict({"type": "string"}),
         ]
 
-        expectation = [IntegerSchema.parse_obj({"type": "integer"})]
+        expectation = [ir.from_schema(IntegerSchema.parse_obj({"type": "integer"}))]
 
         assert _get_schemas_intersection(schemas_1, schemas_2) == expectation
 
     def test_enums(self) -> None:
         schemas_1 = [
-            create_schema_from_dict(
+            _create_ir_schema_from_dict(
                 {
                     "type": "string",
                     "enum": ["a", "b"],
@@ -302,7 +528,7 @@ class Test_get_schemas_intersection(unittest.TestCase):
         ]
 
         schemas_2 = [
-            create_schema_from_dict(
+            _create_ir_schema_from_dict(
                 {
                     "type": "string",
                     "enum": ["b", "c"],
@@ -313,7 +539,22 @@ class Test_get_schemas_intersection(unittest.TestCase):
         assert _get_schemas_intersection(schemas_1, schemas_2) == []
 
     def test_no_intersection(self) -> None:
-        schemas_1 = [create_schema_from_dict({"type": "integer"})]
-        schemas_2 = [create_schema_from_dict({"type": "string"})]
+        schemas_1 = [_create_ir_schema_from_dict({"type": "integer"})]
+        schemas_2 = [_create_ir_schema_from_dict({"type": "string"})]
 
         assert _get_schemas_intersection(schemas_1, schemas_2) == []
+
+    def test_order(self) -> None:
+        """
+        Items keep the order of the first list
+        """
+
+        schemas_1 = [
+            _create_ir_schema_from_dict({"type": "string"}),
+            _create_ir_schema_from_dict({"type": "null"}),
+            _create_ir_schema_from_dict({"type": "integer"}),
+        ]
+        schemas_2 = list(reversed(schemas_1))
+
+        assert _get_schemas_intersection(schemas_1, schemas_2) == schemas_1
+        assert _get_schemas_intersection(schemas_2, schemas_1) == schemas_2
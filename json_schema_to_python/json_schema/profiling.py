@@ -0,0 +1,142 @@
+"""
+Profile a run: the wall and CPU time and peak memory of each of its stages,
+and counts of events on hot paths (e.g. schemas that fail to parse).
+
+Nothing is recorded unless a `Profiler` is started, so that marking a stage or
+counting an event only costs a check. Hot paths count events directly:
+
+```
+if profiling.counts is not None:
+    profiling.counts["merges"] += 1
+```
+"""
+
+import collections
+import contextlib
+import time
+import tracemalloc
+from typing import Any, ContextManager, Iterator
+
+# Event counts of the started profiler, by name
+counts: collections.Counter[str] | None = None
+
+_profiler: "Profiler | None" = None
+
+
+class Profiler:
+    """
+    Records the stages of a run, and counts events, while started. Memory is
+    traced with `tracemalloc`, which slows the run down.
+
+    Stages shouldn't be nested, since each resets the peak of traced memory. A
+    stage that's entered more than once adds to its times.
+
+    Args:
+        should_trace_memory: Trace memory, if it isn't already being traced
+    """
+
+    def __init__(self, should_trace_memory: bool = True) -> None:
+        self.should_trace_memory = should_trace_memory
+        self.stages: dict[str, dict[str, float]] = {}
+        self.counts: collections.Counter[str] = collections.Counter()
+        self._is_tracing = False
+        self._start: tuple[float, float] | None = None
+        self._total: dict[str, float] = {}
+        # Peak of traced memory across stages, since each resets it
+        self._peak_bytes = 0
+
+    def start(self) -> None:
+        global counts, _profiler
+
+        if _profiler is not None:
+            raise Exception("a profiler is already started")
+
+        if self.should_trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._is_tracing = True
+
+        counts = self.counts
+        _profiler = self
+        self._start = (time.perf_counter(), time.process_time())
+
+    def stop(self) -> None:
+        global counts, _profiler
+
+        if _profiler is not self or self._start is None:
+            raise Exception("the profiler isn't started")
+
+        wall_start, cpu_start = self._start
+        self._total = {
+            "wall_seconds": time.perf_counter() - wall_start,
+            "cpu_seconds": time.process_time() - cpu_start,
+        }
+
+        if tracemalloc.is_tracing():
+            self._total["peak_bytes"] = max(
+                self._peak_bytes,
+                tracemalloc.get_traced_memory()[1],
+            )
+
+        if self._is_tracing:
+            tracemalloc.stop()
+            self._is_tracing = False
+
+        counts = None
+        _profiler = None
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Record the time that the block takes, and the most memory it
+        allocates at once (above what was allocated when it started)
+        """
+
+        is_tracing = tracemalloc.is_tracing()
+        if is_tracing:
+            start_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            self._peak_bytes = max(self._peak_bytes, peak_bytes)
+            tracemalloc.reset_peak()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(
+                name,
+                {"wall_seconds": 0.0, "cpu_seconds": 0.0},
+            )
+            stage["wall_seconds"] += time.perf_counter() - wall_start
+            stage["cpu_seconds"] += time.process_time() - cpu_start
+
+            if is_tracing:
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+                self._peak_bytes = max(self._peak_bytes, peak_bytes)
+                stage["peak_bytes"] = max(
+                    stage.get("peak_bytes", 0),
+                    peak_bytes - start_bytes,
+                )
+
+    def get_summary(self) -> dict[str, Any]:
+        """
+        Get the stages in the order they were first entered, the whole run's
+        times and peak memory (once stopped), and the event counts
+        """
+
+        return {
+            "stages": self.stages,
+            "total": self._total,
+            "counts": dict(sorted(self.counts.items())),
+        }
+
+
+def stage(name: str) -> ContextManager[None]:
+    """
+    Record a stage with the started profiler, if there is one
+    """
+
+    if _profiler is None:
+        return contextlib.nullcontext()
+
+    return _profiler.stage(name)
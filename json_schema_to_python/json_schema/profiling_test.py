@@ -0,0 +1,61 @@
+import unittest
+
+from . import ir, profiling
+from .merge import MergeCache
+from .types import create_schema_from_dict
+
+
+def _create_ir_object_schema(value: dict) -> ir.ObjectSchema:
+    schema = ir.from_schema(create_schema_from_dict(value))
+    assert isinstance(schema, ir.ObjectSchema)
+
+    return schema
+
+
+class Test_Profiler(unittest.TestCase):
+    def test_profiler(self) -> None:
+        profiler = profiling.Profiler()
+        profiler.start()
+
+        try:
+            with profiling.stage("parse"):
+                # Both classes are candidates, and the first fails
+                create_schema_from_dict(
+                    {"type": "object", "allOf": 1, "anyOf": [{"type": "string"}]}
+                )
+
+            schemas = [
+                _create_ir_object_schema(
+                    {"type": "object", "properties": {"a": {"type": "string"}}}
+                ),
+                _create_ir_object_schema(
+                    {"type": "object", "properties": {"b": {"type": "string"}}}
+                ),
+            ]
+
+            with profiling.stage("merge"):
+                merge_cache = MergeCache()
+                merge_cache.merge(schemas)
+                merge_cache.merge(schemas)
+        finally:
+            profiler.stop()
+
+        summary = profiler.get_summary()
+        assert list(summary["stages"]) == ["parse", "merge"]
+        for stage in summary["stages"].values():
+            assert set(stage) == {"wall_seconds", "cpu_seconds", "peak_bytes"}
+
+        assert summary["total"]["wall_seconds"] >= sum(
+            stage["wall_seconds"] for stage in summary["stages"].values()
+        )
+        assert summary["counts"]["schema_parse_failures"] == 1
+        assert {
+            name: summary["counts"][name]
+            for name in ("merges", "merged_schemas", "merge_cache_hits")
+        } == {"merges": 1, "merged_schemas": 2, "merge_cache_hits": 1}
+
+        # Nothing is recorded once stopped
+        assert profiling.counts is None
+        with profiling.stage("parse"):
+            create_schema_from_dict({"type": "string"})
+        assert profiler.get_summary() == summary
@@ -0,0 +1,112 @@
+from typing import Any, Collection
+
+from .resolve import RefResolver, is_external_ref, iter_refs
+
+
+def prune_root_schema_dict(
+    value: dict[str, Any],
+    names: Collection[str],
+) -> dict[str, Any]:
+    """
+    Drop the root schema's `properties` that aren't reachable from the named
+    schemas. References are followed through every nested `$ref` (including
+    the ones in `allOf` and array `items`), so the result has everything the
+    named schemas need.
+
+    Refs are resolved the same way as when generating (by `id` or JSON
+    Pointer), and followed through schemas outside `properties` (e.g. in
+    `definitions`) too. A ref into a property (e.g.
+    "#/properties/Pet/properties/toys") keeps the whole property.
+
+    This works on the decoded JSON before validation, so unreachable schemas
+    are never validated.
+
+    Args:
+        value: Decoded root schema
+        names: Schema names (the part of `id` after "#") or `properties` keys
+    """
+
+    properties: dict[str, Any] = value.get("properties", {})
+
+    # Names can be `properties` keys or the names in their `id`s
+    keys_by_name: dict[str, str] = {}
+    for key in properties:
+        keys_by_name[key] = key
+
+    for key, schema in properties.items():
+        if isinstance(schema, dict) and isinstance(schema.get("id"), str):
+            keys_by_name[_get_schema_name(schema["id"])] = key
+
+    pending: list[Any] = []
+    for name in names:
+        if name not in keys_by_name:
+            raise Exception(f"unknown schema {name}")
+
+        pending.append(properties[keys_by_name[name]])
+
+    keys_by_node = _get_property_keys_by_node(properties)
+    resolver = RefResolver(value)
+
+    reachable: set[str] = set()
+    seen: set[int] = set()
+    while len(pending) > 0:
+        node = pending.pop()
+
+        property_key = keys_by_node.get(id(node))
+        if property_key is not None:
+            if property_key in reachable:
+                continue
+
+            reachable.add(property_key)
+            # Everything in a property that's kept has to resolve
+            node = properties[property_key]
+        elif id(node) in seen:
+            continue
+
+        seen.add(id(node))
+
+        for ref in iter_refs(node):
+            # Refs to other documents are loaded separately
+            if is_external_ref(ref):
+                continue
+
+            try:
+                target, _ = resolver.find(ref)
+            except Exception:
+                # Refs that don't resolve are left for the type checker to
+                # complain about, same as without pruning
+                continue
+
+            pending.append(target)
+
+    return {
+        **value,
+        "properties": {k: v for k, v in properties.items() if k in reachable},
+    }
+
+
+def _get_property_keys_by_node(properties: dict[str, Any]) -> dict[int, str]:
+    """
+    Index every schema nested in `properties` (by `id()`) by the key of the
+    property it's in
+    """
+
+    keys_by_node: dict[int, str] = {}
+
+    for key, schema in properties.items():
+        stack = [schema]
+
+        while len(stack) > 0:
+            item = stack.pop()
+
+            if isinstance(item, dict):
+                keys_by_node[id(item)] = key
+                stack.extend(item.values())
+            elif isinstance(item, list):
+                stack.extend(item)
+
+    return keys_by_node
+
+
+def _get_schema_name(ref: str) -> str:
+    return ref.split("#")[-1]
@@ -0,0 +1,79 @@
+import unittest
+from typing import Any
+
+from .prune import prune_root_schema_dict
+
+
+class Test_prune_root_schema_dict(unittest.TestCase):
+    root_schema: dict[str, Any] = {
+        "id": "#root",
+        "properties": {
+            "Animal": {
+                "id": "#Animal",
+                "type": "object",
+                "properties": {"species": {"$ref": "#Species"}},
+            },
+            "Pet": {
+                "id": "#Pet",
+                "type": "object",
+                "allOf": [{"$ref": "#Animal"}],
+                "properties": {
+                    "toys": {"type": "array", "items": [{"ref": "#Toy"}]},
+                },
+            },
+            "Species": {"id": "#Species", "type": "string", "enum": ["cat"]},
+            "Toy": {"id": "#Toy", "type": "object"},
+            "Unrelated": {"id": "#Unrelated", "type": "object"},
+        },
+    }
+
+    def assert_reachable(self, names: list[str], expectation: list[str]) -> None:
+        pruned = prune_root_schema_dict(self.root_schema, names)
+
+        assert pruned["id"] == "#root"
+        assert sorted(pruned["properties"]) == expectation
+
+    def test_transitive(self) -> None:
+        self.assert_reachable(["Pet"], ["Animal", "Pet", "Species", "Toy"])
+
+    def test_leaf(self) -> None:
+        self.assert_reachable(["Animal"], ["Animal", "Species"])
+        self.assert_reachable(["Unrelated"], ["Unrelated"])
+
+    def test_unknown(self) -> None:
+        with self.assertRaises(Exception):
+            prune_root_schema_dict(self.root_schema, ["Nope"])
+
+    def test_pointer(self) -> None:
+        """
+        JSON Pointer refs are followed, including through schemas outside
+        `properties`
+        """
+
+        root_schema: dict[str, Any] = {
+            "definitions": {
+                "Ids": {"type": "array", "items": {"$ref": "#/properties/Id"}},
+            },
+            "properties": {
+                "Person": {
+                    "id": "#Person",
+                    "type": "object",
+                    "properties": {
+                        "ids": {"$ref": "#/definitions/Ids"},
+                        "home": {"$ref": "#/properties/Address/properties/street"},
+                    },
+                },
+                "Address": {
+                    "id": "#Address",
+                    "type": "object",
+                    "properties": {"street": {"type": "string"}},
+                },
+                "Id": {"id": "#Id", "type": "string", "enum": ["a"]},
+                "Unrelated": {"id": "#Unrelated", "type": "object"},
+            },
+        }
+
+        pruned = prune_root_schema_dict(root_schema, ["Person"])
+
+        assert sorted(pruned["properties"]) == ["Address", "Id", "Person"]
+        assert pruned["definitions"] == root_schema["definitions"]
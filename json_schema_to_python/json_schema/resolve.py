@@ -0,0 +1,272 @@
+import os
+from typing import Any, Callable, Iterator
+
+from . import ir
+from .decode import Decoder, decode_file, get_decoder
+from .types import create_schema_from_dict
+
+
+class DocumentCache:
+    """
+    Documents referenced by cross-file refs (e.g. "common.json#Address"), keyed
+    by absolute path. Each document is read and decoded at most once, and only
+    when a ref first reaches it.
+    """
+
+    def __init__(self, decoder: Decoder | None = None) -> None:
+        self._decoder = decoder
+        self._resolvers: dict[str, RefResolver] = {}
+
+    def add(
+        self,
+        path: str,
+        document: dict[str, Any] | Callable[[], dict[str, Any]],
+    ) -> "RefResolver":
+        """
+        Add a document that's already loaded (e.g. the root schema)
+        """
+
+        resolver = RefResolver(document, path, self)
+        self._resolvers[os.path.abspath(path)] = resolver
+
+        return resolver
+
+    def get_resolver(self, path: str) -> "RefResolver":
+        """
+        Get the resolver for a document, loading it if it hasn't been loaded yet
+        """
+
+        resolver = self._resolvers.get(os.path.abspath(path))
+
+        if resolver is None:
+            if self._decoder is None:
+                self._decoder = get_decoder()
+
+            resolver = self.add(path, decode_file(path, self._decoder))
+
+        return resolver
+
+    def __len__(self) -> int:
+        return len(self._resolvers)
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterate over the absolute paths of the loaded documents
+        """
+
+        return iter(self._resolvers)
+
+
+class RefResolver:
+    """
+    Resolve `$ref` values against a decoded root schema. A ref can be an `id`
+    (e.g. "#Pet") or a JSON Pointer (e.g. "#/definitions/Pet" or
+    "#/$defs/Pet"), optionally prefixed with a path to another document (e.g.
+    "common.json#Address"). Paths are relative to the referencing document.
+
+    The document is indexed in a single pass the first time a ref is resolved.
+    After that every lookup is a dict lookup, and resolved schemas are
+    memoized. The document itself can be passed as a function that decodes it,
+    in which case it's only decoded once a ref needs it.
+    """
+
+    def __init__(
+        self,
+        document: dict[str, Any] | Callable[[], dict[str, Any]],
+        path: str | None = None,
+        documents: DocumentCache | None = None,
+    ) -> None:
+        self._document = document
+        self.path = None if path is None else os.path.abspath(path)
+        self._directory = (
+            os.getcwd() if self.path is None else os.path.dirname(self.path)
+        )
+        self._documents = documents if documents is not None else DocumentCache()
+        self._ids: dict[str, dict[str, Any]] | None = None
+        self._pointers: dict[str, dict[str, Any]] = {}
+        self._resolved: dict[str, ir.Schema] = {}
+
+    @property
+    def document(self) -> dict[str, Any]:
+        if callable(self._document):
+            self._document = self._document()
+
+        return self._document
+
+    def _index(self) -> dict[str, dict[str, Any]]:
+        ids: dict[str, dict[str, Any]] = {}
+        stack: list[tuple[Any, str]] = [(self.document, "#")]
+
+        while len(stack) > 0:
+            node, pointer = stack.pop()
+
+            if isinstance(node, dict):
+                self._pointers[pointer] = node
+
+                for key in ("id", "$id"):
+                    id = node.get(key)
+                    if isinstance(id, str):
+                        ids.setdefault(id, node)
+
+                for k, v in node.items():
+                    if isinstance(v, (dict, list)):
+                        stack.append((v, f"{pointer}/{_escape(k)}"))
+            elif isinstance(node, list):
+                for i, item in enumerate(node):
+                    if isinstance(item, (dict, list)):
+                        stack.append((item, f"{pointer}/{i}"))
+
+        return ids
+
+    def _get_resolver(self, ref: str) -> tuple["RefResolver", str]:
+        """
+        Get the resolver for the document a ref points into, and the ref's
+        fragment
+        """
+
+        path, _, fragment = ref.partition("#")
+        fragment = "#" + fragment
+
+        if path == "":
+            return self, fragment
+
+        resolver = self._documents.get_resolver(os.path.join(self._directory, path))
+
+        return resolver, fragment
+
+    def _find(self, ref: str) -> dict[str, Any]:
+        if self._ids is None:
+            self._ids = self._index()
+
+        node = self._ids.get(ref)
+        if node is None:
+            node = self._pointers.get(ref)
+
+        if node is None:
+            raise Exception(f"cannot resolve ref {ref}")
+
+        return node
+
+    def find(self, ref: str) -> tuple[dict[str, Any], "RefResolver"]:
+        """
+        Get the decoded schema that a ref points to, and the resolver for the
+        document it's in (for resolving the refs nested in it)
+        """
+
+        resolver, fragment = self._get_resolver(ref)
+
+        return resolver._find(fragment), resolver
+
+    def _resolve(self, ref: str) -> tuple[ir.Schema, "RefResolver"]:
+        resolver, fragment = self._get_resolver(ref)
+        schema = resolver._resolved.get(fragment)
+
+        if schema is None:
+            schema = ir.from_schema(create_schema_from_dict(resolver._find(fragment)))
+            resolver._resolved[fragment] = schema
+
+        return schema, resolver
+
+    def resolve(self, ref: str) -> ir.Schema:
+        """
+        Get the schema that a ref points to
+        """
+
+        return self._resolve(ref)[0]
+
+    def follow(self, schema: ir.Schema) -> ir.Schema:
+        """
+        Follow typeless ref schemas (e.g. `{"$ref": "#Foo"}`) to the schema they
+        point to. Other schemas are returned as-is.
+        """
+
+        # Refs in another document are relative to that document, so keep
+        # track of which document each schema came from
+        resolver = self
+        seen: set[tuple[int, str]] = set()
+
+        while isinstance(schema, ir.TypelessSchema):
+            key = (id(resolver), schema.ref)
+            if key in seen:
+                raise Exception(f"circular ref {schema.ref}")
+
+            seen.add(key)
+            schema, resolver = resolver._resolve(schema.ref)
+
+        return schema
+
+    def rebase_refs(self, value: Any, base: "RefResolver") -> Any:
+        """
+        Copy a decoded schema from this document, with its refs rewritten to be
+        relative to another document (e.g. the root schema) instead, so that
+        they resolve to the same schemas from there
+        """
+
+        if base is self:
+            return value
+
+        if isinstance(value, dict):
+            return {
+                k: (
+                    self._rebase_ref(v, base)
+                    if k == "$ref" and isinstance(v, str)
+                    else self.rebase_refs(v, base)
+                )
+                for k, v in value.items()
+            }
+        elif isinstance(value, list):
+            return [self.rebase_refs(item, base) for item in value]
+
+        return value
+
+    def _rebase_ref(self, ref: str, base: "RefResolver") -> str:
+        path, _, fragment = ref.partition("#")
+
+        if path == "":
+            if self.path is None:
+                raise Exception(f"cannot rebase ref {ref} of a document without a path")
+
+            target = self.path
+        else:
+            target = os.path.abspath(os.path.join(self._directory, path))
+
+        if target == base.path:
+            return f"#{fragment}"
+
+        return f"{os.path.relpath(target, base._directory)}#{fragment}"
+
+
+def is_external_ref(ref: str) -> bool:
+    """
+    Whether a ref points into another document (e.g. "common.json#Address")
+    """
+
+    return not ref.startswith("#")
+
+
+def iter_refs(value: Any) -> Iterator[str]:
+    """
+    Yield every `$ref` value nested in a schema
+    """
+
+    stack = [value]
+
+    while len(stack) > 0:
+        item = stack.pop()
+
+        if isinstance(item, dict):
+            for k, v in item.items():
+                if k in ("$ref", "ref") and isinstance(v, str):
+                    yield v
+                else:
+                    stack.append(v)
+        elif isinstance(item, list):
+            stack.extend(item)
+
+
+def _escape(key: str) -> str:
+    """
+    Escape a JSON Pointer reference token (RFC 6901)
+    """
+
+    return key.replace("~", "~0").replace("/", "~1")
@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+import unittest
+from typing import Any
+
+from . import ir
+from .decode import get_decoder
+from .resolve import DocumentCache, RefResolver
+
+
+class Test_RefResolver(unittest.TestCase):
+    document: dict[str, Any] = {
+        "id": "#root",
+        "properties": {
+            "Pet": {"id": "#Pet", "type": "object"},
+            "Alias": {"$ref": "#/definitions/Name"},
+            "Loop": {"$ref": "#/properties/Loop"},
+        },
+        "definitions": {
+            "Name": {"type": "string"},
+            "a/b": {"type": "integer"},
+        },
+        "$defs": {
+            "Tags": {"type": "array", "items": [{"type": "string"}]},
+        },
+    }
+
+    def test_id(self) -> None:
+        schema = RefResolver(self.document).resolve("#Pet")
+
+        assert isinstance(schema, ir.ObjectSchema)
+        assert schema.get_schema_name() == "Pet"
+
+    def test_pointer(self) -> None:
+        resolver = RefResolver(self.document)
+
+        assert resolver.resolve("#/definitions/Name") == ir.StringSchema()
+        assert resolver.resolve("#/definitions/a~1b") == ir.IntegerSchema()
+        assert isinstance(resolver.resolve("#/$defs/Tags"), ir.ArraySchema)
+        assert isinstance(
+            resolver.resolve("#/$defs/Tags/items/0"),
+            ir.StringSchema,
+        )
+
+    def test_memoized(self) -> None:
+        resolver = RefResolver(self.document)
+
+        assert resolver.resolve("#Pet") is resolver.resolve("#/properties/Pet")
+        assert resolver.resolve("#Pet") is resolver.resolve("#Pet")
+
+    def test_follow(self) -> None:
+        resolver = RefResolver(self.document)
+
+        schema = resolver.follow(ir.TypelessSchema(ref="#/properties/Alias"))
+        assert schema == ir.StringSchema()
+
+        with self.assertRaises(Exception):
+            resolver.follow(ir.TypelessSchema(ref="#/properties/Loop"))
+
+    def test_unknown(self) -> None:
+        with self.assertRaises(Exception):
+            RefResolver(self.document).resolve("#Nope")
+
+
+class Test_RefResolver_external(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+        documents = {
+            "root.json": {"properties": {}},
+            "shared/common.json": {
+                "properties": {
+                    "Address": {
+                        "id": "#Address",
+                        "type": "object",
+                        "properties": {"country": {"$ref": "#Country"}},
+                    },
+                    "Country": {"id": "#Country", "$ref": "codes.json#Code"},
+                },
+            },
+            "shared/codes.json": {
+                "properties": {"Code": {"id": "#Code", "type": "string"}},
+            },
+        }
+
+        for name, document in documents.items():
+            path = os.path.join(self.directory.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            with open(path, "w") as f:
+                json.dump(document, f)
+
+        self.decoded: list[bytes] = []
+        decode_json = get_decoder("json")
+
+        def decode(data: bytes | memoryview) -> Any:
+            self.decoded.append(bytes(data))
+            return decode_json(data)
+
+        self.documents = DocumentCache(decode)
+        self.resolver = self.documents.add(
+            os.path.join(self.directory.name, "root.json"),
+            {"properties": {}},
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_resolve(self) -> None:
+        schema = self.resolver.resolve("shared/common.json#Address")
+
+        assert isinstance(schema, ir.ObjectSchema)
+        assert schema.get_schema_name() == "Address"
+
+        # Only the documents that were reached are loaded
+        assert len(self.decoded) == 1
+
+    def test_follow(self) -> None:
+        """
+        Refs in another document are relative to that document
+        """
+
+        schema = self.resolver.follow(
+            ir.TypelessSchema(ref="shared/common.json#Country")
+        )
+
+        assert schema == ir.StringSchema(id="#Code")
+        assert len(self.decoded) == 2
+
+    def test_loaded_once(self) -> None:
+        self.resolver.resolve("shared/common.json#Address")
+        self.resolver.resolve("shared/common.json#/properties/Country")
+        self.resolver.resolve("./shared/../shared/common.json#Country")
+
+        assert len(self.decoded) == 1
+        assert len(self.documents) == 2
@@ -0,0 +1,152 @@
+import json
+from typing import Any, Iterator, TextIO
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """
+    Read JSON values one at a time from a file, only keeping the unread part
+    of the current value in memory
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int) -> None:
+        self._buffer = ""
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._file = file
+        self._is_eof = False
+        self._position = 0
+
+    def _fill(self, size: int) -> bool:
+        """
+        Append up to `size` characters to the buffer, dropping the part that's
+        already been read. Returns False at the end of the file.
+        """
+
+        if self._is_eof:
+            return False
+
+        chunk = self._file.read(size)
+        if chunk == "":
+            self._is_eof = True
+            return False
+
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in _WHITESPACE
+            ):
+                self._position += 1
+
+            if self._position < len(self._buffer):
+                return
+            if self._fill(self._chunk_size) is False:
+                return
+
+    def peek_char(self) -> str:
+        self._skip_whitespace()
+
+        if self._position >= len(self._buffer):
+            raise ValueError("unexpected end of JSON input")
+
+        return self._buffer[self._position]
+
+    def read_char(self, expectation: str | None = None) -> str:
+        char = self.peek_char()
+
+        if expectation is not None and char not in expectation:
+            raise ValueError(f"expected one of {expectation!r} but found {char!r}")
+
+        self._position += 1
+        return char
+
+    def read_value(self) -> Any:
+        self._skip_whitespace()
+
+        # Grow the read size while a value doesn't fit in the buffer, so that
+        # huge values don't get re-decoded once per chunk
+        size = self._chunk_size
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if self._fill(size) is False:
+                    raise
+                size *= 2
+                continue
+
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._fill(size):
+                continue
+
+            self._position = end
+            return value
+
+
+def iter_object_members(
+    file: TextIO,
+    key: str,
+    chunk_size: int = 1 << 16,
+    is_required: bool = False,
+) -> Iterator[tuple[str, Any]]:
+    """
+    Incrementally parse a JSON document whose top level is an object, and yield
+    the members of the object at `key` one at a time. The rest of the document
+    is parsed and discarded.
+
+    Args:
+        file: JSON document
+        key: Top-level key whose object value will be streamed
+        chunk_size: Number of characters to read at a time
+        is_required: Raise a `KeyError` once the whole document is parsed if it
+            doesn't have `key`, instead of yielding nothing
+    """
+
+    reader = _Reader(file, chunk_size)
+    is_found = False
+
+    reader.read_char("{")
+    if reader.peek_char() != "}":
+        while True:
+            name = reader.read_value()
+            if not isinstance(name, str):
+                raise ValueError("object key is not a string")
+
+            reader.read_char(":")
+
+            if name == key:
+                is_found = True
+                yield from _iter_members(reader)
+            else:
+                reader.read_value()
+
+            if reader.read_char(",}") == "}":
+                break
+
+    if is_required and not is_found:
+        raise KeyError(key)
+
+
+def _iter_members(reader: _Reader) -> Iterator[tuple[str, Any]]:
+    reader.read_char("{")
+    if reader.peek_char() == "}":
+        reader.read_char()
+        return
+
+    while True:
+        name = reader.read_value()
+        if not isinstance(name, str):
+            raise ValueError("object key is not a string")
+
+        reader.read_char(":")
+        yield name, reader.read_value()
+
+        if reader.read_char(",}") == "}":
+            return
@@ -0,0 +1,53 @@
+import io
+import json
+import unittest
+from typing import Any
+
+from .stream import iter_object_members
+
+
+class Test_iter_object_members(unittest.TestCase):
+    def test_members(self) -> None:
+        document: dict[str, Any] = {
+            "id": "#root",
+            "description": {"nested": [1, 2, {"properties": {}}]},
+            "properties": {
+                "Foo": {"type": "object", "properties": {"a": {"type": "string"}}},
+                "Bar": {"type": "string", "enum": ["a", "b"]},
+                "Baz": 12345,
+            },
+            "count": 3,
+        }
+
+        # Tiny chunks so that values straddle chunk boundaries
+        for chunk_size in [1, 2, 7, 1 << 16]:
+            file = io.StringIO(json.dumps(document, indent=2))
+            members = list(iter_object_members(file, "properties", chunk_size))
+
+            assert members == list(document["properties"].items())
+
+    def test_empty(self) -> None:
+        file = io.StringIO('{"properties": {}}')
+        assert list(iter_object_members(file, "properties")) == []
+
+        file = io.StringIO("{}")
+        assert list(iter_object_members(file, "properties")) == []
+
+    def test_required(self) -> None:
+        file = io.StringIO('{"properties": {}}')
+        assert list(iter_object_members(file, "properties", is_required=True)) == []
+
+        file = io.StringIO('{"definitions": {"properties": {}}}')
+        with self.assertRaises(KeyError):
+            list(iter_object_members(file, "properties", is_required=True))
+
+    def test_invalid(self) -> None:
+        file = io.StringIO('{"properties": {"Foo": {"type": }}}')
+
+        with self.assertRaises(ValueError):
+            list(iter_object_members(file, "properties", 4))
+
+        file = io.StringIO('{"properties": {"Foo": {}')
+
+        with self.assertRaises(ValueError):
+            list(iter_object_members(file, "properties", 4))
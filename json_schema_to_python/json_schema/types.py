@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import Any, get_args, Literal, TypeGuard
 
-from . import base
+from . import base, profiling
 
 
 class _BaseSchema(base.BaseModel):
@@ -31,6 +31,10 @@ class ArraySchema(_BaseSchema):
     items: list[Schema]
     type: Literal["array"]
 
+    @base.validator("items", pre=True)
+    def _dispatch_items(cls, value: Any) -> Any:
+        return _parse_schema_list(value, get_args(Schema))
+
 
 class BooleanSchema(_BaseSchema):
     id: None = None
@@ -62,10 +66,18 @@ class ObjectSchema(_BaseSchema):
     required: list[str] = []
     type: Literal["object"]
 
+    @base.validator("properties", pre=True)
+    def _dispatch_properties(cls, value: Any) -> Any:
+        return _parse_schema_dict(value)
+
 
 class RootSchema(base.BaseModel):
     properties: dict[str, Schema]
 
+    @base.validator("properties", pre=True)
+    def _dispatch_properties(cls, value: Any) -> Any:
+        return _parse_schema_dict(value)
+
 
 class StringSchema(_BaseSchema):
     enum: list[str] | None = None
@@ -104,13 +116,98 @@ Schema = (
 EnumableSchema = IntegerSchema | NumberSchema | StringSchema
 
 
-def create_schema_from_dict(value: dict) -> Schema:
-    for schema_class in get_args(Schema):
+_schema_classes_by_type: dict[str, type[_BaseSchema]] = {
+    "array": ArraySchema,
+    "boolean": BooleanSchema,
+    "integer": IntegerSchema,
+    "null": NullSchema,
+    "number": NumberSchema,
+    "object": ObjectSchema,
+    "string": StringSchema,
+}
+
+
+def _get_candidate_schema_classes(value: dict) -> list[type[_BaseSchema]]:
+    """
+    Inspect the `type`, `$ref`, `allOf` and `anyOf` keywords of a schema dict
+    and return the schema classes that could parse it. The classes are in the
+    same order as the `Schema` union, so the first one that parses is the same
+    class a left-to-right union trial would pick. Usually there's only one.
+    """
+
+    candidates: list[type[_BaseSchema]] = []
+    type_value = value.get("type")
+
+    if type_value is None or type_value == "object":
+        if "allOf" in value:
+            candidates.append(AllOfSchema)
+        if "anyOf" in value:
+            candidates.append(AnyOfSchema)
+
+    if isinstance(type_value, list):
+        candidates.append(MultiTypeSchema)
+    elif isinstance(type_value, str) and type_value in _schema_classes_by_type:
+        candidates.append(_schema_classes_by_type[type_value])
+    elif type_value is None and ("$ref" in value or "ref" in value):
+        candidates.append(TypelessSchema)
+
+    return candidates
+
+
+def _parse_schema(value: Any, schema_classes: tuple[Any, ...]) -> Any:
+    """
+    Parse a schema dict into the first of `schema_classes` that accepts it,
+    without trying the classes that can't. Anything that isn't a dict, or that
+    no class accepts, is returned as-is so that Pydantic reports the error.
+    """
+
+    if not isinstance(value, dict):
+        return value
+
+    for schema_class in _get_candidate_schema_classes(value):
+        if schema_class not in schema_classes:
+            continue
+
+        if profiling.counts is not None:
+            profiling.counts["schema_parses"] += 1
+
         try:
             return schema_class.parse_obj(value)
         except Exception:
+            if profiling.counts is not None:
+                profiling.counts["schema_parse_failures"] += 1
+
             continue
 
+    # Pydantic tries each class of the union in turn
+    if profiling.counts is not None:
+        profiling.counts["schema_parse_fallbacks"] += 1
+
+    return value
+
+
+def _parse_schema_dict(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+
+    schema_classes = get_args(Schema)
+
+    return {k: _parse_schema(v, schema_classes) for k, v in value.items()}
+
+
+def _parse_schema_list(value: Any, schema_classes: tuple[Any, ...]) -> Any:
+    if not isinstance(value, list):
+        return value
+
+    return [_parse_schema(item, schema_classes) for item in value]
+
+
+def create_schema_from_dict(value: dict) -> Schema:
+    schema = _parse_schema(value, get_args(Schema))
+
+    if is_schema(schema):
+        return schema
+
     raise Exception("no schema found")
 
 
@@ -119,11 +216,10 @@ def get_schema_from_type(type: SchemaType) -> Schema:
     Get a schema object from a schema type string
     """
 
-    for schema_class in get_args(Schema):
-        try:
-            return schema_class(type=type)
-        except Exception:
-            continue
+    schema = _parse_schema({"type": type}, get_args(Schema))
+
+    if is_schema(schema):
+        return schema
 
     raise Exception(f"no schema found for type {type}")
 
@@ -181,10 +277,18 @@ def is_list_of_schema_types(
 class AllOfValue(base.BaseModel):
     __root__: list[ObjectSchema | TypelessSchema]
 
+    @base.validator("__root__", pre=True)
+    def _dispatch_root(cls, value: Any) -> Any:
+        return _parse_schema_list(value, (ObjectSchema, TypelessSchema))
+
 
 class AnyOfValue(base.BaseModel):
     __root__: list[Schema]
 
+    @base.validator("__root__", pre=True)
+    def _dispatch_root(cls, value: Any) -> Any:
+        return _parse_schema_list(value, get_args(Schema))
+
 
 class RefValue(base.BaseModel):
     __root__: str
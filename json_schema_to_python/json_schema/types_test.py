@@ -0,0 +1,95 @@
+import unittest
+from typing import Any
+
+from .types import (
+    AllOfSchema,
+    AnyOfSchema,
+    ArraySchema,
+    IntegerSchema,
+    MultiTypeSchema,
+    ObjectSchema,
+    RootSchema,
+    StringSchema,
+    TypelessSchema,
+    create_schema_from_dict,
+    get_schema_from_type,
+)
+
+
+class Test_create_schema_from_dict(unittest.TestCase):
+    def test_dispatch(self) -> None:
+        cases: list[tuple[dict[str, Any], type]] = [
+            ({"type": "integer"}, IntegerSchema),
+            ({"type": ["integer", "null"]}, MultiTypeSchema),
+            ({"type": "array", "items": [{"type": "integer"}]}, ArraySchema),
+            ({"$ref": "#Foo"}, TypelessSchema),
+            ({"ref": "#Foo"}, TypelessSchema),
+            ({"anyOf": [{"type": "integer"}]}, AnyOfSchema),
+            ({"type": "object", "allOf": [{"$ref": "#Foo"}]}, AllOfSchema),
+            ({"type": "object", "properties": {}}, ObjectSchema),
+        ]
+
+        for value, expectation in cases:
+            assert type(create_schema_from_dict(value)) is expectation
+
+    def test_no_schema(self) -> None:
+        with self.assertRaises(Exception):
+            create_schema_from_dict({"type": "integer", "enum": ["a"]})
+
+    def test_nested(self) -> None:
+        """
+        Nested schemas are dispatched the same way as top-level schemas
+        """
+
+        root_schema = RootSchema.parse_obj(
+            {
+                "properties": {
+                    "Foo": {
+                        "id": "#Foo",
+                        "type": "object",
+                        "allOf": [{"type": "object", "allOf": []}],
+                        "properties": {
+                            "a": {"type": "array", "items": [{"$ref": "#Bar"}]},
+                            "b": {"anyOf": [{"type": "string"}]},
+                        },
+                    },
+                },
+            }
+        )
+
+        schema = root_schema.properties["Foo"]
+        assert isinstance(schema, AllOfSchema)
+
+        # `allOf` only accepts object and ref schemas
+        assert type(schema.allOf.__root__[0]) is ObjectSchema
+
+        object_schema = ObjectSchema.parse_obj(
+            {
+                "type": "object",
+                "properties": {
+                    "a": {"type": "array", "items": [{"$ref": "#Bar"}]},
+                    "b": {"anyOf": [{"type": "string"}]},
+                },
+            }
+        )
+
+        a = object_schema.properties["a"]
+        assert isinstance(a, ArraySchema)
+        assert type(a.items[0]) is TypelessSchema
+
+        b = object_schema.properties["b"]
+        assert isinstance(b, AnyOfSchema)
+        assert type(b.anyOf.__root__[0]) is StringSchema
+
+
+class Test_get_schema_from_type(unittest.TestCase):
+    def test_primitive(self) -> None:
+        assert get_schema_from_type("integer") == IntegerSchema(type="integer")
+
+    def test_array(self) -> None:
+        """
+        Array schemas need `items`, so they can't be created from a type alone
+        """
+
+        with self.assertRaises(Exception):
+            get_schema_from_type("array")
@@ -0,0 +1,46 @@
+"""
+Versions that generated output depends on. This module only imports the
+standard library, so that the CLI can check a daemon's versions cheaply.
+"""
+
+import hashlib
+import os
+
+_package_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_code_version() -> str:
+    """
+    Hash this package's source, so that entries don't outlive the code that
+    wrote them
+    """
+
+    digest = hashlib.sha256()
+
+    for directory, directory_names, file_names in os.walk(_package_directory):
+        directory_names.sort()
+
+        for file_name in sorted(file_names):
+            if file_name.endswith(".py"):
+                path = os.path.join(directory, file_name)
+                digest.update(os.path.relpath(path, _package_directory).encode())
+
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+def get_black_version() -> str | None:
+    """
+    Get the installed black's version without importing black, which is slow,
+    or None if it isn't installed
+    """
+
+    try:
+        # Where black gets its `__version__` from
+        from _black_version import version  # type: ignore
+    except ImportError:
+        return None
+
+    return str(version)
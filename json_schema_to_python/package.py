@@ -0,0 +1,536 @@
+"""
+Write models as a package of modules ("shards") rather than one module, so
+that each can be formatted, type-checked and imported on its own.
+
+Models that reference each other (through property refs, `$ref` or `allOf`
+bases) in a cycle always go in the same shard. Cycles are taken one at a
+time, each after the ones it references, and packed into shards in that
+order. A shard only imports from earlier shards, so there are no import
+cycles. Within a cycle, models are ordered so that base classes come before
+their subclasses, so a base class is always defined first.
+
+The package's `__init__` exposes every model, but only imports a model's
+shard when the model is first used.
+"""
+
+import ast
+import contextlib
+import os
+from typing import Iterable
+
+from json_schema_to_python.ast.attribute_node import AnnotationCache
+from json_schema_to_python.ast.import_node import (
+    add_used_names,
+    create_import_nodes,
+    get_used_names,
+)
+from json_schema_to_python.ast.module_node import create_model_node
+from json_schema_to_python.emit import emit_module
+from json_schema_to_python.json_schema import MergeCache
+from json_schema_to_python.json_schema.resolve import RefResolver
+from json_schema_to_python.json_schema.types import Schema
+from .defaults import DEFAULT_SHARD_SIZE, EMITTER_NAMES
+from .file import can_fork
+from .write import write_temporary_file
+
+SHARD_PREFIX = "shard_"
+
+_INIT_FUNCTIONS = """
+def __getattr__(name: str) -> object:
+    shard = _shards.get(name)
+    if shard is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(importlib.import_module(f".{shard}", __name__), name)
+
+
+def __dir__() -> list[str]:
+    return [*globals(), *_shards]
+"""
+
+# What workers need to write modules. Set before the worker processes are
+# forked, so that they inherit it instead of it being pickled.
+_worker_state: tuple[list[tuple[str, ast.Module]], str, str, bool] | None = None
+
+
+def write_package(
+    schemas: Iterable[Schema],
+    directory: str,
+    resolver: RefResolver | None = None,
+    emitter: str = "ast",
+    should_format: bool = True,
+    jobs: int = 1,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    should_gate_typing_imports: bool = False,
+) -> dict[str, int]:
+    """
+    Write the models for some schemas to a package
+
+    Every module is written to a temporary file first, and they're only renamed
+    into place once they've all been written. Shards left over from an earlier
+    run with more of them are removed.
+
+    Args:
+        directory: The package's directory. Created if it doesn't exist.
+        emitter: See `convert_schemas_to_file_content`
+        should_format: Format the modules with black. Modules from the "direct"
+            emitter are always formatted.
+        jobs: Number of processes to format and write modules in
+        shard_size: Number of models to put in a shard. A shard can have more
+            when that many models reference each other in a cycle.
+        should_gate_typing_imports: See `create_import_nodes`
+
+    Returns:
+        The number of models and of shards
+    """
+
+    if emitter not in EMITTER_NAMES:
+        raise Exception(f"unknown emitter {emitter}")
+
+    if jobs < 1:
+        raise Exception("jobs must be at least 1")
+
+    if shard_size < 1:
+        raise Exception("shard size must be at least 1")
+
+    merge_cache = MergeCache()
+    annotation_cache = AnnotationCache()
+    nodes: dict[str, ast.ClassDef | ast.Assign] = {}
+
+    for model_schema in schemas:
+        node = create_model_node(
+            model_schema,
+            resolver,
+            merge_cache,
+            annotation_cache,
+        )
+
+        if node is not None:
+            nodes[_get_model_name(node)] = node
+
+    dependencies = {
+        name: _get_dependencies(node, nodes) for name, node in nodes.items()
+    }
+    components = [
+        _sort_by_bases(component, nodes)
+        for component in get_strongly_connected_components(list(nodes), dependencies)
+    ]
+    shards = _create_shards(components, shard_size)
+
+    modules: list[tuple[str, ast.Module]] = []
+    shard_names: dict[str, str] = {}
+
+    for i, shard in enumerate(shards):
+        module_name = f"{SHARD_PREFIX}{i}"
+        modules.append(
+            (
+                module_name,
+                _create_shard_module(
+                    shard,
+                    nodes,
+                    dependencies,
+                    shard_names,
+                    should_gate_typing_imports,
+                ),
+            )
+        )
+
+        for name in shard:
+            shard_names[name] = module_name
+
+    modules.append(("__init__", _create_init_module(shard_names)))
+
+    os.makedirs(directory, exist_ok=True)
+    _write_modules(modules, directory, emitter, should_format, jobs)
+    _remove_stale_shards(directory, {module_name for module_name, _ in modules})
+
+    return {"models": len(nodes), "shards": len(shards)}
+
+
+def _get_model_name(node: ast.ClassDef | ast.Assign) -> str:
+    if isinstance(node, ast.ClassDef):
+        return node.name
+
+    target = node.targets[0]
+    assert isinstance(target, ast.Name)
+
+    return target.id
+
+
+def _get_dependencies(
+    node: ast.ClassDef | ast.Assign,
+    nodes: dict[str, ast.ClassDef | ast.Assign],
+) -> list[str]:
+    """
+    Get the names of the other models that a model's node uses, in the order
+    they're first used
+    """
+
+    name = _get_model_name(node)
+    dependencies: dict[str, None] = {}
+
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and child.id in nodes and child.id != name:
+            dependencies[child.id] = None
+
+    return list(dependencies)
+
+
+def get_strongly_connected_components(
+    names: list[str],
+    dependencies: dict[str, list[str]],
+) -> list[list[str]]:
+    """
+    Group names into the sets that depend on each other in a cycle (Tarjan's
+    algorithm). Each component comes after the components it depends on, and
+    its names are in the order they're given in.
+    """
+
+    indexes: dict[str, int] = {}
+    low_links: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    components: list[list[str]] = []
+    positions = {name: i for i, name in enumerate(names)}
+
+    for root in names:
+        if root in indexes:
+            continue
+
+        indexes[root] = low_links[root] = len(indexes)
+        stack.append(root)
+        on_stack.add(root)
+        # Iterative, since dependency chains can be longer than the recursion
+        # limit
+        work = [(root, iter(dependencies[root]))]
+
+        while len(work) > 0:
+            name, children = work[-1]
+
+            for child in children:
+                if child not in indexes:
+                    indexes[child] = low_links[child] = len(indexes)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(dependencies[child])))
+                    break
+
+                if child in on_stack:
+                    low_links[name] = min(low_links[name], indexes[child])
+            else:
+                work.pop()
+
+                if len(work) > 0:
+                    parent = work[-1][0]
+                    low_links[parent] = min(low_links[parent], low_links[name])
+
+                if low_links[name] == indexes[name]:
+                    component: list[str] = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.remove(member)
+                        component.append(member)
+
+                        if member == name:
+                            break
+
+                    components.append(sorted(component, key=positions.__getitem__))
+
+    return components
+
+
+def _sort_by_bases(
+    component: list[str],
+    nodes: dict[str, ast.ClassDef | ast.Assign],
+) -> list[str]:
+    """
+    Order the models in a component so that every class comes after its base
+    classes, and otherwise keep their order
+    """
+
+    names = set(component)
+    bases: dict[str, list[str]] = {}
+    for name in component:
+        node = nodes[name]
+        bases[name] = (
+            [
+                base.id
+                for base in node.bases
+                if isinstance(base, ast.Name) and base.id in names
+            ]
+            if isinstance(node, ast.ClassDef)
+            else []
+        )
+
+    ordered: list[str] = []
+    added: set[str] = set()
+
+    for root in component:
+        if root in added:
+            continue
+
+        # Iterative, like `get_strongly_connected_components`. `path` is the
+        # class whose bases are being added, and its subclasses.
+        path = [root]
+        work = [iter(bases[root])]
+
+        while len(work) > 0:
+            for base in work[-1]:
+                if base in added:
+                    continue
+
+                if base in path:
+                    raise Exception(f"circular base classes of {base}")
+
+                path.append(base)
+                work.append(iter(bases[base]))
+                break
+            else:
+                work.pop()
+                name = path.pop()
+                added.add(name)
+                ordered.append(name)
+
+    return ordered
+
+
+def _create_shards(
+    components: list[list[str]],
+    shard_size: int,
+) -> list[list[str]]:
+    shards: list[list[str]] = []
+    shard: list[str] = []
+
+    for component in components:
+        if len(shard) > 0 and len(shard) + len(component) > shard_size:
+            shards.append(shard)
+            shard = []
+
+        shard.extend(component)
+
+    if len(shard) > 0:
+        shards.append(shard)
+
+    return shards
+
+
+def _create_shard_module(
+    shard: list[str],
+    nodes: dict[str, ast.ClassDef | ast.Assign],
+    dependencies: dict[str, list[str]],
+    shard_names: dict[str, str],
+    should_gate_typing_imports: bool,
+) -> ast.Module:
+    """
+    Args:
+        shard_names: The shard of each model in an earlier shard
+    """
+
+    imported_names: dict[str, set[str]] = {}
+    for name in shard:
+        for dependency in dependencies[name]:
+            module_name = shard_names.get(dependency)
+            if module_name is not None:
+                imported_names.setdefault(module_name, set()).add(dependency)
+
+    shard_imports: list[ast.stmt] = [
+        ast.ImportFrom(
+            module=module_name,
+            names=[ast.alias(name=name) for name in sorted(names)],
+            level=1,
+        )
+        for module_name, names in sorted(
+            imported_names.items(),
+            key=lambda item: int(item[0][len(SHARD_PREFIX) :]),
+        )
+    ]
+
+    # Same order as `create_module_node`: classes, then enums
+    class_nodes: list[ast.stmt] = []
+    enum_nodes: list[ast.stmt] = []
+    used_names: dict[str, bool] = {}
+    for name in shard:
+        node = nodes[name]
+        if isinstance(node, ast.ClassDef):
+            class_nodes.append(node)
+        else:
+            enum_nodes.append(node)
+
+        add_used_names(used_names, get_used_names(node))
+
+    # Shard imports go with the other runtime imports, before any
+    # `if TYPE_CHECKING:` block
+    import_nodes = create_import_nodes(used_names, should_gate_typing_imports)
+    runtime_import_count = sum(
+        isinstance(node, ast.ImportFrom) for node in import_nodes
+    )
+
+    return ast.Module(
+        body=[
+            *import_nodes[:runtime_import_count],
+            *shard_imports,
+            *import_nodes[runtime_import_count:],
+            *class_nodes,
+            *enum_nodes,
+        ],
+        type_ignores=[],
+    )
+
+
+def _create_init_module(shard_names: dict[str, str]) -> ast.Module:
+    """
+    Create the package's `__init__`, which imports a model's shard when the
+    model is first used. Type checkers see every model imported.
+    """
+
+    names_by_shard: dict[str, list[str]] = {}
+    for name, module_name in shard_names.items():
+        names_by_shard.setdefault(module_name, []).append(name)
+
+    type_checking_imports: list[ast.stmt] = [
+        ast.ImportFrom(
+            module=module_name,
+            names=[ast.alias(name=name, asname=name) for name in names],
+            level=1,
+        )
+        for module_name, names in names_by_shard.items()
+    ]
+
+    body: list[ast.stmt] = [
+        ast.ImportFrom(
+            module="__future__",
+            names=[ast.alias(name="annotations")],
+            level=0,
+        ),
+        ast.Import(names=[ast.alias(name="importlib")]),
+        ast.ImportFrom(
+            module="typing",
+            names=[ast.alias(name="TYPE_CHECKING")],
+            level=0,
+        ),
+    ]
+
+    if len(type_checking_imports) > 0:
+        body.append(
+            ast.If(
+                test=ast.Name(id="TYPE_CHECKING", ctx=ast.Load()),
+                body=type_checking_imports,
+                orelse=[],
+            )
+        )
+
+    body.append(
+        ast.Assign(
+            targets=[ast.Name(id="_shards", ctx=ast.Store())],
+            value=ast.Dict(
+                keys=[ast.Constant(value=name) for name in shard_names],
+                values=[
+                    ast.Constant(value=module_name)
+                    for module_name in shard_names.values()
+                ],
+            ),
+        )
+    )
+    body.extend(ast.parse(_INIT_FUNCTIONS).body)
+
+    # `ast.unparse` needs line numbers on assignments
+    return ast.fix_missing_locations(ast.Module(body=body, type_ignores=[]))
+
+
+def _convert_module_to_source(
+    module: ast.Module,
+    emitter: str,
+    should_format: bool,
+) -> str:
+    if emitter == "direct":
+        return emit_module(module)
+
+    source = ast.unparse(module)
+
+    if should_format:
+        import black
+
+        source = black.format_str(source, mode=black.FileMode())
+
+    return source
+
+
+def _write_modules(
+    modules: list[tuple[str, ast.Module]],
+    directory: str,
+    emitter: str,
+    should_format: bool,
+    jobs: int,
+) -> None:
+    global _worker_state
+
+    _worker_state = (modules, directory, emitter, should_format)
+    temporary_paths: list[str] = []
+
+    try:
+        if jobs > 1 and can_fork():
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(
+                max_workers=jobs,
+                mp_context=multiprocessing.get_context("fork"),
+            ) as executor:
+                # Collect every path before checking for errors, so that none
+                # are left behind
+                futures = [
+                    executor.submit(_write_temporary_module, i)
+                    for i in range(len(modules))
+                ]
+                for future in futures:
+                    if future.exception() is None:
+                        temporary_paths.append(future.result())
+
+                for future in futures:
+                    future.result()
+        else:
+            for i in range(len(modules)):
+                temporary_paths.append(_write_temporary_module(i))
+
+        for (module_name, _), temporary_path in zip(modules, temporary_paths):
+            os.replace(temporary_path, os.path.join(directory, f"{module_name}.py"))
+
+        temporary_paths.clear()
+    finally:
+        _worker_state = None
+
+        for temporary_path in temporary_paths:
+            with contextlib.suppress(OSError):
+                os.remove(temporary_path)
+
+
+def _write_temporary_module(index: int) -> str:
+    """
+    Write a module's source to a temporary file, possibly in a worker
+
+    Returns:
+        The temporary file's path
+    """
+
+    assert _worker_state is not None
+    modules, directory, emitter, should_format = _worker_state
+    module_name, module = modules[index]
+
+    return write_temporary_file(
+        os.path.join(directory, f"{module_name}.py"),
+        _convert_module_to_source(module, emitter, should_format).encode(),
+    )
+
+
+def _remove_stale_shards(directory: str, module_names: set[str]) -> None:
+    for entry in os.scandir(directory):
+        module_name, extension = os.path.splitext(entry.name)
+
+        if (
+            extension == ".py"
+            and module_name.startswith(SHARD_PREFIX)
+            and module_name[len(SHARD_PREFIX) :].isdigit()
+            and module_name not in module_names
+        ):
+            with contextlib.suppress(OSError):
+                os.remove(entry.path)
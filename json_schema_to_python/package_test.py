@@ -0,0 +1,195 @@
+import importlib
+import os
+import sys
+import tempfile
+import typing
+import unittest
+from typing import Any
+
+from json_schema_to_python.json_schema.types import Schema, create_schema_from_dict
+from .package import get_strongly_connected_components, write_package
+
+
+def _create_schemas() -> list[Schema]:
+    """
+    Node and Edge reference each other, Node references Color, Graph
+    references Node and Edge, and Leaf references nothing
+    """
+
+    values: list[dict[str, Any]] = [
+        {
+            "id": "#Graph",
+            "type": "object",
+            "properties": {
+                "nodes": {"type": "array", "items": [{"$ref": "#Node"}]},
+                "edges": {"type": "array", "items": [{"$ref": "#Edge"}]},
+            },
+        },
+        {
+            "id": "#Node",
+            "type": "object",
+            "properties": {
+                "edges": {"type": "array", "items": [{"$ref": "#Edge"}]},
+                "color": {"$ref": "#Color"},
+            },
+        },
+        {
+            "id": "#Edge",
+            "type": "object",
+            "properties": {"to": {"$ref": "#Node"}},
+        },
+        {
+            "id": "#Leaf",
+            "type": "object",
+            "properties": {"id": {"type": "integer"}},
+        },
+        {"id": "#Color", "type": "string", "enum": ["red", "blue"]},
+    ]
+
+    return [create_schema_from_dict(value) for value in values]
+
+
+class Test_get_strongly_connected_components(unittest.TestCase):
+    def test_order(self) -> None:
+        """
+        Components come after the ones they depend on
+        """
+
+        assert get_strongly_connected_components(
+            ["a", "b", "c", "d", "e"],
+            {"a": ["c"], "b": ["c"], "c": ["d"], "d": ["b"], "e": ["e"]},
+        ) == [["b", "c", "d"], ["a"], ["e"]]
+
+    def test_long_chain(self) -> None:
+        names = [str(i) for i in range(10000)]
+        dependencies = {name: names[i + 1 : i + 2] for i, name in enumerate(names)}
+
+        assert get_strongly_connected_components(names, dependencies) == [
+            [name] for name in reversed(names)
+        ]
+
+
+class Test_write_package(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.package_directory = os.path.join(self.directory.name, "models")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        for name in list(sys.modules):
+            if name == "models" or name.startswith("models."):
+                del sys.modules[name]
+
+    def read_modules(self) -> dict[str, str]:
+        modules: dict[str, str] = {}
+        for file_name in sorted(os.listdir(self.package_directory)):
+            with open(os.path.join(self.package_directory, file_name)) as f:
+                modules[file_name] = f.read()
+
+        return modules
+
+    def test_shards(self) -> None:
+        assert write_package(
+            _create_schemas(),
+            self.package_directory,
+            shard_size=1,
+        ) == {"models": 5, "shards": 4}
+
+        modules = self.read_modules()
+        assert list(modules) == [
+            "__init__.py",
+            "shard_0.py",
+            "shard_1.py",
+            "shard_2.py",
+            "shard_3.py",
+        ]
+        # The cycle stays together, after what it references
+        assert "Color =" in modules["shard_0.py"]
+        assert "class Node(" in modules["shard_1.py"]
+        assert "class Edge(" in modules["shard_1.py"]
+        assert "from .shard_0 import Color\n" in modules["shard_1.py"]
+        assert "from .shard_1 import Edge, Node\n" in modules["shard_2.py"]
+
+        sys.path.insert(0, self.directory.name)
+        try:
+            models = importlib.import_module("models")
+            assert "models.shard_3" not in sys.modules
+
+            leaf = models.Leaf
+            assert leaf.__module__ == "models.shard_3"
+            # `NotRequired[list[Node]]`
+            hints = typing.get_type_hints(models.Graph)
+            (nodes_hint,) = typing.get_args(hints["nodes"])
+            assert typing.get_args(nodes_hint) == (models.Node,)
+        finally:
+            sys.path.remove(self.directory.name)
+
+    def test_cycle_bases(self) -> None:
+        """
+        A base class comes before its subclasses in a cycle, whatever order
+        they're given in
+        """
+
+        schemas = [
+            create_schema_from_dict(value)
+            for value in [
+                {
+                    "id": "#Leaf",
+                    "type": "object",
+                    "$ref": "#Tree",
+                    "properties": {"value": {"type": "integer"}},
+                },
+                {
+                    "id": "#Tree",
+                    "type": "object",
+                    "properties": {
+                        "leaves": {"type": "array", "items": [{"$ref": "#Leaf"}]},
+                    },
+                },
+            ]
+        ]
+
+        assert write_package(schemas, self.package_directory) == {
+            "models": 2,
+            "shards": 1,
+        }
+
+        module = self.read_modules()["shard_0.py"]
+        assert module.index("class Tree(") < module.index("class Leaf(Tree)")
+
+        sys.path.insert(0, self.directory.name)
+        try:
+            models = importlib.import_module("models")
+            assert models.Leaf.__module__ == "models.shard_0"
+        finally:
+            sys.path.remove(self.directory.name)
+
+    def test_stale_shards(self) -> None:
+        write_package(_create_schemas(), self.package_directory, shard_size=1)
+        write_package(_create_schemas(), self.package_directory)
+
+        assert list(self.read_modules()) == ["__init__.py", "shard_0.py"]
+
+    def test_jobs(self) -> None:
+        """
+        Writing modules in parallel gives the same output
+        """
+
+        for emitter in ("ast", "direct"):
+            with self.subTest(emitter=emitter):
+                write_package(
+                    _create_schemas(),
+                    self.package_directory,
+                    emitter=emitter,
+                    shard_size=2,
+                )
+                expected = self.read_modules()
+
+                write_package(
+                    _create_schemas(),
+                    self.package_directory,
+                    emitter=emitter,
+                    jobs=3,
+                    shard_size=2,
+                )
+                assert self.read_modules() == expected
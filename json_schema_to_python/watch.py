@@ -0,0 +1,329 @@
+"""
+Regenerate the output each time the input changes.
+
+Input files are watched with inotify on Linux, and by polling their status
+elsewhere (or when inotify isn't available). A burst of changes, like an
+editor's save, is waited out before regenerating. Each run reuses what the
+last one did: definitions that didn't change aren't parsed or converted again,
+and only the models whose schemas changed are generated (see
+`write_file_incrementally`).
+"""
+
+import abc
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from typing import Collection
+
+from json_schema_to_python.json_schema.load import ModelSchemaLoader
+from .formatting import FormatCache
+from .incremental import IncrementalState, write_file_incrementally
+from .write import get_file_stat
+
+# How long to wait for more changes after one, in seconds
+DEFAULT_DEBOUNCE = 0.1
+
+_DEFAULT_POLL_INTERVAL = 0.5
+
+# From <sys/inotify.h>
+_IN_MODIFY = 0x2
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+
+_INOTIFY_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+
+# wd, mask, cookie, len
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Watcher(abc.ABC):
+    """
+    Waits for files to change. Paths are absolute.
+    """
+
+    def __init__(self) -> None:
+        self.paths: set[str] = set()
+
+    def set_paths(self, paths: Collection[str]) -> None:
+        self.paths = {os.path.abspath(path) for path in paths}
+
+    @abc.abstractmethod
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """
+        Wait until some of the paths change, or for `timeout` seconds
+
+        Returns:
+            The paths that changed, which are none after a timeout
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class PollingWatcher(Watcher):
+    """
+    Checks the files' status every `interval` seconds
+    """
+
+    def __init__(self, interval: float = _DEFAULT_POLL_INTERVAL) -> None:
+        super().__init__()
+        self.interval = interval
+        self._stats: dict[str, tuple[int, int, int] | None] = {}
+
+    def set_paths(self, paths: Collection[str]) -> None:
+        super().set_paths(paths)
+        self._stats = {
+            path: self._stats.get(path, get_file_stat(path)) for path in self.paths
+        }
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            changed: set[str] = set()
+            for path, stat in self._stats.items():
+                new_stat = get_file_stat(path)
+
+                if new_stat != stat:
+                    self._stats[path] = new_stat
+                    changed.add(path)
+
+            if len(changed) > 0:
+                return changed
+
+            if deadline is None:
+                time.sleep(self.interval)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return changed
+
+                time.sleep(min(self.interval, remaining))
+
+
+class InotifyWatcher(Watcher):
+    """
+    Watches the directories the files are in with inotify, so that files
+    replaced by a rename (as editors and `write_file_atomically` do) are
+    still watched
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+        self._directories: dict[int, str] = {}
+
+    def set_paths(self, paths: Collection[str]) -> None:
+        super().set_paths(paths)
+
+        watched = set(self._directories.values())
+        for directory in {os.path.dirname(path) for path in self.paths} - watched:
+            wd = self._libc.inotify_add_watch(
+                self._fd,
+                os.fsencode(directory),
+                _INOTIFY_MASK,
+            )
+
+            if wd < 0:
+                error = ctypes.get_errno()
+
+                # Watched again once a load reads a file in it
+                if error == errno.ENOENT:
+                    continue
+
+                raise OSError(error, os.strerror(error), directory)
+
+            self._directories[wd] = directory
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if len(readable) == 0:
+                return set()
+
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+
+            # Other files in the directories (e.g. the output) change too
+            changed = self._read_events(data)
+            if len(changed) > 0:
+                return changed
+
+    def _read_events(self, data: bytes) -> set[str]:
+        changed: set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + name_length].rstrip(b"\0")
+            offset += name_length
+
+            if mask & (_IN_Q_OVERFLOW | _IN_IGNORED):
+                # Events were dropped, or a directory went away
+                if mask & _IN_IGNORED:
+                    self._directories.pop(wd, None)
+
+                changed |= self.paths
+                continue
+
+            directory = self._directories.get(wd)
+            if directory is not None:
+                path = os.path.join(directory, os.fsdecode(name))
+
+                if path in self.paths:
+                    changed.add(path)
+
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def create_watcher(poll_interval: float | None = None) -> Watcher:
+    """
+    Create an inotify watcher where it's available, or else a polling one
+
+    Args:
+        poll_interval: Poll every this many seconds, even if inotify is
+            available
+    """
+
+    if poll_interval is None and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except OSError:
+            pass
+
+    return PollingWatcher(poll_interval or _DEFAULT_POLL_INTERVAL)
+
+
+def wait_for_changes(watcher: Watcher, debounce: float = DEFAULT_DEBOUNCE) -> set[str]:
+    """
+    Wait until some of the watcher's paths change, and then until they stop
+    changing for `debounce` seconds
+
+    Returns:
+        Every path that changed
+    """
+
+    changed = watcher.wait()
+
+    while True:
+        more = watcher.wait(debounce)
+
+        if len(more) == 0:
+            return changed
+
+        changed |= more
+
+
+def watch(
+    logger: logging.Logger,
+    input_path: str,
+    output_path: str,
+    decoder: str = "auto",
+    only: Collection[str] | None = None,
+    emitter: str = "ast",
+    should_format: bool = True,
+    should_gate_typing_imports: bool = False,
+    format_cache: FormatCache | None = None,
+    poll_interval: float | None = None,
+    debounce: float = DEFAULT_DEBOUNCE,
+) -> None:
+    """
+    Write the output for the input, and write it again each time the input or
+    a document it references changes, until interrupted. Errors are logged,
+    and the output is written again after the next change.
+
+    Args:
+        See `load_model_schemas` and `write_file_incrementally`, and
+        `create_watcher` for `poll_interval`
+    """
+
+    loader = ModelSchemaLoader(logger, input_path, decoder, only)
+    state = IncrementalState()
+    watcher = create_watcher(poll_interval)
+    watcher.set_paths([input_path])
+
+    try:
+        while True:
+            start = time.perf_counter()
+
+            try:
+                schemas, resolver = loader.load()
+                stats = write_file_incrementally(
+                    schemas,
+                    output_path,
+                    resolver,
+                    emitter=emitter,
+                    should_format=should_format,
+                    should_gate_typing_imports=should_gate_typing_imports,
+                    format_cache=format_cache,
+                    state=state,
+                )
+            except Exception as e:
+                logger.error(f"Failed to write {output_path}: {e}")
+            else:
+                logger.info(
+                    f"Generated {stats['generated']} of {stats['models']} models "
+                    f"in {time.perf_counter() - start:.2f}s"
+                )
+
+            # Documents that the input stops referencing aren't watched
+            # anymore, but their directories are
+            watcher.set_paths([input_path, *loader.documents])
+            wait_for_changes(watcher, debounce)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def _load_libc() -> ctypes.CDLL:
+    name = ctypes.util.find_library("c")
+
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+    except OSError as e:
+        raise OSError(errno.ENOSYS, f"can't load libc: {e}")
+
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError(errno.ENOSYS, "inotify isn't available")
+
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+    return libc
@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from typing import Any
+from unittest import mock
+
+from .incremental import get_manifest_path
+from .watch import InotifyWatcher, PollingWatcher, Watcher, wait_for_changes, watch
+from .write import write_file_atomically
+
+
+class Test_Watcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "schema.json")
+        with open(self.path, "w") as f:
+            f.write("{}")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def check(self, watcher: Watcher) -> None:
+        try:
+            watcher.set_paths([self.path])
+            assert watcher.wait(0.05) == set()
+
+            # Other files in the directory are ignored
+            with open(os.path.join(self.directory.name, "other.json"), "w") as f:
+                f.write("{}")
+
+            assert watcher.wait(0.05) == set()
+
+            with open(self.path, "a") as f:
+                f.write(" ")
+
+            assert wait_for_changes(watcher, 0.05) == {self.path}
+
+            # Replaced by a rename, as editors save files
+            write_file_atomically(self.path, b"{} ")
+            assert wait_for_changes(watcher, 0.05) == {self.path}
+        finally:
+            watcher.close()
+
+    def test_polling(self) -> None:
+        self.check(PollingWatcher(0.01))
+
+    @unittest.skipUnless(os.uname().sysname == "Linux", "inotify is Linux only")
+    def test_inotify(self) -> None:
+        self.check(InotifyWatcher())
+
+
+class Test_watch(unittest.TestCase):
+    def test_watch(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "schema.json")
+            output_path = os.path.join(directory, "models.py")
+            document: dict[str, Any] = {
+                "properties": {
+                    "Person": {"id": "#Person", "type": "object", "properties": {}},
+                },
+            }
+            write_file_atomically(input_path, json.dumps(document).encode())
+            outputs: list[str] = []
+
+            def change_input(watcher: Watcher, debounce: float) -> set[str]:
+                """
+                Add a model, then stop
+                """
+
+                assert watcher.paths == {input_path}
+                with open(output_path) as f:
+                    outputs.append(f.read())
+
+                if len(outputs) == 2:
+                    raise KeyboardInterrupt
+
+                document["properties"]["Pet"] = {
+                    "id": "#Pet",
+                    "type": "object",
+                    "properties": {},
+                }
+                write_file_atomically(input_path, json.dumps(document).encode())
+
+                return {input_path}
+
+            with mock.patch(
+                "json_schema_to_python.watch.wait_for_changes",
+                side_effect=change_input,
+            ):
+                watch(
+                    logging.getLogger(__name__),
+                    input_path,
+                    output_path,
+                    should_format=False,
+                    poll_interval=1,
+                )
+
+            assert os.path.exists(get_manifest_path(output_path))
+
+        assert "class Person" in outputs[0]
+        assert "class Pet" not in outputs[0]
+        assert "class Pet" in outputs[1]
@@ -0,0 +1,69 @@
+import contextlib
+import os
+import tempfile
+
+
+def write_temporary_file(path: str, data: bytes) -> str:
+    """
+    Write data to a temporary file next to a path, with the permissions a file
+    at the path would get, so that it can be renamed over the path
+
+    Returns:
+        The temporary file's path
+    """
+
+    # `mkstemp` creates the file readable only by its owner
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)),
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        os.chmod(temporary_path, mode)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporary_path)
+
+        raise
+
+    return temporary_path
+
+
+def write_file_atomically(path: str, data: bytes) -> None:
+    """
+    Write a file so that readers see either the old or the new content, never
+    part of it
+    """
+
+    temporary_path = write_temporary_file(path, data)
+    try:
+        os.replace(temporary_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporary_path)
+
+        raise
+
+
+def get_file_stat(path: str) -> tuple[int, int, int] | None:
+    """
+    Identify a file's content without reading it: its modification time, size
+    and inode. Writing it atomically replaces the file, so this changes even if
+    the content doesn't. None if the file doesn't exist.
+    """
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino